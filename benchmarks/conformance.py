@@ -0,0 +1,105 @@
+"""Micro-benchmark of record type conformance.
+
+Compares the SDK's per-record schema walk with the compiled conformers of
+`tap_flipkart.conformance`, on records synthesized from the stream schemas.
+
+Example:
+    python -m benchmarks.conformance --records 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import logging
+import time
+import typing as t
+
+from singer_sdk._singerlib.catalog import MetadataMapping
+from singer_sdk.helpers._catalog import pop_deselected_record_properties
+from singer_sdk.helpers._typing import TypeConformanceLevel, conform_record_data_types
+
+from benchmarks.mock_api import SCHEMAS_DIR, MockSettings, RecordFactory
+from tap_flipkart.conformance import RecordConformer
+
+LOGGER = logging.getLogger(__name__)
+
+# Nested fields passed through in the "trusted" variant
+TRUSTED_FIELDS = {
+    "shipments": ["subShipments", "orderItems"],
+    "returns": [],
+}
+
+
+def _sdk_conform(schema: dict, mask: t.Any) -> t.Callable[[dict], dict]:
+    def conform(record: dict) -> dict:
+        pop_deselected_record_properties(record, schema, mask, LOGGER)
+        return conform_record_data_types(
+            "benchmark",
+            record,
+            schema,
+            TypeConformanceLevel.RECURSIVE,
+            LOGGER,
+        )
+
+    return conform
+
+
+def _measure(
+    conform: t.Callable[[dict], dict],
+    records: list[dict],
+    repeat: int,
+) -> float:
+    """Return the best records per second out of `repeat` runs."""
+    best = 0.0
+    for _ in range(repeat):
+        # Conformance may modify records in place, so every run gets fresh copies
+        batch = copy.deepcopy(records)
+        started = time.perf_counter()
+        for record in batch:
+            conform(record)
+        best = max(best, len(batch) / (time.perf_counter() - started))
+    return best
+
+
+def main() -> None:
+    """Run the benchmark and print records per second per variant."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'stream':>10} | {'variant':>10} | {'records/s':>12} | speedup")  # noqa: T201
+    for stream in ("shipments", "returns"):
+        schema = json.loads((SCHEMAS_DIR / f"{stream}.json").read_text())
+        factory = RecordFactory(schema, MockSettings())
+        records = [factory.build(i, stream) for i in range(args.records)]
+        mask = MetadataMapping.get_standard_metadata(
+            schema=schema,
+            key_properties=[],
+            selected_by_default=True,
+        ).resolve_selection()
+
+        variants = {
+            "sdk": _sdk_conform(schema, mask),
+            "compiled": RecordConformer(stream, schema, mask, logger=LOGGER),
+            "trusted": RecordConformer(
+                stream,
+                schema,
+                mask,
+                trusted_fields=TRUSTED_FIELDS[stream],
+                logger=LOGGER,
+            ),
+        }
+        baseline = None
+        for name, conform in variants.items():
+            rate = _measure(conform, records, args.repeat)
+            baseline = baseline or rate
+            print(  # noqa: T201
+                f"{stream:>10} | {name:>10} | {rate:>12,.0f} | {rate / baseline:.1f}x",
+            )
+
+
+if __name__ == "__main__":
+    main()
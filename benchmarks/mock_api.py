@@ -0,0 +1,371 @@
+"""Local stand-in for the Flipkart Seller API.
+
+Serves the OAuth token endpoint, `/v3/shipments/filter` (POST plus GET
+`nextPageUrl`) and `/v2/returns` (with `nextUrl`). Records are synthesized on
+the fly from the tap's JSON schemas, so arbitrarily large accounts can be
+simulated without holding them in memory.
+
+Run standalone with `python -m benchmarks.mock_api --port 8080`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import datetime
+import json
+import math
+import random
+import threading
+import time
+import typing as t
+from dataclasses import dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+SCHEMAS_DIR = Path(__file__).parent.parent / "tap_flipkart" / "schemas"
+EPOCH = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+IST = datetime.timezone(datetime.timedelta(hours=5, minutes=30))
+RETURN_SOURCES = ("courier_return", "customer_return")
+
+
+@dataclass
+class MockSettings:
+    """Behaviour of the mock API."""
+
+    #: Records served per shipment state and per return source.
+    records_per_partition: int = 1000
+    #: Time between the timestamps of consecutive records.
+    record_spacing: datetime.timedelta = datetime.timedelta(hours=1)
+    #: Largest accepted page size. Larger requests are rejected with a 400.
+    max_page_size: int = 100
+    #: Page size used when the client sends none.
+    default_page_size: int = 20
+    #: Added latency per request, in seconds.
+    latency: float = 0.0
+    #: Requests per second above which requests are throttled with a 429.
+    max_requests_per_second: float | None = None
+    #: Orders per `orderDate` window above which the window is rejected with a 400.
+    max_window_records: int | None = None
+
+
+def _parse_date(value: str) -> datetime.datetime:
+    return datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class RecordFactory:
+    """Synthesize deterministic records from a JSON schema."""
+
+    def __init__(self, schema: dict, settings: MockSettings) -> None:
+        """Create a factory for one schema.
+
+        Args:
+            schema: The JSON schema of the records.
+            settings: Mock settings.
+        """
+        self.schema = schema
+        self.settings = settings
+
+    def timestamp(self, index: int) -> datetime.datetime:
+        """Return the order/update timestamp of the record at `index`."""
+        return EPOCH + index * self.settings.record_spacing
+
+    def index_range(
+        self,
+        start: datetime.datetime | None,
+        end: datetime.datetime | None,
+    ) -> tuple[int, int]:
+        """Return the record indices whose timestamp lies in `[start, end)`."""
+        spacing = self.settings.record_spacing.total_seconds()
+        first, last = 0, self.settings.records_per_partition
+        if start is not None:
+            first = max(first, math.ceil((start - EPOCH).total_seconds() / spacing))
+        if end is not None:
+            last = min(last, math.ceil((end - EPOCH).total_seconds() / spacing))
+        return first, max(first, last)
+
+    def build(self, index: int, seed: str) -> dict:
+        """Build the record at `index`.
+
+        Args:
+            index: Position of the record in its partition.
+            seed: Partition name, used to vary the generated values.
+
+        Returns:
+            A record matching the schema.
+        """
+        rng = random.Random(f"{seed}-{index}")  # noqa: S311
+        record = self._value(self.schema, rng, "", self.timestamp(index))
+        # Primary keys only depend on the index, so partitions share records
+        for key in ("shipmentId", "returnId"):
+            if key in record:
+                record[key] = f"{key[:-2].upper()}{index:012d}"
+        return record
+
+    def _value(  # noqa: PLR0911
+        self,
+        schema: dict,
+        rng: random.Random,
+        name: str,
+        timestamp: datetime.datetime,
+    ) -> t.Any:
+        schema_type = schema.get("type", "string")
+        if isinstance(schema_type, list):
+            schema_type = next((x for x in schema_type if x != "null"), "null")
+        if schema_type == "object":
+            return {
+                key: self._value(value, rng, key, timestamp)
+                for key, value in schema.get("properties", {}).items()
+            }
+        if schema_type == "array":
+            items = schema.get("items", {})
+            return [
+                self._value(items, rng, name, timestamp)
+                for _ in range(rng.randint(1, 2))
+            ]
+        if schema_type == "integer":
+            return rng.randint(1, 5)
+        if schema_type == "number":
+            return round(rng.uniform(1, 1000), 2)
+        if schema_type == "boolean":
+            return rng.random() < 0.5  # noqa: PLR2004
+        if schema_type == "null":
+            return None
+        if schema.get("format") == "date-time" or name.endswith(("Date", "At")):
+            return timestamp.astimezone(IST).isoformat(timespec="milliseconds")
+        return f"{name or 'value'}-{rng.getrandbits(40):x}"
+
+
+class MockFlipkartAPI:
+    """Threaded HTTP server emulating the Flipkart API."""
+
+    def __init__(
+        self,
+        settings: MockSettings | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        """Create a server. Use `port=0` to pick a free port.
+
+        Args:
+            settings: Mock settings.
+            host: Interface to listen on.
+            port: Port to listen on.
+        """
+        self.settings = settings or MockSettings()
+        self.shipments = RecordFactory(
+            json.loads((SCHEMAS_DIR / "shipments.json").read_text()),
+            self.settings,
+        )
+        self.returns = RecordFactory(
+            json.loads((SCHEMAS_DIR / "returns.json").read_text()),
+            self.settings,
+        )
+        self.request_count = 0
+        self.throttled_count = 0
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_requests = 0
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """Return the root URL to configure as the tap's `api_url`."""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> MockFlipkartAPI:  # noqa: PYI034
+        """Serve requests in a background thread.
+
+        Returns:
+            The running server.
+        """
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Stop serving requests."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _admit(self) -> bool:
+        """Count a request and return False if it must be throttled."""
+        with self._lock:
+            self.request_count += 1
+            limit = self.settings.max_requests_per_second
+            if not limit:
+                return True
+            now = time.monotonic()
+            if now - self._window_start >= 1:
+                self._window_start, self._window_requests = now, 0
+            self._window_requests += 1
+            if self._window_requests > limit:
+                self.throttled_count += 1
+                return False
+            return True
+
+    def token(self, _query: dict, _body: dict) -> tuple[int, dict]:
+        """Serve the OAuth token endpoint."""
+        return HTTPStatus.OK, {"access_token": "mock-token", "expires_in": 3600}
+
+    def filter_shipments(self, query: dict, body: dict) -> tuple[int, dict]:
+        """Serve the first page (POST) or a following page (GET) of shipments."""
+        if body:
+            shipment_filter = body["filter"]
+            state = shipment_filter["states"][0]
+            date_range = (
+                shipment_filter.get("orderDate")
+                or shipment_filter.get(
+                    "modifiedDate",
+                )
+                or {}
+            )
+            first, last = self.shipments.index_range(
+                _parse_date(date_range["from"]) if date_range.get("from") else None,
+                _parse_date(date_range["to"]) if date_range.get("to") else None,
+            )
+            page_size = body.get("pagination", {}).get("pageSize")
+            page_size = page_size or self.settings.default_page_size
+            max_window = self.settings.max_window_records
+            ordered = "orderDate" in shipment_filter
+            if ordered and max_window and last - first > max_window:
+                return HTTPStatus.BAD_REQUEST, {"message": "Too many results"}
+        else:
+            state = query["state"][0]
+            first, last = int(query["cursor"][0]), int(query["end"][0])
+            page_size = int(query["pageSize"][0])
+        if page_size > self.settings.max_page_size:
+            return HTTPStatus.BAD_REQUEST, {"message": "Invalid pageSize"}
+
+        stop = min(first + page_size, last)
+        result = {
+            "shipments": [self.shipments.build(i, state) for i in range(first, stop)],
+            "hasMore": stop < last,
+        }
+        if stop < last:
+            params = {
+                "state": state,
+                "cursor": stop,
+                "end": last,
+                "pageSize": page_size,
+            }
+            result["nextPageUrl"] = f"/v3/shipments/filter?{urlencode(params)}"
+        return HTTPStatus.OK, result
+
+    def list_returns(self, query: dict, _body: dict) -> tuple[int, dict]:
+        """Serve a page of returns."""
+        source = query["source"][0]
+        if "cursor" in query:
+            first, last = int(query["cursor"][0]), int(query["end"][0])
+        else:
+            modified_after = query.get("modifiedAfter", [None])[0]
+            first, last = self.returns.index_range(
+                _parse_date(modified_after) if modified_after else None,
+                None,
+            )
+        page_size = int(query.get("pageSize", [self.settings.default_page_size])[0])
+        if page_size > self.settings.max_page_size:
+            return HTTPStatus.BAD_REQUEST, {"message": "Invalid pageSize"}
+
+        stop = min(first + page_size, last)
+        result = {
+            "returnItems": [self.returns.build(i, source) for i in range(first, stop)],
+            "hasMore": stop < last,
+        }
+        if stop < last:
+            params = {
+                "source": source,
+                "cursor": stop,
+                "end": last,
+                "pageSize": page_size,
+            }
+            result["nextUrl"] = f"/returns?{urlencode(params)}"
+        return HTTPStatus.OK, result
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:  # noqa: C901
+        api = self
+        routes = {
+            ("GET", "/oauth-service/oauth/token"): api.token,
+            ("POST", "/sellers/v3/shipments/filter"): api.filter_shipments,
+            ("GET", "/sellers/v3/shipments/filter"): api.filter_shipments,
+            ("GET", "/sellers/v2/returns"): api.list_returns,
+        }
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; without this, delayed
+            # ACKs add ~40ms to every keep-alive response
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args: t.Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                self._dispatch("GET")
+
+            def do_POST(self) -> None:
+                self._dispatch("POST")
+
+            def _dispatch(self, method: str) -> None:
+                url = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else {}
+                route = routes.get((method, url.path))
+                if api.settings.latency:
+                    time.sleep(api.settings.latency)
+                if route is None:
+                    status, payload = HTTPStatus.NOT_FOUND, {"message": "Not found"}
+                elif not api._admit():
+                    status, payload = (
+                        HTTPStatus.TOO_MANY_REQUESTS,
+                        {"message": "Slow down"},
+                    )
+                elif route != api.token and not self._authorized():
+                    status, payload = (
+                        HTTPStatus.UNAUTHORIZED,
+                        {"message": "Unauthorized"},
+                    )
+                else:
+                    status, payload = route(parse_qs(url.query), body)
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if status == HTTPStatus.TOO_MANY_REQUESTS:
+                    self.send_header("Retry-After", "1")
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _authorized(self) -> bool:
+                return self.headers.get("Authorization") == "Bearer mock-token"
+
+        return Handler
+
+
+def main() -> None:
+    """Serve the mock API until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--max-rps", type=float, default=None)
+    args = parser.parse_args()
+    settings = MockSettings(
+        records_per_partition=args.records,
+        latency=args.latency_ms / 1000,
+        max_requests_per_second=args.max_rps,
+    )
+    with MockFlipkartAPI(settings, host=args.host, port=args.port) as api:
+        print(f"Mock Flipkart API listening on {api.url}")  # noqa: T201
+        with contextlib.suppress(KeyboardInterrupt):
+            threading.Event().wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+r"""Benchmark tap-flipkart against the local mock API.
+
+Each stream is synced in its own tap process with stdout piped back to the
+harness, so the reported CPU time and peak RSS belong to the tap alone.
+
+Example:
+    python -m benchmarks.run --records 100000 --latency-ms 20 \
+        --config '{"max_concurrent_partitions": 4}'
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import typing as t
+from pathlib import Path
+
+from benchmarks.mock_api import EPOCH, MockFlipkartAPI, MockSettings
+
+STREAMS = ("shipments", "returns")
+
+
+def _catalog(config_path: Path, stream: str) -> dict:
+    """Discover the catalog and select only `stream`."""
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "tap_flipkart.tap",
+            "--config",
+            str(config_path),
+            "--discover",
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    catalog = json.loads(output)
+    for entry in catalog["streams"]:
+        for metadata in entry["metadata"]:
+            if not metadata["breadcrumb"]:
+                metadata["metadata"]["selected"] = entry["tap_stream_id"] == stream
+    return catalog
+
+
+def run_stream(
+    api: MockFlipkartAPI,
+    stream: str,
+    config: dict,
+    workdir: Path,
+) -> dict[str, t.Any]:
+    """Sync a single stream and measure it.
+
+    Args:
+        api: The running mock API.
+        stream: Name of the stream to sync.
+        config: Extra tap configuration.
+        workdir: Directory for config and catalog files.
+
+    Returns:
+        A dict of measurements.
+    """
+    config_path = workdir / "config.json"
+    config_path.write_text(
+        json.dumps(
+            {
+                "client_id": "benchmark",
+                "client_secret": "benchmark",
+                "api_url": api.url,
+                "start_date": EPOCH.isoformat(),
+                **config,
+            },
+        ),
+    )
+    catalog_path = workdir / f"catalog-{stream}.json"
+    catalog_path.write_text(json.dumps(_catalog(config_path, stream)))
+
+    requests_before = api.request_count
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "tap_flipkart.tap",
+            "--config",
+            str(config_path),
+            "--catalog",
+            str(catalog_path),
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    records = output_bytes = 0
+    for line in process.stdout:
+        output_bytes += len(line)
+        if line.startswith(b'{"type":"RECORD"') or b'"type": "RECORD"' in line[:40]:
+            records += 1
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - started
+    if status:
+        msg = f"tap exited with status {status} while syncing {stream}"
+        raise RuntimeError(msg)
+
+    requests = api.request_count - requests_before
+    cpu = usage.ru_utime + usage.ru_stime
+    # ru_maxrss is reported in kilobytes on Linux and bytes on macOS
+    rss_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return {
+        "stream": stream,
+        "records": records,
+        "requests": requests,
+        "seconds": round(elapsed, 3),
+        "records_per_second": round(records / elapsed, 1),
+        "requests_per_second": round(requests / elapsed, 1),
+        "cpu_seconds": round(cpu, 3),
+        "peak_rss_mb": round(rss_mb, 1),
+        "output_mb": round(output_bytes / 1024 / 1024, 2),
+    }
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description="Benchmark tap-flipkart offline.")
+    parser.add_argument(
+        "--records", type=int, default=10000, help="Records per partition."
+    )
+    parser.add_argument(
+        "--latency-ms", type=float, default=0, help="Latency per request."
+    )
+    parser.add_argument(
+        "--max-rps", type=float, default=None, help="Server throttling."
+    )
+    parser.add_argument("--max-page-size", type=int, default=100)
+    parser.add_argument("--streams", nargs="+", default=list(STREAMS), choices=STREAMS)
+    parser.add_argument("--config", default="{}", help="Extra tap config as JSON.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = parser.parse_args()
+
+    settings = MockSettings(
+        records_per_partition=args.records,
+        record_spacing=datetime.timedelta(minutes=1),
+        latency=args.latency_ms / 1000,
+        max_requests_per_second=args.max_rps,
+        max_page_size=args.max_page_size,
+    )
+    with MockFlipkartAPI(settings) as api, tempfile.TemporaryDirectory() as tmp:
+        results = [
+            run_stream(api, stream, json.loads(args.config), Path(tmp))
+            for stream in args.streams
+        ]
+
+    if args.json:
+        print(json.dumps(results, indent=2))  # noqa: T201
+        return
+    columns = list(results[0])
+    print(" | ".join(f"{c:>19}" for c in columns))  # noqa: T201
+    for result in results:
+        print(" | ".join(f"{result[c]!s:>19}" for c in columns))  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Micro-benchmark of Singer message output.
+
+Compares the SDK's per-message `json.dumps`, write and flush with the tap's
+buffered `MessageWriter`, writing RECORD messages synthesized from the stream
+schemas to /dev/null.
+
+Example:
+    python -m benchmarks.serialization --records 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import time
+import typing as t
+
+import singer_sdk._singerlib as singer
+from singer_sdk._singerlib.messages import write_message
+from singer_sdk.helpers._util import utc_now
+
+from benchmarks.mock_api import SCHEMAS_DIR, MockSettings, RecordFactory
+from tap_flipkart.output import MessageWriter
+
+
+def _measure(
+    write: t.Callable[[singer.Message], None],
+    messages: list[singer.Message],
+    repeat: int,
+) -> float:
+    """Return the best messages per second out of `repeat` runs."""
+    best = 0.0
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):  # noqa: PTH123
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for message in messages:
+                write(message)
+            # STATE messages flush the buffered writer
+            write(singer.StateMessage(value={}))
+            best = max(best, len(messages) / (time.perf_counter() - started))
+    return best
+
+
+def main() -> None:
+    """Run the benchmark and print messages per second per variant."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'stream':>10} | {'variant':>10} | {'records/s':>12} | speedup")  # noqa: T201
+    for stream in ("shipments", "returns"):
+        schema = json.loads((SCHEMAS_DIR / f"{stream}.json").read_text())
+        factory = RecordFactory(schema, MockSettings())
+        messages = [
+            singer.RecordMessage(
+                stream=stream,
+                record=factory.build(i, stream),
+                time_extracted=utc_now(),
+            )
+            for i in range(args.records)
+        ]
+        variants = {"sdk": write_message, "buffered": MessageWriter().write}
+        baseline = None
+        for name, write in variants.items():
+            rate = _measure(write, messages, args.repeat)
+            baseline = baseline or rate
+            print(  # noqa: T201
+                f"{stream:>10} | {name:>10} | {rate:>12,.0f} | {rate / baseline:.1f}x",
+            )
+
+
+if __name__ == "__main__":
+    main()
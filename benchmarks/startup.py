@@ -0,0 +1,120 @@
+"""Benchmark of tap startup.
+
+Measures the wall time of short-lived tap processes, as run for every sync:
+importing the tap, `--about` and `--discover`, next to importing the SDK
+alone. Every run starts a fresh interpreter. The modules the tap imports on
+top of the SDK are listed from `python -X importtime`, and `--budget-ms`
+fails the run when their import time exceeds a budget, to catch regressions.
+
+Example:
+    python -m benchmarks.startup --repeat 10 --budget-ms 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Imported by any tap built on the SDK
+SDK_IMPORTS = "import requests, singer_sdk, singer_sdk.streams"
+CONFIG = {
+    "client_id": "id",
+    "client_secret": "secret",
+    "start_date": "2024-01-01T00:00:00Z",
+}
+
+
+def _best_seconds(args: list[str], repeat: int) -> float:
+    """Return the fastest wall time of `repeat` runs of a Python process."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, *args],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _import_times(code: str) -> dict[str, int]:
+    """Return the self import time in microseconds of every module `code` imports."""
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+    times = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, module = line[len("import time:") :].split("|")
+        times[module.strip()] = int(self_us)
+    return times
+
+
+def tap_imports() -> dict[str, int]:
+    """Return the self import times of the modules imported by the tap alone.
+
+    Returns:
+        Microseconds per module the tap imports on top of the SDK.
+    """
+    sdk = _import_times(SDK_IMPORTS)
+    return {
+        module: self_us
+        for module, self_us in _import_times("import tap_flipkart.tap").items()
+        if module not in sdk
+    }
+
+
+def main() -> None:
+    """Run the benchmark and print the startup times."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        help="Exit with an error when the tap's own imports take longer.",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        config_path = Path(workdir) / "config.json"
+        config_path.write_text(json.dumps(CONFIG))
+        variants = {
+            "sdk import": ["-c", SDK_IMPORTS],
+            "tap import": ["-c", "import tap_flipkart.tap"],
+            "--about": ["-m", "tap_flipkart.tap", "--about"],
+            "--discover": [
+                "-m",
+                "tap_flipkart.tap",
+                "--config",
+                str(config_path),
+                "--discover",
+            ],
+        }
+        print(f"{'variant':>12} | {'seconds':>8}")  # noqa: T201
+        for name, variant_args in variants.items():
+            seconds = _best_seconds(variant_args, args.repeat)
+            print(f"{name:>12} | {seconds:>8.3f}")  # noqa: T201
+
+    imports = tap_imports()
+    total_ms = sum(imports.values()) / 1000
+    print(f"\nimports on top of the SDK: {total_ms:.1f} ms")  # noqa: T201
+    for module, self_us in sorted(imports.items(), key=lambda i: -i[1])[: args.top]:
+        print(f"{self_us / 1000:>8.1f} ms | {module}")  # noqa: T201
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        sys.exit(f"Tap imports took {total_ms:.1f} ms, over {args.budget_ms} ms.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Extraction of several seller accounts in one tap process.
+
+With the `accounts` setting, every stream partition is synced once per
+account. The account is a key of the partition context, so each account has
+its own bookmarks, and every record is tagged with it.
+"""
+
+from __future__ import annotations
+
+import typing as t
+
+from singer_sdk.exceptions import ConfigValidationError
+
+# Partition context key and record field of the seller account
+ACCOUNT_KEY = "account_id"
+
+
+class SellerAccount:
+    """Credentials of a seller account synced by the tap."""
+
+    def __init__(
+        self,
+        account_id: str | None,
+        client_id: str,
+        client_secret: str,
+    ) -> None:
+        """Create an account.
+
+        Args:
+            account_id: Name of the account in partitions and records, or
+                None for the account of the top-level credentials.
+            client_id: The Flipkart API client ID.
+            client_secret: The Flipkart API client secret.
+        """
+        self.account_id = account_id
+        self.client_id = client_id
+        self.client_secret = client_secret
+
+    @classmethod
+    def from_config(cls, config: t.Mapping[str, t.Any]) -> list[SellerAccount]:
+        """Return the accounts synced by a tap.
+
+        Args:
+            config: Tap configuration.
+
+        Returns:
+            The configured `accounts`, or the single account of the top-level
+            `client_id` and `client_secret`.
+
+        Raises:
+            ConfigValidationError: If no credentials are set, or account IDs
+                are missing or repeated.
+        """
+        accounts = config.get("accounts")
+        if not accounts:
+            if not (config.get("client_id") and config.get("client_secret")):
+                msg = "Either client_id and client_secret or accounts must be set"
+                raise ConfigValidationError(msg)
+            return [cls(None, config["client_id"], config["client_secret"])]
+        account_ids = [account.get("account_id") for account in accounts]
+        if not all(account_ids) or len(set(account_ids)) < len(account_ids):
+            msg = "Every account needs a unique account_id"
+            raise ConfigValidationError(msg)
+        return [
+            cls(account["account_id"], account["client_id"], account["client_secret"])
+            for account in accounts
+        ]
+
+
+def account_partitions(
+    accounts: list[SellerAccount],
+    partitions: list[dict],
+) -> list[dict]:
+    """Return the partitions of a stream for every account.
+
+    Partitions are interleaved across accounts, so concurrently fetched
+    partitions belong to different accounts.
+
+    Args:
+        accounts: The accounts synced by the tap.
+        partitions: The partitions of a single account.
+
+    Returns:
+        `partitions` unchanged for the top-level credentials, otherwise a copy
+        of every partition per account, keyed by `ACCOUNT_KEY`.
+    """
+    if [account.account_id for account in accounts] == [None]:
+        return partitions
+    return [
+        {ACCOUNT_KEY: account.account_id, **partition}
+        for partition in partitions
+        for account in accounts
+    ]
+
+
+def get_account_id(context: dict | None) -> str | None:
+    """Return the account of a partition or request context.
+
+    Args:
+        context: Stream partition or request context.
+
+    Returns:
+        The account ID, or None for the top-level credentials.
+    """
+    return context.get(ACCOUNT_KEY) if context else None
@@ -0,0 +1,306 @@
+"""Archive of raw API response pages, and their offline replay.
+
+In `archive` mode, the body of every page is saved gzipped under the hash of
+its content, so identical pages are stored once, and a SQLite index records
+the request of every page: its stream, partition, request context (such as
+the order date window), method, URL (with the page cursor) and payload.
+
+Every sync archives its pages under a run of its own, which is marked
+complete once the sync succeeds. In `replay` mode, the pages of every
+partition are read back from the latest complete run that synced the
+partition, in the order they were archived, instead of being requested, and
+parsed and post-processed as if they came from the API. This rebuilds the
+output of changed post-processing, schemas or stream maps at disk speed.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import time
+import typing as t
+import uuid
+from pathlib import Path
+
+import requests
+
+if t.TYPE_CHECKING:
+    import sqlite3
+
+ARCHIVE_MODE = "archive"
+REPLAY_MODE = "replay"
+DEFAULT_ARCHIVE_PATH = "tap-flipkart-archive"
+# zlib's default level, much faster than gzip's maximum for similar sizes
+GZIP_COMPRESSION_LEVEL = 6
+# Compaction rebuilds the index once this share of its pages was removed
+VACUUM_RATIO = 0.25
+# Syncs wait this long for the write lock of the index, held by compaction
+LOCK_TIMEOUT_SECONDS = 600
+
+_SCHEMA = (
+    (
+        "CREATE TABLE IF NOT EXISTS runs ("
+        "run_id TEXT PRIMARY KEY, started_at INTEGER, completed INTEGER)"
+    ),
+    (
+        "CREATE TABLE IF NOT EXISTS pages ("
+        "seq INTEGER PRIMARY KEY AUTOINCREMENT, run_id TEXT, stream TEXT, "
+        "partition TEXT, context TEXT, method TEXT, url TEXT, body TEXT, "
+        "status INTEGER, fetched_at INTEGER, object TEXT, size INTEGER)"
+    ),
+    "CREATE INDEX IF NOT EXISTS pages_partition ON pages (stream, partition, seq)",
+    "CREATE INDEX IF NOT EXISTS pages_fetched_at ON pages (fetched_at)",
+)
+
+
+def _dump_context(context: dict | None) -> str | None:
+    if context is None:
+        return None
+    return json.dumps(context, sort_keys=True, default=str)
+
+
+class PageArchive:
+    """A directory of content-addressed response pages and their index.
+
+    Pages are added by any number of threads, to the run of the archive,
+    which :meth:`complete` marks as replayable. Pages fetched more than
+    `max_age_days` ago are removed by :meth:`compact`, along with the page
+    bodies no page refers to anymore.
+
+    Page bodies are written and indexed, and removed by compaction, under
+    the write lock of the index, so syncs sharing the archive never remove
+    the bodies of each other's pages.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        path: str,
+        *,
+        mode: str = ARCHIVE_MODE,
+        max_age_days: float | None = None,
+        compression_level: int = GZIP_COMPRESSION_LEVEL,
+        logger: logging.Logger | None = None,
+        now: float | None = None,
+    ) -> None:
+        """Open or create an archive.
+
+        Args:
+            path: Directory of the archive.
+            mode: `archive` to add pages, or `replay` to read them back.
+            max_age_days: Days after which pages are removed on compaction,
+                or None to keep them.
+            compression_level: Gzip level of the page bodies.
+            logger: Logger used to report compaction.
+            now: POSIX time of the sync. Defaults to the current time.
+        """
+        # Imported here, as the archive is opt-in
+        import sqlite3  # noqa: PLC0415
+
+        self.path = Path(path)
+        self.mode = mode
+        self.max_age_days = max_age_days
+        self.compression_level = compression_level
+        self.logger = logger or logging.getLogger(__name__)
+        self.now = int(time.time() if now is None else now)
+        self.run_id = uuid.uuid4().hex
+        (self.path / "objects").mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection = sqlite3.connect(
+            self.path / "index.sqlite",
+            timeout=LOCK_TIMEOUT_SECONDS,
+            check_same_thread=False,
+        )
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        for statement in _SCHEMA:
+            self._connection.execute(statement)
+        if not self.replay:
+            self._connection.execute(
+                "INSERT INTO runs (run_id, started_at, completed) VALUES (?, ?, 0)",
+                (self.run_id, self.now),
+            )
+        self._connection.commit()
+
+    @property
+    def replay(self) -> bool:
+        """Return True if pages are read from the archive instead of the API."""
+        return self.mode == REPLAY_MODE
+
+    def __len__(self) -> int:
+        """Return the number of archived pages."""
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def add(
+        self,
+        stream: str,
+        partition: dict | None,
+        context: dict | None,
+        request: requests.PreparedRequest,
+        response: requests.Response,
+    ) -> str:
+        """Archive a page.
+
+        Args:
+            stream: Name of the page's stream.
+            partition: Partition context of the page.
+            context: Request context of the page, such as a date window.
+            request: The request of the page.
+            response: The validated response, read or streamed.
+
+        Returns:
+            The hash of the page body.
+        """
+        content = response.content
+        digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+        path = self._object_path(digest)
+        # Compressed ahead of the lock, unless the body is archived already
+        compressed = None
+        if not path.exists():
+            compressed = gzip.compress(content, compresslevel=self.compression_level)
+        body = request.body
+        if isinstance(body, bytes):
+            body = body.decode()
+        with self._lock, self._connection:
+            # Compaction cannot remove the body until the page refers to it
+            self._connection.execute("BEGIN IMMEDIATE")
+            self._write_object(path, content, compressed)
+            self._connection.execute(
+                "INSERT INTO pages (run_id, stream, partition, context, method, url, "
+                "body, status, fetched_at, object, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.run_id,
+                    stream,
+                    _dump_context(partition),
+                    _dump_context(context),
+                    request.method,
+                    request.url,
+                    body,
+                    response.status_code,
+                    self.now,
+                    digest,
+                    len(content),
+                ),
+            )
+        return digest
+
+    def responses(
+        self,
+        stream: str,
+        partition: dict | None,
+    ) -> t.Iterator[requests.Response]:
+        """Yield the archived pages of a partition, in archiving order.
+
+        Only the pages of the latest complete run that synced the partition
+        are read, so the pages of earlier and interrupted syncs are skipped.
+
+        Args:
+            stream: Name of the stream.
+            partition: Partition context.
+
+        Yields:
+            A read response for every page.
+        """
+        partition_key = _dump_context(partition)
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT method, url, status, object FROM pages "
+                "WHERE stream = ? AND partition IS ? AND run_id = ("
+                "SELECT pages.run_id FROM pages JOIN runs USING (run_id) "
+                "WHERE stream = ? AND partition IS ? AND completed "
+                "ORDER BY seq DESC LIMIT 1) ORDER BY seq",
+                (stream, partition_key, stream, partition_key),
+            ).fetchall()
+        for method, url, status, digest in rows:
+            response = requests.Response()
+            response.status_code = status
+            response.url = url
+            response.request = requests.Request(method, url).prepare()
+            response._content = gzip.decompress(  # noqa: SLF001
+                self._object_path(digest).read_bytes(),
+            )
+            yield response
+
+    def complete(self) -> None:
+        """Mark the pages of this run as replayable, once its sync succeeded."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE runs SET completed = 1 WHERE run_id = ?",
+                (self.run_id,),
+            )
+
+    def compact(self) -> None:
+        """Remove expired pages and the bodies no page refers to.
+
+        The write lock of the index is held until the bodies are removed, so
+        other syncs wait to archive pages, and every partial body left is one
+        of an interrupted sync.
+        """
+        with self._lock, self._connection:
+            self._connection.execute("BEGIN IMMEDIATE")
+            total = self._connection.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            removed = 0
+            if self.max_age_days is not None:
+                expired = self.now - self.max_age_days * 86400
+                removed = self._connection.execute(
+                    "DELETE FROM pages WHERE fetched_at < ?",
+                    (expired,),
+                ).rowcount
+                self._connection.execute(
+                    "DELETE FROM runs WHERE run_id NOT IN "
+                    "(SELECT DISTINCT run_id FROM pages) AND started_at < ?",
+                    (expired,),
+                )
+            referenced = {
+                digest
+                for (digest,) in self._connection.execute(
+                    "SELECT DISTINCT object FROM pages",
+                )
+            }
+            freed = 0
+            for object_path in (self.path / "objects").glob("*/*"):
+                if (
+                    object_path.suffix != ".tmp"
+                    and object_path.name.split(".", 1)[0] in referenced
+                ):
+                    continue
+                freed += object_path.stat().st_size
+                object_path.unlink()
+        if removed or freed:
+            self.logger.info(
+                "Removed %d pages and %d bytes of page bodies from the archive.",
+                removed,
+                freed,
+            )
+        if removed and removed >= total * VACUUM_RATIO:
+            with self._lock:
+                self._connection.execute("VACUUM")
+
+    def close(self) -> None:
+        """Close the index."""
+        with self._lock:
+            self._connection.close()
+
+    def _object_path(self, digest: str) -> Path:
+        return self.path / "objects" / digest[:2] / f"{digest}.json.gz"
+
+    def _write_object(
+        self,
+        path: Path,
+        content: bytes,
+        compressed: bytes | None,
+    ) -> None:
+        if path.exists():
+            return
+        if compressed is None:
+            # Removed by compaction since it was found
+            compressed = gzip.compress(content, compresslevel=self.compression_level)
+        path.parent.mkdir(exist_ok=True)
+        # Renamed into place, so readers never see a partial body
+        partial = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        partial.write_bytes(compressed)
+        partial.replace(path)
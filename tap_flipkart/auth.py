@@ -2,15 +2,184 @@
 
 from __future__ import annotations
 
-from singer_sdk.authenticators import OAuthAuthenticator, SingletonMeta
-import base64
+from singer_sdk.authenticators import OAuthAuthenticator
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import typing as t
+from pathlib import Path
 
 from singer_sdk.helpers._util import utc_now
 import requests
 
 
-class FlipkartAuthenticator(OAuthAuthenticator, metaclass=SingletonMeta):
-    """Authenticator class for Flipkart."""
+if t.TYPE_CHECKING:
+    from tap_flipkart.accounts import SellerAccount
+
+
+class FlipkartAuthenticator(OAuthAuthenticator):
+    """Authenticator class for Flipkart.
+
+    Tokens are refreshed single-flight: while a token is requested, other
+    threads needing one wait for that request instead of sending their own.
+    Expiring tokens are refreshed in a background thread `REFRESH_MARGIN`
+    seconds before they expire, so requests keep using the current token
+    meanwhile. A failed background refresh is retried every
+    `REFRESH_RETRY_SECONDS` while the current token is valid.
+    """
+
+    # Cached tokens are discarded this many seconds before they expire
+    TOKEN_CACHE_MARGIN = 60
+
+    # Tokens are refreshed in the background this many seconds before they
+    # expire, or halfway through their lifetime if that is shorter
+    REFRESH_MARGIN = 300
+
+    # Failed background refreshes are retried after this many seconds
+    REFRESH_RETRY_SECONDS = 15
+
+    def __init__(
+        self,
+        stream,  # noqa: ANN001
+        *args: t.Any,
+        account: SellerAccount | None = None,
+        **kwargs: t.Any,
+    ) -> None:
+        """Create a new authenticator.
+
+        Args:
+            stream: The stream instance to use with this authenticator.
+            args: Positional arguments for the OAuth authenticator.
+            account: The seller account to authenticate. Defaults to the
+                top-level credentials of the tap config.
+            kwargs: Keyword arguments for the OAuth authenticator.
+        """
+        super().__init__(stream, *args, **kwargs)
+        self.account = account
+        # Guards the token refresh state against concurrent partition workers
+        self._token_lock = threading.Lock()
+        # Set once the token request in flight, if any, completes
+        self._token_request: threading.Event | None = None
+        self._refresh_timer: threading.Timer | None = None
+        # Token requests share the pooled session of the stream requests
+        self.requests_session: requests.Session = stream.requests_session
+        self.sync_profile = stream.sync_profile
+
+    @property
+    def auth_headers(self) -> dict:
+        """Return a dictionary of auth headers to be applied.
+
+        Only requests without a valid token wait for a new one.
+
+        Returns:
+            HTTP headers for authentication.
+        """
+        while not self.is_token_valid():
+            if self.sync_profile is None:
+                self.renew_access_token()
+            else:
+                from tap_flipkart.instrumentation import Measurement  # noqa: PLC0415
+
+                with self.sync_profile.timer(Measurement.AUTH):
+                    self.renew_access_token()
+        return {"Authorization": f"Bearer {self.access_token}"}
+
+    def renew_access_token(self, *, background: bool = False) -> None:
+        """Request a new access token, or wait for the request in flight.
+
+        Args:
+            background: Log a failed refresh instead of raising it, and do not
+                wait for a refresh in flight.
+
+        Raises:
+            Exception: If a foreground refresh fails.
+        """
+        with self._token_lock:
+            token_request = self._token_request
+            requesting = token_request is None
+            if requesting:
+                token_request = self._token_request = threading.Event()
+        if not requesting:
+            if not background:
+                token_request.wait()
+            return
+        try:
+            self.update_access_token()
+        except Exception:
+            if not background:
+                raise
+            self.logger.warning(
+                "Background refresh of the OAuth access token failed.",
+                exc_info=True,
+            )
+            self._schedule_refresh(retry=True)
+        else:
+            self._schedule_refresh()
+        finally:
+            with self._token_lock:
+                self._token_request = None
+            token_request.set()
+
+    def _schedule_refresh(self, *, retry: bool = False) -> None:
+        """Refresh the current token in the background before it expires.
+
+        Args:
+            retry: Retry a failed refresh after `REFRESH_RETRY_SECONDS`, unless
+                the token expires first and requests refresh it themselves.
+        """
+        if not self.expires_in or self.last_refreshed is None:
+            return
+        age = (utc_now() - self.last_refreshed).total_seconds()
+        if retry:
+            delay = self.REFRESH_RETRY_SECONDS
+            if age + delay >= self.expires_in:
+                return
+        else:
+            margin = min(self.REFRESH_MARGIN, self.expires_in / 2)
+            delay = max(self.expires_in - margin - age, 0)
+        timer = threading.Timer(
+            delay,
+            self.renew_access_token,
+            kwargs={"background": True},
+        )
+        timer.daemon = True
+        with self._token_lock:
+            if self._refresh_timer is not None:
+                self._refresh_timer.cancel()
+            self._refresh_timer = timer
+        timer.start()
+
+    def close(self) -> None:
+        """Cancel the scheduled background refresh."""
+        with self._token_lock:
+            if self._refresh_timer is not None:
+                self._refresh_timer.cancel()
+                self._refresh_timer = None
+
+    @property
+    def client_id(self) -> str | None:
+        """Return the client ID of the account.
+
+        Returns:
+            The account's client ID.
+        """
+        if self.account is not None:
+            return self.account.client_id
+        return super().client_id
+
+    @property
+    def client_secret(self) -> str | None:
+        """Return the client secret of the account.
+
+        Returns:
+            The account's client secret.
+        """
+        if self.account is not None:
+            return self.account.client_secret
+        return super().client_secret
 
     @property
     def oauth_request_body(self) -> dict:
@@ -25,18 +194,24 @@ class FlipkartAuthenticator(OAuthAuthenticator, metaclass=SingletonMeta):
     def create_for_stream(
         cls,
         stream,
+        account: SellerAccount | None = None,
     ) -> FlipkartAuthenticator:  # noqa: ANN001
         """Instantiate an authenticator for a specific Singer stream.
 
         Args:
             stream: The Singer stream instance.
+            account: The seller account to authenticate.
 
         Returns:
             A new authenticator.
         """
         return cls(
             stream=stream,
-            auth_endpoint="https://api.flipkart.net/oauth-service/oauth/token",
+            account=account,
+            auth_endpoint=(
+                f"{stream.config.get('api_url', 'https://api.flipkart.net')}"
+                "/oauth-service/oauth/token"
+            ),
         )
 
     def update_access_token(self) -> None:
@@ -45,16 +220,19 @@ class FlipkartAuthenticator(OAuthAuthenticator, metaclass=SingletonMeta):
         Raises:
             RuntimeError: When OAuth login fails.
         """
+        if self._load_cached_token():
+            self.logger.info("Reusing cached OAuth access token.")
+            return
+
         request_time = utc_now()
         querystring = {"grant_type": "client_credentials", "scope": "Seller_Api"}
 
-        # Have to use different get request vs base implementation
-        credentials = f"{self.client_id}:{self.client_secret}".encode()
-        auth_token = base64.b64encode(credentials).decode("ascii")
-        headers = {"Authorization": f"Basic {auth_token}"}
-        token_response = requests.get(
+        # Have to use different get request vs base implementation. Basic auth
+        # is passed explicitly so the shared session's own authenticator (this
+        # instance) is not invoked for the token request.
+        token_response = self.requests_session.get(
             self.auth_endpoint,
-            headers=headers,
+            auth=(self.client_id, self.client_secret),
             params=querystring,
             timeout=60,
         )
@@ -77,4 +255,112 @@ class FlipkartAuthenticator(OAuthAuthenticator, metaclass=SingletonMeta):
                 "default_expiration set. Token will be treated as if it never "
                 "expires.",
             )
-        self.last_refreshed = request_time
\ No newline at end of file
+        self.last_refreshed = request_time
+        self._save_cached_token()
+
+    @property
+    def token_cache_path(self) -> Path | None:
+        """Return the path of the on-disk token cache, if enabled."""
+        path = self.config.get("token_cache_path")
+        return Path(path).expanduser() if path else None
+
+    @property
+    def _token_cache_key(self) -> str:
+        return hashlib.sha256(f"{self.client_id}".encode()).hexdigest()
+
+    def _read_token_cache(self) -> dict:
+        try:
+            return json.loads(self.token_cache_path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _load_cached_token(self) -> bool:
+        """Load a still valid access token from the on-disk cache.
+
+        Returns:
+            True if a cached token was loaded.
+        """
+        if not self.token_cache_path:
+            return False
+        entry = self._read_token_cache().get(self._token_cache_key)
+        # Refreshing needs a token other than the current one
+        if not entry or entry["access_token"] == self.access_token:
+            return False
+        expires_at = entry.get("expires_at")
+        if expires_at is None:
+            expires_in = None
+        else:
+            expires_in = int(expires_at - time.time() - self.TOKEN_CACHE_MARGIN)
+            if expires_in <= 0:
+                return False
+        self.access_token = entry["access_token"]
+        self.expires_in = expires_in
+        self.last_refreshed = utc_now()
+        return True
+
+    def _save_cached_token(self) -> None:
+        """Write the current access token to the on-disk cache, if enabled."""
+        path = self.token_cache_path
+        if not path:
+            return
+        cache = self._read_token_cache()
+        cache[self._token_cache_key] = {
+            "access_token": self.access_token,
+            "expires_at": (
+                self.last_refreshed.timestamp() + self.expires_in
+                if self.expires_in
+                else None
+            ),
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write atomically so parallel invocations never read a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        try:
+            with os.fdopen(fd, "w") as tmp_file:
+                json.dump(cache, tmp_file)
+            Path(tmp_path).replace(path)
+        except OSError:
+            self.logger.warning("Could not write OAuth token cache to %s.", path)
+            Path(tmp_path).unlink(missing_ok=True)
+
+
+class TokenManager:
+    """Share one authenticator, and so one access token, per set of credentials.
+
+    Accounts configured with the same credentials share their token, and
+    authenticators are created safely by concurrent partition workers.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty token manager."""
+        self._authenticators: dict[tuple[str, str], FlipkartAuthenticator] = {}
+        self._lock = threading.Lock()
+
+    def get_authenticator(
+        self,
+        stream,  # noqa: ANN001
+        account: SellerAccount,
+    ) -> FlipkartAuthenticator:
+        """Return the authenticator of an account's credentials.
+
+        Args:
+            stream: The stream the authenticator is first created for.
+            account: The seller account.
+
+        Returns:
+            The authenticator shared by all accounts with these credentials.
+        """
+        key = (account.client_id, account.client_secret)
+        with self._lock:
+            authenticator = self._authenticators.get(key)
+            if authenticator is None:
+                authenticator = FlipkartAuthenticator.create_for_stream(stream, account)
+                self._authenticators[key] = authenticator
+        return authenticator
+
+    def close(self) -> None:
+        """Cancel the background refreshes of all tokens."""
+        with self._lock:
+            authenticators = list(self._authenticators.values())
+        for authenticator in authenticators:
+            authenticator.close()
@@ -0,0 +1,176 @@
+"""Persistent change detection of records across syncs."""
+
+from __future__ import annotations
+
+import collections
+import hashlib
+import json
+import logging
+import time
+import typing as t
+
+if t.TYPE_CHECKING:
+    import sqlite3
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# Entries of records not seen for this many days are removed on compaction
+DEFAULT_MAX_AGE_DAYS = 30
+# Compaction rebuilds the file once this share of its entries was removed
+VACUUM_RATIO = 0.25
+
+_SCHEMA = (
+    (
+        "CREATE TABLE IF NOT EXISTS records ("
+        "stream TEXT, key INTEGER, hash INTEGER, seen INTEGER, "
+        "PRIMARY KEY (stream, key)) WITHOUT ROWID"
+    ),
+    "CREATE INDEX IF NOT EXISTS records_seen ON records (seen)",
+)
+
+
+def _digest(data: bytes) -> int:
+    digest = hashlib.blake2b(data, digest_size=8).digest()
+    # SQLite integers are signed 64-bit
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def content_hash(record: dict) -> int:
+    """Return a 64-bit hash of the content of a record.
+
+    Args:
+        record: A post-processed record.
+
+    Returns:
+        A hash independent of the order of the record's keys.
+    """
+    if orjson is not None:
+        try:
+            content = orjson.dumps(record, default=str, option=orjson.OPT_SORT_KEYS)
+            return _digest(content)
+        except TypeError:
+            pass
+    return _digest(json.dumps(record, default=str, sort_keys=True).encode())
+
+
+class ChangeIndex:
+    """Remember the content of every record emitted by previous syncs.
+
+    The index maps a 64-bit digest of the primary key of every record to a
+    hash of its content, in a SQLite file kept between syncs. A record is
+    only emitted when its content differs from the last emitted version.
+
+    Changes are saved by :meth:`save` before every STATE message, so the
+    index covers the records emitted up to the bookmarks a failed sync
+    resumes from, and the records emitted after them are emitted again.
+    Once the sync has completed, :meth:`commit` saves the remaining changes
+    and compacts the index: entries not seen for `max_age_days` are removed,
+    then the least recently seen ones above `max_keys`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_age_days: float | None = DEFAULT_MAX_AGE_DAYS,
+        max_keys: int | None = None,
+        logger: logging.Logger | None = None,
+        now: float | None = None,
+    ) -> None:
+        """Open or create an index.
+
+        Args:
+            path: Path of the SQLite file.
+            max_age_days: Days after which entries of records no longer seen
+                are removed, or None to keep them.
+            max_keys: Maximum number of entries kept, or None for no limit.
+            logger: Logger used to report suppressed records and compaction.
+            now: POSIX time of the sync. Defaults to the current time.
+        """
+        # Imported here, as change detection is opt-in
+        import sqlite3  # noqa: PLC0415
+
+        self.path = path
+        self.max_age_days = max_age_days
+        self.max_keys = max_keys
+        self.logger = logger or logging.getLogger(__name__)
+        self.now = int(time.time() if now is None else now)
+        self.suppressed_counts: collections.Counter[str] = collections.Counter()
+        self._connection: sqlite3.Connection = sqlite3.connect(
+            path,
+            check_same_thread=False,
+        )
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        for statement in _SCHEMA:
+            self._connection.execute(statement)
+        self._connection.commit()
+
+    def __len__(self) -> int:
+        """Return the number of entries in the index."""
+        return self._connection.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def offer(self, stream: str, key: tuple, record: dict) -> bool:
+        """Record the content of a record and return whether it changed.
+
+        Args:
+            stream: Name of the record's stream.
+            key: The values identifying the record, such as its primary key.
+            record: The post-processed record.
+
+        Returns:
+            True unless the last emitted version had the same content.
+        """
+        digest = _digest("\x1f".join(map(str, key)).encode())
+        record_hash = content_hash(record)
+        row = self._connection.execute(
+            "SELECT hash FROM records WHERE stream = ? AND key = ?",
+            (stream, digest),
+        ).fetchone()
+        self._connection.execute(
+            "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?)",
+            (stream, digest, record_hash, self.now),
+        )
+        if row is not None and row[0] == record_hash:
+            self.suppressed_counts[stream] += 1
+            return False
+        return True
+
+    def save(self) -> None:
+        """Save the records offered so far, ending the write transaction."""
+        self._connection.commit()
+
+    def commit(self) -> None:
+        """Save the records of this sync and compact the index."""
+        self.save()
+        self.compact()
+
+    def compact(self) -> None:
+        """Remove expired entries and entries above the size limit."""
+        total = len(self)
+        removed = 0
+        with self._connection:
+            if self.max_age_days is not None:
+                expired = self.now - self.max_age_days * 86400
+                removed += self._connection.execute(
+                    "DELETE FROM records WHERE seen < ?",
+                    (expired,),
+                ).rowcount
+            if self.max_keys is not None and total - removed > self.max_keys:
+                removed += self._connection.execute(
+                    "DELETE FROM records WHERE (stream, key) IN ("
+                    "SELECT stream, key FROM records ORDER BY seen LIMIT ?)",
+                    (total - removed - self.max_keys,),
+                ).rowcount
+        if not removed:
+            return
+        self.logger.info("Removed %d entries from the change index.", removed)
+        if removed >= total * VACUUM_RATIO:
+            self._connection.execute("VACUUM")
+
+    def close(self) -> None:
+        """Close the index, discarding changes that were not saved."""
+        self._connection.rollback()
+        self._connection.close()
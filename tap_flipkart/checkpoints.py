@@ -0,0 +1,209 @@
+"""State bookkeeping and checkpoints of Flipkart streams.
+
+Partition workers read and advance the state concurrently with the SDK, so
+state access is serialized by a lock. Partitions synced by request windows
+are bookmarked by the end of their last complete window, along with the
+page cursor within a partially synced window, so interrupted syncs resume
+where they stopped.
+"""
+
+from __future__ import annotations
+
+import datetime
+import functools
+import threading
+import time
+import typing as t
+
+import pendulum
+from singer_sdk.streams import RESTStream
+
+from tap_flipkart.concurrency import run_in_order
+from tap_flipkart.sharding import WINDOW_COMPLETE_KEY, WINDOW_END_KEY
+
+# Partition state key of the page cursor within a partially synced window
+PAGE_CURSOR_KEY = "page_cursor"
+
+
+class CheckpointedStream(RESTStream):
+    """A REST stream with thread-safe state and window checkpoints."""
+
+    def __init__(self, *args: t.Any, **kwargs: t.Any) -> None:
+        """Initialize the stream.
+
+        Args:
+            args: Positional arguments for the SDK stream.
+            kwargs: Keyword arguments for the SDK stream.
+        """
+        super().__init__(*args, **kwargs)
+        # Partition workers read and advance state concurrently with the SDK
+        self._state_lock = threading.RLock()
+        self._last_checkpoint = float("-inf")
+        # Set while records are written to batch files
+        self._batching = False
+
+    def get_context_state(self, context: dict | None) -> dict:
+        """Return a writable state dict for the given context.
+
+        Args:
+            context: Stream partition or context dictionary.
+
+        Returns:
+            A partitioned context state if applicable; else returns stream state.
+        """
+        with self._state_lock:
+            return super().get_context_state(context)
+
+    def _increment_stream_state(
+        self,
+        latest_record: dict[str, t.Any],
+        *,
+        context: dict | None = None,
+    ) -> None:
+        if context is not None and self.bookmarks_windows(context):
+            return
+        with self._state_lock:
+            super()._increment_stream_state(latest_record, context=context)
+
+    def bookmarks_windows(self, context: dict) -> bool:  # noqa: ARG002
+        """Return True if a partition is bookmarked by :meth:`checkpoint`.
+
+        The replication key values of the records of such partitions are not
+        tracked.
+
+        Args:
+            context: Stream partition context.
+
+        Returns:
+            False, by default.
+        """
+        return False
+
+    def get_starting_timestamp(self, context: dict | None) -> datetime.datetime | None:
+        """Return the start of the sync of a partition.
+
+        Args:
+            context: Stream partition or context dictionary.
+
+        Returns:
+            The last checkpoint of the partition, if any, or else its
+            replication key bookmark or the `start_date`.
+        """
+        with self._state_lock:
+            window_end = self.get_context_state(context).get(WINDOW_END_KEY)
+        if window_end:
+            return pendulum.parse(window_end)
+        return super().get_starting_timestamp(context)
+
+    def checkpoint(self, context: dict | None, value: str) -> None:
+        """Record that all records of a partition up to `value` were emitted.
+
+        Used for partitions whose progress is tracked by request windows rather
+        than by the replication key of their records. The bookmark is kept
+        under its own `window_end` state key, as the window ends are not
+        comparable with the replication key values of the records. It is
+        resumable at once, so an interrupted sync restarts from the last
+        checkpoint. A STATE message is written at most every
+        `checkpoints.interval_seconds`.
+
+        When partitions are prefetched, the checkpoint is applied by the
+        consuming thread once the records before it have been written.
+
+        Args:
+            context: Stream partition or context dictionary.
+            value: The new replication key value.
+        """
+        run_in_order(functools.partial(self._write_checkpoint, context, value))
+
+    def _write_checkpoint(self, context: dict | None, value: str) -> None:
+        with self._state_lock:
+            state = self.get_context_state(context)
+            state[WINDOW_END_KEY] = value
+            state.pop(PAGE_CURSOR_KEY, None)
+        self._flush_checkpoint()
+
+    def complete_window(self, context: dict) -> None:
+        """Record that all records of a sharded partition window were emitted.
+
+        Args:
+            context: Partition context of the window.
+        """
+
+        def write_complete() -> None:
+            with self._state_lock:
+                state = self.get_context_state(context)
+                state["replication_key"] = self.replication_key
+                state[WINDOW_COMPLETE_KEY] = True
+
+        run_in_order(write_complete)
+
+    def checkpoint_page(
+        self,
+        context: dict | None,
+        window: tuple[datetime.datetime, datetime.datetime],
+        next_page_token: t.Any,  # noqa: ANN401
+    ) -> None:
+        """Record the pagination cursor of a partially synced request window.
+
+        Args:
+            context: Stream partition or context dictionary.
+            window: The `(start, end)` request window.
+            next_page_token: Token of the next page within the window.
+        """
+        cursor = {
+            "start": window[0].isoformat(),
+            "end": window[1].isoformat(),
+            "next_page_token": next_page_token,
+        }
+
+        def write_cursor() -> None:
+            with self._state_lock:
+                self.get_context_state(context)[PAGE_CURSOR_KEY] = cursor
+            self._flush_checkpoint()
+
+        run_in_order(write_cursor)
+
+    def pop_page_cursor(
+        self,
+        context: dict | None,
+        start: datetime.datetime,
+    ) -> tuple[datetime.datetime, datetime.datetime, t.Any] | None:
+        """Remove and return the page cursor of the window starting at `start`.
+
+        Args:
+            context: Stream partition or context dictionary.
+            start: Start of the first window to request.
+
+        Returns:
+            The window and the token of its next page, or None if no cursor
+            was saved for this window.
+        """
+        with self._state_lock:
+            cursor = self.get_context_state(context).pop(PAGE_CURSOR_KEY, None)
+        if not cursor:
+            return None
+        window_start = datetime.datetime.fromisoformat(cursor["start"])
+        if window_start != start:
+            return None
+        window_end = datetime.datetime.fromisoformat(cursor["end"])
+        return window_start, window_end, cursor["next_page_token"]
+
+    def _flush_checkpoint(self) -> None:
+        if self._batching:
+            # Written with the next BATCH message, once its records are in files
+            return
+        interval = (self.config.get("checkpoints") or {}).get("interval_seconds", 0)
+        now = time.monotonic()
+        if interval and now - self._last_checkpoint < interval:
+            return
+        self._last_checkpoint = now
+        self._is_state_flushed = False
+        self._write_state_message()
+
+    def _find_partition_state(self, context: dict) -> dict | None:
+        """Return the state of a partition, without adding it."""
+        with self._state_lock:
+            for partition in self.stream_state.get("partitions", []):
+                if partition["context"] == context:
+                    return partition
+        return None
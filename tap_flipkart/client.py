@@ -2,54 +2,412 @@
 
 from __future__ import annotations
 
+import datetime
+import functools
+import importlib.util
+import json
+import typing as t
+from functools import cached_property
 from pathlib import Path
 from typing import Callable
-from tap_flipkart.auth import FlipkartAuthenticator
 
 import requests
-from singer_sdk.pagination import BaseAPIPaginator  # noqa: TCH002
-from singer_sdk.streams import RESTStream
+import singer_sdk._singerlib as singer
+from singer_sdk.batch import Batcher
+from singer_sdk.exceptions import ConfigValidationError
+from singer_sdk.helpers._batch import (
+    BaseBatchFileEncoding,
+    BatchConfig,
+    BatchFileFormat,
+)
+from singer_sdk.helpers._typing import TypeConformanceLevel
+from singer_sdk.helpers._util import utc_now
 
-# from tap_flipkart.auth import FlipkartAuthenticator
+from tap_flipkart.accounts import ACCOUNT_KEY, account_partitions, get_account_id
+from tap_flipkart.cadence import LAST_SYNCED_KEY
+from tap_flipkart.checkpoints import CheckpointedStream
+from tap_flipkart.conformance import RecordConformer
 from tap_flipkart.paginator import FlipkartPaginator
+from tap_flipkart.replay import ReplayableStream
+from tap_flipkart.sharding import base_context
+
+if t.TYPE_CHECKING:
+    from singer_sdk.pagination import BaseAPIPaginator
+
+    from tap_flipkart.concurrency import PartitionFetcher
+    from tap_flipkart.dedup import RecordDeduplicator
 
 _Auth = Callable[[requests.PreparedRequest], requests.PreparedRequest]
 SCHEMAS_DIR = Path(__file__).parent / Path("./schemas")
+DEFAULT_API_URL = "https://api.flipkart.net"
+API_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+
+
+@functools.lru_cache(maxsize=None)
+def _read_schema(name: str) -> bytes:
+    return (SCHEMAS_DIR / f"{name}.json").read_bytes()
+
+
+def load_schema(name: str) -> dict:
+    """Return the JSON schema of a stream.
+
+    Schema files are read once per process, but every call returns a newly
+    parsed schema, so streams never share a mutable schema.
+
+    Args:
+        name: The stream name, the stem of its file in `schemas/`.
+
+    Returns:
+        The JSON schema.
+    """
+    return json.loads(_read_schema(name))
+
+
+class FlipkartStream(CheckpointedStream, ReplayableStream):
+    """Flipkart stream class.
+
+    Requests are made by the engine of :class:`PagedStream`, state is kept by
+    :class:`CheckpointedStream` and archived pages are replayed by
+    :class:`ReplayableStream`.
+    """
 
+    #: Drop records already emitted by another partition in a newer version.
+    deduplicate_records: bool = False
 
-class FlipkartStream(RESTStream):
-    """Flipkart stream class."""
+    #: Queue parent contexts with `queue_parent_context` to sync them in
+    #: batches, rather than syncing every parent record's context.
+    batches_parent_contexts: bool = False
+
+    def __init__(self, tap, name=None, schema=None, path=None) -> None:  # noqa: ANN001
+        """Initialize the REST stream.
+
+        Args:
+            tap: Singer Tap this stream belongs to.
+            name: Name of this stream.
+            schema: JSON schema for records in this stream. Defaults to the
+                stream's file in `schemas/`.
+            path: URL path for this entity stream.
+        """
+        if schema is None:
+            schema = load_schema(name or self.name)
+        super().__init__(tap, name=name, schema=schema, path=path)
+        self._partition_fetcher: PartitionFetcher | None = None
+        self._shard_partitions: list[dict] | None = None
+        self._due_partitions: list[dict] | None = None
 
     @property
     def url_base(self) -> str:
         """Return the API URL root, configurable via tap settings."""
-        return "https://api.flipkart.net/sellers"
-    
+        return f"{self.config.get('api_url', DEFAULT_API_URL)}/sellers"
 
     records_jsonpath = "$[*]"  # Or override `parse_response`.
 
     # Set this value or override `get_new_paginator`.
     next_page_token_jsonpath = "$.nextPageUrl"  # noqa: S105
 
-    @property
-    def authenticator(self) -> FlipkartAuthenticator:
-        """Return a new authenticator object.
+    @staticmethod
+    def format_api_date(value: datetime.datetime) -> str:
+        """Format a datetime the way Flipkart date filters expect it.
+
+        Args:
+            value: A timezone-aware datetime.
+
+        Returns:
+            The UTC timestamp as a string.
+        """
+        return value.astimezone(datetime.timezone.utc).strftime(API_DATE_FORMAT)
+
+    def shard_units(self, partitions: list[dict]) -> list[dict]:
+        """Return the units of work a sharded sync distributes over shards.
+
+        Args:
+            partitions: The partitions of the stream.
+
+        Returns:
+            Partition contexts, by default the partitions themselves.
+        """
+        return partitions
+
+    def select_shard_partitions(self, partitions: list[dict]) -> list[dict]:
+        """Return the partitions synced by the shard of this process.
+
+        The selection is made once per sync, so every part of the SDK sees
+        the same partitions.
+
+        Args:
+            partitions: The partitions of the stream.
+
+        Returns:
+            All of `partitions` when sharding is not configured.
+        """
+        plan = self._tap.shard_plan
+        if plan is None:
+            return partitions
+        if self._shard_partitions is None:
+            units = self.shard_units(partitions)
+            self._shard_partitions = plan.select(self.name, units)
+            self.logger.info(
+                "Shard %d of %d syncs %d units of '%s'.",
+                plan.shard_index,
+                plan.shard_count,
+                len(self._shard_partitions),
+                self.name,
+            )
+        return self._shard_partitions
+
+    def partition_name(self, context: dict) -> str | None:  # noqa: ARG002
+        """Return the name of a partition in `sync_cadence` rules.
+
+        Args:
+            context: Stream partition context.
+
+        Returns:
+            The name of the partition, by default None.
+        """
+        return None
+
+    def select_due_partitions(self, partitions: list[dict]) -> list[dict]:
+        """Return the partitions due for a sync according to `sync_cadence`.
+
+        The selection is made once per sync, so every part of the SDK sees
+        the same partitions.
+
+        Args:
+            partitions: The partitions of the stream.
+
+        Returns:
+            All of `partitions` when no cadence is configured.
+        """
+        cadence = self._tap.sync_cadence
+        if cadence is None:
+            return partitions
+        if self._due_partitions is None:
+            self._due_partitions = [
+                partition
+                for partition in partitions
+                if cadence.is_due(
+                    self.name,
+                    self.partition_name(partition),
+                    self._find_partition_state(partition),
+                )
+            ]
+            skipped = len(partitions) - len(self._due_partitions)
+            if skipped:
+                self.logger.info(
+                    "Skipping %d of %d partitions of '%s' that are not due.",
+                    skipped,
+                    len(partitions),
+                    self.name,
+                )
+        return self._due_partitions
+
+    def _sync_records(
+        self,
+        context: dict | None = None,
+        *,
+        write_messages: bool = True,
+    ) -> t.Generator[dict, t.Any, t.Any]:
+        if context is None and self.partitions == []:
+            # The SDK would otherwise sync the stream without a partition
+            self.logger.info("No partitions of '%s' to sync.", self.name)
+            return
+        yield from super()._sync_records(context, write_messages=write_messages)
+
+    @cached_property
+    def record_conformer(self) -> RecordConformer:
+        """Return the compiled type conformance of this stream's records.
+
+        Built on first use, once the catalog selection is known.
 
         Returns:
-            An authenticator instance.
+            A conformer for the stream schema and selection mask.
         """
-        return FlipkartAuthenticator.create_for_stream(
-            self,
+        trusted_fields = (self.config.get("trusted_fields") or {}).get(self.name, [])
+        conformer = RecordConformer(
+            self.name,
+            self.schema,
+            self.mask,
+            trusted_fields=trusted_fields,
+            logger=self.logger,
         )
+        if conformer.trusted_fields:
+            self.logger.info(
+                "Passing fields %s of '%s' through without type conformance.",
+                sorted(conformer.trusted_fields),
+                self.name,
+            )
+        return conformer
+
+    def _generate_record_messages(
+        self,
+        record: dict,
+    ) -> t.Generator[singer.RecordMessage, None, None]:
+        """Write out a RECORD message.
+
+        Deselected properties are removed and values are conformed to the
+        schema by converters compiled once per stream, rather than by the
+        SDK's per-record walk of the schema.
+
+        Args:
+            record: A single stream record.
+
+        Yields:
+            Record message objects.
+        """
+        if self.TYPE_CONFORMANCE_LEVEL != TypeConformanceLevel.RECURSIVE:
+            yield from super()._generate_record_messages(record)
+            return
+        profile = self.sync_profile
+        if profile is None:
+            record = self.record_conformer(record)
+        else:
+            from tap_flipkart.instrumentation import Measurement  # noqa: PLC0415
+
+            with profile.timer(Measurement.CONFORM, self.name, self._partition_context):
+                record = self.record_conformer(record)
+        for stream_map in self.stream_maps:
+            mapped_record = stream_map.transform(record)
+            # Emit record if not filtered
+            if mapped_record is not None:
+                yield singer.RecordMessage(
+                    stream=stream_map.stream_alias,
+                    record=mapped_record,
+                    version=None,
+                    time_extracted=utc_now(),
+                )
+
+    def _write_record_message(self, record: dict) -> None:
+        """Write out a RECORD message, timing writes when instrumentation is on.
+
+        Args:
+            record: A single stream record.
+        """
+        profile = self.sync_profile
+        if profile is None:
+            super()._write_record_message(record)
+            return
+        from tap_flipkart.instrumentation import Measurement  # noqa: PLC0415
+
+        partition = self._partition_context
+        for record_message in self._generate_record_messages(record):
+            with profile.timer(Measurement.WRITE, self.name, partition):
+                self._tap.write_message(record_message)
+        self._is_state_flushed = False
+
+    def get_batches(
+        self,
+        batch_config: BatchConfig,
+        context: dict | None = None,
+    ) -> t.Iterable[tuple[BaseBatchFileEncoding, list[str]]]:
+        """Write the records of a partition to batch files.
+
+        Records are conformed to the schema and selection like RECORD
+        messages. JSON Lines files are written by :class:`JSONLinesBatcher`,
+        other formats by the SDK's batchers. Checkpoints only update the
+        state while batching, as the SDK writes the state after every BATCH
+        message.
+
+        Args:
+            batch_config: Batch config for this stream.
+            context: Stream partition or context dictionary.
+
+        Yields:
+            A tuple of (encoding, manifest) for each batch.
+
+        Raises:
+            ConfigValidationError: If the parquet format is configured without
+                pyarrow installed.
+        """
+        if batch_config.encoding.format == BatchFileFormat.PARQUET and (
+            importlib.util.find_spec("pyarrow") is None
+        ):
+            msg = "The parquet batch format requires the `parquet` extra"
+            raise ConfigValidationError(msg)
+        if batch_config.encoding.format == BatchFileFormat.JSONL:
+            from tap_flipkart.batching import JSONLinesBatcher  # noqa: PLC0415
+
+            batcher_class = JSONLinesBatcher
+        else:
+            batcher_class = Batcher
+        batcher = batcher_class(
+            tap_name=self.tap_name,
+            stream_name=self.name,
+            batch_config=batch_config,
+        )
+        records = self._sync_records(context, write_messages=False)
+        if self.TYPE_CONFORMANCE_LEVEL == TypeConformanceLevel.RECURSIVE:
+            records = map(self.record_conformer, records)
+        self._batching = True
+        try:
+            for manifest in batcher.get_batches(records=records):
+                yield batch_config.encoding, manifest
+        finally:
+            self._batching = False
+
+    @cached_property
+    def record_deduplicator(self) -> RecordDeduplicator | None:
+        """Return the in-run de-duplication index of this stream.
+
+        Returns:
+            An index shared by all partitions of the current sync, or None when
+            the stream is not de-duplicated.
+        """
+        dedup_config = self.config.get("deduplication") or {}
+        if not self.deduplicate_records or not dedup_config.get("enabled", True):
+            return None
+        from tap_flipkart.dedup import DEFAULT_MAX_MEMORY_KEYS, RecordDeduplicator  # noqa: PLC0415
+
+        return RecordDeduplicator(
+            max_memory_keys=dedup_config.get(
+                "max_memory_keys",
+                DEFAULT_MAX_MEMORY_KEYS,
+            ),
+            spill_directory=dedup_config.get("spill_directory"),
+            logger=self.logger,
+        )
+
+    def _close_record_deduplicator(self) -> None:
+        deduplicator = self.__dict__.pop("record_deduplicator", None)
+        if deduplicator is None:
+            return
+        if deduplicator.suppressed_count:
+            self.logger.info(
+                "Skipped %d records of '%s' already emitted in a newer version.",
+                deduplicator.suppressed_count,
+                self.name,
+            )
+            from tap_flipkart.instrumentation import FlipkartMetric, log_metric  # noqa: PLC0415
+
+            log_metric(
+                FlipkartMetric.DUPLICATE_RECORDS,
+                deduplicator.suppressed_count,
+                metric_type="counter",
+                stream=self.name,
+            )
+        deduplicator.close()
+
+    def get_account_partitions(self, partitions: list[dict]) -> list[dict]:
+        """Return the partitions of a stream for every synced account.
+
+        Args:
+            partitions: The partitions of a single account.
+
+        Returns:
+            `partitions` per account, keyed by `account_id` when the
+            `accounts` setting is used.
+        """
+        return account_partitions(list(self._tap.accounts.values()), partitions)
 
     @property
     def http_headers(self) -> dict:
         """Return the http headers needed.
 
+        The `Authorization` header is applied by the authenticator.
+
         Returns:
             A dictionary of HTTP headers.
         """
-        headers = {"Authorization": f"Bearer {self.authenticator.access_token}"}
+        headers = {}
         if "user_agent" in self.config:
             headers["User-Agent"] = self.config.get("user_agent")
         return headers
@@ -67,5 +425,175 @@ class FlipkartStream(RESTStream):
         Returns:
             A pagination helper instance.
         """
-        return FlipkartPaginator(self.next_page_token_jsonpath) 
+        return FlipkartPaginator(self.next_page_token_jsonpath)
+
+    def get_records(self, context: dict | None) -> t.Iterable[dict[str, t.Any]]:
+        """Return a generator of record-type dictionary objects.
+
+        When `max_concurrent_partitions` is greater than one, all partitions are
+        fetched in a bounded thread pool on the first call and each call then
+        drains the prefetched records of its own partition, preserving partition
+        order.
+
+        Streams with `deduplicate_records` set drop records of which an equal
+        or newer version was already emitted by an earlier partition. With
+        `change_detection` enabled, records whose content is unchanged since
+        they were last emitted are dropped too. Dropped records still advance
+        the bookmark of their own partition.
+
+        With `sync_cadence` set, the start of the sync is saved in the state
+        of every partition once all its records were emitted. Child streams
+        batching parent contexts sync what is left of their queues once the
+        records of a partition were emitted.
+
+        With instrumentation enabled, the measurements of the partition are
+        written as metrics once it completes.
+
+        Args:
+            context: Stream partition or context dictionary.
+
+        Yields:
+            One item per (possibly processed) record in the API.
+        """
+        self._partition_local.context = context
+        records = self._get_unique_records(context)
+        if self._tap.change_index is not None:
+            records = self._get_changed_records(records, context)
+        yield from records
+        self._flush_child_batches()
+        cadence = self._tap.sync_cadence
+        if cadence is not None and context is not None and self.partitions:
+            # Kept on the whole partition, which is what cadence rules select
+            with self._state_lock:
+                self.get_context_state(base_context(context))[LAST_SYNCED_KEY] = (
+                    cadence.started_at
+                )
+        profile = self.sync_profile
+        if profile is not None:
+            profile.log_partition(self.name, context)
+
+    def _sync_children(self, child_context: dict | None) -> None:
+        if child_context is None:
+            super()._sync_children(child_context)
+            return
+        for child_stream in self.child_streams:
+            if not (child_stream.selected or child_stream.has_selected_descendents):
+                continue
+            if child_stream.batches_parent_contexts:
+                child_stream.queue_parent_context(child_context)
+            else:
+                child_stream.sync(context=child_context)
+
+    def _flush_child_batches(self) -> None:
+        for child_stream in self.child_streams:
+            if child_stream.batches_parent_contexts and (
+                child_stream.selected or child_stream.has_selected_descendents
+            ):
+                child_stream.flush_parent_contexts()
+
+    def _get_unique_records(
+        self,
+        context: dict | None,
+    ) -> t.Iterable[dict[str, t.Any]]:
+        deduplicator = self.record_deduplicator
+        if deduplicator is None:
+            yield from self._get_partition_records(context)
+            return
+
+        partitions = self.partitions
+        last_partition = context is None or not partitions or context == partitions[-1]
+        try:
+            for record in self._get_partition_records(context):
+                # Accounts may share primary key values
+                key = (
+                    record.get(ACCOUNT_KEY),
+                    *(record.get(k) for k in self.primary_keys),
+                )
+                if deduplicator.offer(key, record.get(self.replication_key)):
+                    yield record
+                else:
+                    self._increment_stream_state(record, context=context)
+        except BaseException:
+            last_partition = True
+            raise
+        finally:
+            if last_partition:
+                self._close_record_deduplicator()
+
+    def _write_state_message(self) -> None:
+        """Write out a STATE message, saving the change index up to it first."""
+        change_index = self._tap.change_index
+        if change_index is not None:
+            # The records offered so far were all emitted before this message
+            change_index.save()
+        super()._write_state_message()
+
+    def _get_changed_records(
+        self,
+        records: t.Iterable[dict[str, t.Any]],
+        context: dict | None,
+    ) -> t.Iterable[dict[str, t.Any]]:
+        change_index = self._tap.change_index
+        for record in records:
+            # Accounts may share primary key values
+            key = (record.get(ACCOUNT_KEY), *(record.get(k) for k in self.primary_keys))
+            if change_index.offer(self.name, key, record):
+                yield record
+            else:
+                self._increment_stream_state(record, context=context)
+
+    def _get_partition_records(
+        self,
+        context: dict | None,
+    ) -> t.Iterable[dict[str, t.Any]]:
+        max_workers = self.config.get("max_concurrent_partitions", 1)
+        partitions = self.partitions
+        if context is None or max_workers <= 1 or not partitions:
+            yield from self._fetch_partition(context)
+            return
+
+        fetcher = self._partition_fetcher
+        if fetcher is None or not fetcher.has_partition(context):
+            if context not in partitions:
+                yield from self._fetch_partition(context)
+                return
+            if fetcher is not None:
+                fetcher.close()
+            from tap_flipkart.concurrency import PartitionFetcher  # noqa: PLC0415
+
+            pending = partitions[partitions.index(context) :]
+            # Workers read their starting bookmark before the SDK reaches them
+            for partition in pending:
+                self._write_starting_replication_value(partition)
+            fetcher = PartitionFetcher(
+                self._fetch_partition,
+                pending,
+                max_workers=min(max_workers, len(pending)),
+                logger=self.logger,
+            )
+            self._partition_fetcher = fetcher
+            self.logger.info(
+                "Fetching %d partitions of '%s' with up to %d workers.",
+                len(pending),
+                self.name,
+                max_workers,
+            )
+
+        yield from fetcher.records(context)
+        if fetcher.finished:
+            self._partition_fetcher = None
 
+    def _fetch_partition(
+        self,
+        context: dict | None,
+    ) -> t.Iterable[dict[str, t.Any]]:
+        # Runs in a partition worker thread when partitions are prefetched
+        self._partition_local.context = context
+        records = super().get_records(context)
+        account_id = get_account_id(context)
+        if account_id is None:
+            yield from records
+            return
+        for record in records:
+            record[ACCOUNT_KEY] = account_id
+            yield record
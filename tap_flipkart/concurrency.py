@@ -0,0 +1,317 @@
+"""Concurrent partition fetching for Flipkart streams."""
+
+from __future__ import annotations
+
+import collections
+import copy
+import logging
+import queue
+import threading
+import typing as t
+
+# Maximum number of records buffered per partition before its worker blocks.
+PARTITION_BUFFER_SIZE = 1000
+
+# Items a `Prefetcher` runs ahead of its consumer by default.
+PREFETCH_QUEUE_DEPTH = 2
+
+_PUT_TIMEOUT = 0.1
+
+# Set in partition worker threads to the function queueing their items
+_worker = threading.local()
+
+
+class _PartitionDone:
+    """Sentinel marking the end of a partition's records."""
+
+
+class _PartitionError:
+    """Wrapper carrying an exception raised by a partition worker."""
+
+    def __init__(self, exception: BaseException) -> None:
+        self.exception = exception
+
+
+class _Callback:
+    """Wrapper carrying a function to run in the consuming thread."""
+
+    def __init__(self, callback: t.Callable[[], None]) -> None:
+        self.callback = callback
+
+
+def run_in_order(callback: t.Callable[[], None]) -> None:
+    """Run `callback` once the records yielded before it have been consumed.
+
+    In a :class:`PartitionFetcher` worker the callback is queued behind the
+    records of its partition and run by the thread consuming them. Anywhere
+    else the records were consumed already, and the callback runs at once.
+    This keeps state updates, such as bookmarks, in the consuming thread and
+    behind the records they cover. When fetchers are nested, the callback is
+    passed on until it reaches the outermost consumer.
+
+    Args:
+        callback: Function to run.
+    """
+    put = getattr(_worker, "put", None)
+    if put is None:
+        callback()
+    else:
+        put(_Callback(callback))
+
+
+class PartitionFetcher:
+    """Fetch stream partitions in a bounded thread pool.
+
+    Partitions are submitted to the pool in order, each writing its records to
+    its own bounded queue. Consumers read one partition at a time through
+    :meth:`records`, so records come out in partition order and per-partition
+    state bookkeeping in the SDK is unaffected.
+    """
+
+    def __init__(
+        self,
+        fetch: t.Callable[[dict], t.Iterable[dict]],
+        partitions: list[dict],
+        max_workers: int,
+        buffer_size: int = PARTITION_BUFFER_SIZE,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        """Start fetching all partitions.
+
+        Args:
+            fetch: Callable returning the records of a single partition.
+            partitions: Partition contexts, in the order they will be consumed.
+            max_workers: Maximum number of partitions fetched at the same time.
+            buffer_size: Maximum number of buffered records per partition.
+            logger: Logger used to report progress.
+        """
+        self.logger = logger or logging.getLogger(__name__)
+        self._partitions = list(partitions)
+        self._consumed = [False] * len(self._partitions)
+        self._queues: list[queue.Queue] = [
+            queue.Queue(maxsize=buffer_size) for _ in self._partitions
+        ]
+        self._stop = threading.Event()
+        # Imported here, as partitions are fetched concurrently on request
+        from concurrent.futures import ThreadPoolExecutor  # noqa: PLC0415
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="flipkart-partition",
+        )
+        for index, context in enumerate(self._partitions):
+            self._executor.submit(
+                self._work,
+                fetch,
+                copy.deepcopy(context),
+                self._queues[index],
+            )
+
+    @property
+    def finished(self) -> bool:
+        """Return True once every partition has been consumed."""
+        return all(self._consumed)
+
+    def has_partition(self, context: dict | None) -> bool:
+        """Check whether a partition is still pending consumption.
+
+        Args:
+            context: Stream partition context.
+
+        Returns:
+            True if the partition was prefetched and not yet consumed.
+        """
+        return self._index(context) is not None
+
+    def records(self, context: dict) -> t.Iterator[dict]:
+        """Yield the records of a prefetched partition.
+
+        Args:
+            context: Stream partition context.
+
+        Yields:
+            Each record of the partition, in the order it was fetched.
+
+        Raises:
+            KeyError: If the partition is not pending in this fetcher.
+        """
+        index = self._index(context)
+        if index is None:
+            msg = f"Partition {context} is not pending in this fetcher."
+            raise KeyError(msg)
+        self._consumed[index] = True
+        partition_queue = self._queues[index]
+        completed = False
+        try:
+            while True:
+                item = partition_queue.get()
+                if isinstance(item, _PartitionDone):
+                    completed = True
+                    return
+                if isinstance(item, _PartitionError):
+                    raise item.exception
+                if isinstance(item, _Callback):
+                    # Passed on to the consumer of this thread, if any
+                    run_in_order(item.callback)
+                    continue
+                yield item
+        finally:
+            if not completed or self.finished:
+                self.close()
+
+    def close(self, *, wait: bool = False) -> None:
+        """Stop all workers and release the pool.
+
+        Args:
+            wait: Wait for the running workers to stop, which they do once
+                their current request returns.
+        """
+        self._stop.set()
+        # Queued workers return immediately once the stop event is set
+        self._executor.shutdown(wait=wait)
+
+    def _index(self, context: dict | None) -> int | None:
+        for index, partition in enumerate(self._partitions):
+            if not self._consumed[index] and partition == context:
+                return index
+        return None
+
+    def _put(self, partition_queue: queue.Queue, item: t.Any) -> bool:  # noqa: ANN401
+        while not self._stop.is_set():
+            try:
+                partition_queue.put(item, timeout=_PUT_TIMEOUT)
+            except queue.Full:
+                continue
+            return True
+        return False
+
+    def _work(
+        self,
+        fetch: t.Callable[[dict], t.Iterable[dict]],
+        context: dict,
+        partition_queue: queue.Queue,
+    ) -> None:
+        if self._stop.is_set():
+            return
+        self.logger.debug("Fetching partition %s", context)
+        _worker.put = lambda item: self._put(partition_queue, item)
+        try:
+            for record in fetch(context):
+                if not self._put(partition_queue, record):
+                    return
+        except Exception as ex:  # noqa: BLE001
+            self._put(partition_queue, _PartitionError(ex))
+            return
+        finally:
+            del _worker.put
+        self._put(partition_queue, _PartitionDone())
+
+
+class Prefetcher:
+    """Run an iterator ahead of its consumer in a background thread.
+
+    Items are buffered until `queue_depth` items, or `max_buffer_bytes` as
+    measured by `size`, are waiting, and then the producer blocks. A single
+    item larger than the byte limit is still buffered on its own. Items come
+    out in order, and an exception raised by the iterator is raised to the
+    consumer after the items before it. Closing the consumer stops the
+    producer at its next item.
+    """
+
+    def __init__(
+        self,
+        items: t.Iterable[t.Any],
+        queue_depth: int = PREFETCH_QUEUE_DEPTH,
+        max_buffer_bytes: int | None = None,
+        size: t.Callable[[t.Any], int] | None = None,
+        name: str = "flipkart-prefetch",
+    ) -> None:
+        """Start iterating `items` in a background thread.
+
+        Args:
+            items: The items to prefetch.
+            queue_depth: Maximum number of buffered items.
+            max_buffer_bytes: Maximum total size of buffered items, if any.
+            size: Returns the size of an item in bytes. Required with
+                `max_buffer_bytes`.
+            name: Name of the producer thread.
+        """
+        self.queue_depth = max(queue_depth, 1)
+        self.max_buffer_bytes = max_buffer_bytes
+        self._size = size
+        self._condition = threading.Condition()
+        self._buffer: collections.deque[tuple[t.Any, int]] = collections.deque()
+        self._buffered_bytes = 0
+        self._error: BaseException | None = None
+        self._done = False
+        self._stopped = False
+        self._thread = threading.Thread(
+            target=self._produce,
+            args=(items,),
+            name=name,
+            daemon=True,
+        )
+        self._thread.start()
+
+    def __iter__(self) -> t.Iterator[t.Any]:
+        """Yield the prefetched items in order.
+
+        Yields:
+            Each item of the iterator.
+        """
+        try:
+            while True:
+                with self._condition:
+                    while not self._buffer and not self._done:
+                        self._condition.wait()
+                    if not self._buffer:
+                        if self._error is not None:
+                            raise self._error
+                        return
+                    item, size = self._buffer.popleft()
+                    self._buffered_bytes -= size
+                    self._condition.notify_all()
+                yield item
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Stop the producer and drop the buffered items."""
+        with self._condition:
+            self._stopped = True
+            self._buffer.clear()
+            self._condition.notify_all()
+
+    def _is_full(self, size: int) -> bool:
+        if not self._buffer:
+            return False
+        if len(self._buffer) >= self.queue_depth:
+            return True
+        return (
+            self.max_buffer_bytes is not None
+            and self._buffered_bytes + size > self.max_buffer_bytes
+        )
+
+    def _produce(self, items: t.Iterable[t.Any]) -> None:
+        iterator = iter(items)
+        try:
+            for item in iterator:
+                size = self._size(item) if self._size is not None else 0
+                with self._condition:
+                    while not self._stopped and self._is_full(size):
+                        self._condition.wait()
+                    if self._stopped:
+                        return
+                    self._buffer.append((item, size))
+                    self._buffered_bytes += size
+                    self._condition.notify_all()
+        except BaseException as ex:  # noqa: BLE001
+            with self._condition:
+                self._error = ex
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+            with self._condition:
+                self._done = True
+                self._condition.notify_all()
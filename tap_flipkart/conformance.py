@@ -0,0 +1,210 @@
+"""Compiled record type conformance for Flipkart streams."""
+
+from __future__ import annotations
+
+import logging
+import typing as t
+
+from singer_sdk.helpers._typing import (
+    _conform_primitive_property,
+    is_boolean_type,
+    is_object_type,
+    is_uniform_list,
+)
+
+if t.TYPE_CHECKING:
+    from singer_sdk._singerlib import SelectionMask
+
+# Values of these types are already JSON compatible unless the schema is boolean
+_NATIVE_TYPES = frozenset((str, int, float, bool, type(None), list, dict))
+
+# How a field is converted
+_PASSTHROUGH, _BOOLEAN, _OBJECT, _LIST = range(4)
+
+_ObjectConverter = t.Callable[[dict, t.Optional[str], t.List[str]], dict]
+
+
+def _conform_primitive(value: t.Any, schema: dict, kind: int) -> t.Any:  # noqa: ANN401
+    if type(value) in _NATIVE_TYPES:
+        if kind == _BOOLEAN:
+            return None if value is None else value != 0
+        return value
+    return _conform_primitive_property(value, schema)
+
+
+class RecordConformer:
+    """Conform records to a stream schema with converters compiled once.
+
+    Produces the same records as the SDK's `pop_deselected_record_properties`
+    followed by recursive `conform_record_data_types`, without walking the
+    schema for every record. The schema and selection mask are resolved into
+    nested per-object converters when the conformer is created, and values
+    that are already JSON compatible are copied without any function call.
+    """
+
+    def __init__(
+        self,
+        stream_name: str,
+        schema: dict,
+        mask: SelectionMask,
+        *,
+        trusted_fields: t.Iterable[str] = (),
+        logger: logging.Logger | None = None,
+    ) -> None:
+        """Compile the converters of a stream.
+
+        Args:
+            stream_name: Name of the stream, used in warnings.
+            schema: The stream schema.
+            mask: Property selection mask of the stream.
+            trusted_fields: Top-level properties passed through unchanged.
+                Fields with deselected sub-properties are still conformed.
+            logger: Logger used to report properties missing from the schema.
+        """
+        self.stream_name = stream_name
+        self.logger = logger or logging.getLogger(__name__)
+        self._mask = mask
+        self.trusted_fields = {
+            name
+            for name in trusted_fields
+            if self._fully_selected(
+                ("properties", name),
+                schema["properties"].get(name),
+            )
+        }
+        self._warned: set[tuple[str, ...]] = set()
+        self._conform = self._object_converter(schema, (), self.trusted_fields)
+
+    def __call__(self, record: dict) -> dict:
+        """Return the conformed copy of a record.
+
+        Args:
+            record: A record as returned by `get_records`.
+
+        Returns:
+            The record without deselected and unknown properties, and with
+            values converted to JSON compatible types.
+        """
+        unmapped: list[str] = []
+        output = self._conform(record, None, unmapped)
+        if unmapped:
+            key = tuple(unmapped)
+            # Unlike the SDK, warn once rather than for every record
+            if key not in self._warned:
+                self._warned.add(key)
+                self.logger.warning(
+                    "Properties %s were present in the '%s' stream but "
+                    "not found in catalog schema. Ignoring.",
+                    key,
+                    self.stream_name,
+                )
+        return output
+
+    def _fully_selected(self, breadcrumb: tuple[str, ...], schema: dict | None) -> bool:
+        if schema is None or not self._mask[breadcrumb]:
+            return False
+        return all(
+            self._fully_selected((*breadcrumb, "properties", name), sub_schema)
+            for name, sub_schema in schema.get("properties", {}).items()
+        )
+
+    def _object_converter(  # noqa: C901 - the converter is inlined for speed
+        self,
+        schema: dict,
+        breadcrumb: tuple[str, ...] | None,
+        trusted: t.Container[str] = (),
+    ) -> _ObjectConverter:
+        """Compile a converter for objects of `schema`.
+
+        Args:
+            schema: An object schema.
+            breadcrumb: Selection breadcrumb of the object, or None within
+                arrays, where the SDK does not apply the selection mask.
+            trusted: Properties copied without conversion.
+
+        Returns:
+            A function converting an object, given its path for warnings and a
+            list collecting the paths of unmapped properties.
+        """
+        mask = self._mask
+        # name -> (selected, kind, nested converter, schema, primitive kind)
+        fields: dict[str, tuple[bool, int, t.Any, dict, int]] = {}
+        for name, property_schema in schema.get("properties", {}).items():
+            field_breadcrumb = (
+                None if breadcrumb is None else (*breadcrumb, "properties", name)
+            )
+            selected = field_breadcrumb is None or mask[field_breadcrumb]
+            primitive = _BOOLEAN if is_boolean_type(property_schema) else _PASSTHROUGH
+            if name in trusted:
+                kind, nested = _PASSTHROUGH, None
+            else:
+                kind, nested = self._nested_converter(
+                    property_schema,
+                    field_breadcrumb,
+                    primitive,
+                )
+            fields[name] = (selected, kind, nested, property_schema, primitive)
+        # Most fields are selected scalars, copied after a single set lookup
+        copied = frozenset(
+            name
+            for name, (selected, kind, *_) in fields.items()
+            if selected and kind == _PASSTHROUGH
+        )
+
+        def conform(record: dict, parent: str | None, unmapped: list[str]) -> dict:
+            output = {}
+            for name, value in record.items():
+                if name in copied and type(value) in _NATIVE_TYPES:
+                    output[name] = value
+                    continue
+                field = fields.get(name)
+                if field is None:
+                    if breadcrumb is None or mask[(*breadcrumb, "properties", name)]:
+                        unmapped.append(name if parent is None else f"{parent}.{name}")
+                    continue
+                selected, kind, nested, property_schema, primitive = field
+                if not selected:
+                    continue
+                if kind == _PASSTHROUGH and type(value) in _NATIVE_TYPES:
+                    output[name] = value
+                elif kind == _OBJECT and type(value) is dict:
+                    path = name if parent is None else f"{parent}.{name}"
+                    output[name] = nested(value, path, unmapped)
+                elif kind == _LIST and type(value) is list:
+                    path = name if parent is None else f"{parent}.{name}"
+                    output[name] = [nested(item, path, unmapped) for item in value]
+                else:
+                    output[name] = _conform_primitive(value, property_schema, primitive)
+            return output
+
+        return conform
+
+    def _nested_converter(
+        self,
+        schema: dict,
+        breadcrumb: tuple[str, ...] | None,
+        primitive: int,
+    ) -> tuple[int, t.Any]:
+        """Return the kind of a property, and the converter of nested values."""
+        if is_uniform_list(schema):
+            return _LIST, self._item_converter(schema["items"])
+        if is_object_type(schema) and "properties" in schema:
+            return _OBJECT, self._object_converter(schema, breadcrumb)
+        return primitive, None
+
+    def _item_converter(
+        self,
+        schema: dict,
+    ) -> t.Callable[[t.Any, str, list[str]], t.Any]:
+        """Compile a converter for the items of a uniform array."""
+        kind = _BOOLEAN if is_boolean_type(schema) else _PASSTHROUGH
+        item_object = (
+            self._object_converter(schema, None) if is_object_type(schema) else None
+        )
+
+        def convert(item: t.Any, path: str, unmapped: list[str]) -> t.Any:  # noqa: ANN401
+            if item_object is not None and type(item) is dict:
+                return item_object(item, path, unmapped)
+            return _conform_primitive(item, schema, kind)
+
+        return convert
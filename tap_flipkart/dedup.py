@@ -0,0 +1,172 @@
+"""In-run de-duplication of records emitted by several partitions."""
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import logging
+import os
+import tempfile
+import typing as t
+from pathlib import Path
+
+import pendulum
+
+if t.TYPE_CHECKING:
+    import sqlite3
+
+# Number of keys kept in memory before the index spills to disk.
+DEFAULT_MAX_MEMORY_KEYS = 200_000
+
+_SPILL_SCHEMA = "CREATE TABLE versions (key INTEGER PRIMARY KEY, version REAL)"
+
+
+def _to_version(value: t.Any) -> float | None:  # noqa: ANN401
+    """Convert a replication key value to a comparable number.
+
+    Returns None if the value is not a number or a timestamp.
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        parsed = datetime.datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        # Offsets such as +0530 are only parsed by Python 3.11
+        try:
+            parsed = pendulum.parse(str(value))
+        except (ValueError, TypeError):
+            return None
+        if not isinstance(parsed, datetime.datetime):
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed.timestamp()
+
+
+class RecordDeduplicator:
+    """Remember the newest version emitted for every primary key.
+
+    Records are streamed, so a version that was already written cannot be
+    withdrawn. Instead a record is only emitted when no version at least as
+    recent has been emitted earlier in the run, and targets that upsert on the
+    primary key end up with the latest version.
+
+    Keys are stored as 64-bit digests of the primary key values, mapped to the
+    replication key as a POSIX timestamp. Once `max_memory_keys` keys are held
+    in memory they are moved to a temporary SQLite file, which bounds memory
+    for very large accounts.
+    """
+
+    def __init__(
+        self,
+        max_memory_keys: int = DEFAULT_MAX_MEMORY_KEYS,
+        spill_directory: str | None = None,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        """Create an empty index.
+
+        Args:
+            max_memory_keys: Number of keys held in memory before spilling.
+            spill_directory: Directory for the spill file. Defaults to the
+                system temporary directory.
+            logger: Logger used to report spills.
+        """
+        self.max_memory_keys = max_memory_keys
+        self.spill_directory = spill_directory
+        self.logger = logger or logging.getLogger(__name__)
+        self.suppressed_count = 0
+        self._versions: dict[int, float] = {}
+        self._spill: sqlite3.Connection | None = None
+        self._spill_path: str | None = None
+
+    def __len__(self) -> int:
+        """Return the number of keys held in memory."""
+        return len(self._versions)
+
+    @staticmethod
+    def _digest(key: tuple) -> int:
+        data = "\x1f".join(map(str, key)).encode()
+        digest = hashlib.blake2b(data, digest_size=8).digest()
+        # SQLite integers are signed 64-bit
+        return int.from_bytes(digest, "big", signed=True)
+
+    def offer(self, key: tuple, version: t.Any) -> bool:  # noqa: ANN401
+        """Record a version of `key` and return whether it should be emitted.
+
+        Args:
+            key: The primary key values of the record.
+            version: The replication key value of the record.
+
+        Returns:
+            True unless an equal or newer version was already emitted. A
+            version that cannot be compared is emitted as the latest one.
+        """
+        if version is None:
+            return True
+        digest = self._digest(key)
+        parsed = _to_version(version)
+        if parsed is None:
+            self.logger.debug("Emitting %s with unparsable version %r.", key, version)
+            self._forget(digest)
+            return True
+        version = parsed
+        previous = self._versions.get(digest)
+        if previous is None and self._spill is not None:
+            row = self._spill.execute(
+                "SELECT version FROM versions WHERE key = ?",
+                (digest,),
+            ).fetchone()
+            previous = row[0] if row else None
+        if previous is not None and version <= previous:
+            self.suppressed_count += 1
+            return False
+
+        self._versions[digest] = version
+        if len(self._versions) >= self.max_memory_keys:
+            self._spill_to_disk()
+        return True
+
+    def _forget(self, digest: int) -> None:
+        self._versions.pop(digest, None)
+        if self._spill is not None:
+            with self._spill:
+                self._spill.execute("DELETE FROM versions WHERE key = ?", (digest,))
+
+    def _spill_to_disk(self) -> None:
+        if self._spill is None:
+            # Imported here, as most syncs never spill
+            import sqlite3  # noqa: PLC0415
+
+            fd, self._spill_path = tempfile.mkstemp(
+                prefix="tap-flipkart-dedup-",
+                suffix=".sqlite",
+                dir=self.spill_directory,
+            )
+            os.close(fd)
+            self._spill = sqlite3.connect(self._spill_path, check_same_thread=False)
+            self._spill.execute("PRAGMA journal_mode = OFF")
+            self._spill.execute("PRAGMA synchronous = OFF")
+            self._spill.execute(_SPILL_SCHEMA)
+            self.logger.info(
+                "De-duplication index exceeded %d keys, spilling to %s.",
+                self.max_memory_keys,
+                self._spill_path,
+            )
+        # Keys only reach memory after the spill file was checked, so the
+        # in-memory version is always the newest one
+        with self._spill:
+            self._spill.executemany(
+                "INSERT OR REPLACE INTO versions VALUES (?, ?)",
+                self._versions.items(),
+            )
+        self._versions.clear()
+
+    def close(self) -> None:
+        """Forget all keys and remove the spill file, if any."""
+        self._versions.clear()
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+        if self._spill_path is not None:
+            Path(self._spill_path).unlink()
+            self._spill_path = None
@@ -0,0 +1,587 @@
+"""Request engine of Flipkart streams.
+
+Requests are authenticated per seller account, rate limited, retried and
+paged. Pages are parsed while their body downloads when `stream_responses`
+is enabled, requested ahead of their records when `prefetch` is enabled, and
+added to the page archive when one is configured.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import threading
+import time
+import typing as t
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from singer_sdk import metrics
+from singer_sdk.exceptions import FatalAPIError, RetriableAPIError
+from singer_sdk.streams import RESTStream
+
+from tap_flipkart.accounts import get_account_id
+from tap_flipkart.paginator import PageSizeTuner, rejects_page_size
+from tap_flipkart.parsing import array_key, decode_json, extract, iter_json_array
+from tap_flipkart.ratelimit import get_retry_after
+
+if t.TYPE_CHECKING:
+    from tap_flipkart.auth import FlipkartAuthenticator
+    from tap_flipkart.instrumentation import SyncProfile
+    from tap_flipkart.ratelimit import RateLimiter
+
+THROTTLE_STATUSES = (HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.SERVICE_UNAVAILABLE)
+MAX_BACKOFF_SECONDS = 60
+# Response bytes buffered by the page prefetcher by default
+DEFAULT_PREFETCH_BUFFER_BYTES = 32 * 1024 * 1024
+
+
+class BadRequestError(FatalAPIError):
+    """Raised when the API rejects a request as invalid (HTTP 400)."""
+
+    def __init__(self, message: str, response: requests.Response) -> None:
+        """Create an error.
+
+        Args:
+            message: The error message.
+            response: The rejected response.
+        """
+        super().__init__(message)
+        self.response = response
+
+
+class _PageEnd:
+    """Marks the end of the records of a page."""
+
+    __slots__ = ("next_page_token", "size")
+
+    def __init__(self, next_page_token: t.Any, size: int) -> None:  # noqa: ANN401
+        self.next_page_token = next_page_token
+        self.size = size
+
+
+def response_size(response: requests.Response) -> int:
+    """Return the number of body bytes read from a response.
+
+    Args:
+        response: A response, read or streamed.
+
+    Returns:
+        The size of the body.
+    """
+    try:
+        return response.raw.tell()
+    except (AttributeError, OSError, ValueError):
+        return len(response.content or b"")
+
+
+def sent_page_size(request: requests.PreparedRequest) -> int | None:
+    """Return the page size requested, as a `pageSize` parameter or body field.
+
+    Args:
+        request: A request sent to the API.
+
+    Returns:
+        The page size, or None if the request carries no page size hint.
+    """
+    page_size = parse_qs(urlsplit(request.url).query).get("pageSize")
+    if page_size:
+        return int(page_size[0])
+    if not request.body:
+        return None
+    try:
+        body = json.loads(request.body)
+    except ValueError:
+        return None
+    pagination = body.get("pagination") if isinstance(body, dict) else None
+    return pagination.get("pageSize") if isinstance(pagination, dict) else None
+
+
+class PagedStream(RESTStream):
+    """A REST stream requesting pages through the tap's shared resources.
+
+    The HTTP session, OAuth tokens, rate limiters, instrumentation and page
+    archive are shared by all streams of the tap.
+    """
+
+    #: Page size requested unless configured otherwise. `None` sends no hint.
+    default_page_size: int | None = None
+
+    #: Page sizes tried, largest first, when `page_size.auto_tune` is enabled.
+    page_size_candidates: tuple[int | None, ...] = ()
+
+    def __init__(self, *args: t.Any, **kwargs: t.Any) -> None:
+        """Initialize the stream.
+
+        Args:
+            args: Positional arguments for the SDK stream.
+            kwargs: Keyword arguments for the SDK stream.
+        """
+        super().__init__(*args, **kwargs)
+        self._page_size_tuners: dict[str, PageSizeTuner] = {}
+        self._tuner_lock = threading.Lock()
+        # Partition synced by the current thread, for instrumentation
+        self._partition_local = threading.local()
+
+    @property
+    def requests_session(self) -> requests.Session:
+        """Return the pooled session shared by all streams of the tap.
+
+        Returns:
+            The `requests.Session` object for HTTP requests.
+        """
+        return self._tap.requests_session
+
+    @property
+    def page_size_tuner(self) -> PageSizeTuner:
+        """Return the page size tuner of the partition synced by this thread.
+
+        Every partition tunes its own page size, so a rejection only lowers
+        the page size of the partition that was rejected.
+
+        Returns:
+            A tuner over the configured page size, preceded by any larger
+            candidates when auto-tuning is enabled.
+        """
+        key = json.dumps(self.page_size_partition, sort_keys=True, default=str)
+        with self._tuner_lock:
+            tuner = self._page_size_tuners.get(key)
+            if tuner is None:
+                tuner = self._page_size_tuners[key] = self._new_page_size_tuner()
+        return tuner
+
+    @property
+    def page_size_partition(self) -> dict | None:
+        """Return the partition whose requests share a page size tuner.
+
+        Returns:
+            The partition synced by this thread.
+        """
+        return self._partition_context
+
+    def _new_page_size_tuner(self) -> PageSizeTuner:
+        page_size_config = self.config.get("page_size") or {}
+        page_size = page_size_config.get(self.name, self.default_page_size)
+        candidates = [page_size]
+        if page_size_config.get("auto_tune"):
+            candidates = [
+                candidate
+                for candidate in self.page_size_candidates
+                if page_size is None or (candidate and candidate > page_size)
+            ]
+            if page_size not in candidates:
+                candidates.append(page_size)
+        return PageSizeTuner(candidates, logger=self.logger)
+
+    @property
+    def sync_profile(self) -> SyncProfile | None:
+        """Return the instrumentation of the tap's sync, if enabled.
+
+        Returns:
+            The profile shared by all streams of the tap.
+        """
+        return self._tap.sync_profile
+
+    def get_rate_limiter(self, context: dict | None) -> RateLimiter:
+        """Return the rate limiter of the account of a request.
+
+        Args:
+            context: Stream partition or request context.
+
+        Returns:
+            The rate limiter shared by all streams for the account.
+        """
+        return self._tap.rate_limiters[get_account_id(context)]
+
+    def build_prepared_request(
+        self,
+        *args: t.Any,
+        **kwargs: t.Any,
+    ) -> requests.PreparedRequest:
+        """Build a request, which is authenticated once it is sent.
+
+        Unlike the SDK, the authenticator is not set on the shared session,
+        as concurrent partitions may belong to different accounts.
+
+        Args:
+            args: Arguments to pass to `requests.Request`.
+            kwargs: Keyword arguments to pass to `requests.Request`.
+
+        Returns:
+            A `requests.PreparedRequest` object.
+        """
+        return self.requests_session.prepare_request(requests.Request(*args, **kwargs))
+
+    def _request(
+        self,
+        prepared_request: requests.PreparedRequest,
+        context: dict | None,
+    ) -> requests.Response:
+        """Send a request once the account's rate limiter allows it.
+
+        The request is authenticated for the account of `context`. Throttled
+        responses pause and slow down the rate limiter for every stream and
+        partition of the account before the error is retried.
+
+        Args:
+            prepared_request: The request to send.
+            context: Stream partition or context dictionary.
+
+        Returns:
+            The validated response.
+        """
+        account_id = get_account_id(context)
+        self._tap.get_authenticator(self, account_id)(prepared_request)
+        rate_limiter = self.get_rate_limiter(context)
+        waited = rate_limiter.acquire()
+        profile = self.sync_profile
+        if profile is not None:
+            from tap_flipkart.instrumentation import Measurement  # noqa: PLC0415
+
+            profile.add(
+                Measurement.THROTTLE,
+                waited or 0.0,
+                self.name,
+                self._partition_context,
+            )
+        if waited:
+            from tap_flipkart.instrumentation import FlipkartMetric, log_metric  # noqa: PLC0415
+
+            log_metric(
+                FlipkartMetric.THROTTLE_DURATION,
+                waited,
+                stream=self.name,
+                endpoint=self.path,
+                context=context,
+            )
+        try:
+            response = self._send(prepared_request, context)
+        except RetriableAPIError as ex:
+            if ex.response is not None and ex.response.status_code in THROTTLE_STATUSES:
+                rate_limiter.throttle(get_retry_after(ex.response))
+            raise
+        rate_limiter.succeed()
+        return response
+
+    def _send(
+        self,
+        prepared_request: requests.PreparedRequest,
+        context: dict | None,
+    ) -> requests.Response:
+        """Send a request, leaving the body unread when responses are streamed.
+
+        Args:
+            prepared_request: The request to send.
+            context: Stream partition or context dictionary.
+
+        Returns:
+            The validated response.
+        """
+        started = time.perf_counter()
+        response = self.requests_session.send(
+            prepared_request,
+            timeout=self.timeout,
+            stream=self.stream_responses,
+        )
+        profile = self.sync_profile
+        if profile is not None:
+            from tap_flipkart.instrumentation import Measurement  # noqa: PLC0415
+
+            # Time until the response headers, including connection setup
+            elapsed = response.elapsed.total_seconds()
+            partition = self._partition_context
+            profile.add(Measurement.REQUEST, elapsed, self.name, partition)
+            if not self.stream_responses:
+                download = max(time.perf_counter() - started - elapsed, 0.0)
+                profile.add(Measurement.DOWNLOAD, download, self.name, partition)
+        if not response.ok:
+            # Error bodies are small and read by the error handling
+            response.content  # noqa: B018
+        self._write_request_duration_log(
+            endpoint=self.path,
+            response=response,
+            context=context,
+            extra_tags={"url": prepared_request.path_url}
+            if self._LOG_REQUEST_METRIC_URLS
+            else None,
+        )
+        self.validate_response(response)
+        return response
+
+    @property
+    def stream_responses(self) -> bool:
+        """Return True if records are parsed while response bodies arrive.
+
+        Responses are read whole while pages are archived.
+        """
+        archive = self._tap.page_archive
+        if archive is not None and not archive.replay:
+            return False
+        return bool(self.config.get("stream_responses"))
+
+    def validate_response(self, response: requests.Response) -> None:
+        """Validate HTTP response, flagging rejected requests.
+
+        Args:
+            response: A `requests.Response` object.
+
+        Raises:
+            BadRequestError: If the API rejected the request as invalid.
+        """
+        if response.status_code == HTTPStatus.BAD_REQUEST:
+            raise BadRequestError(self.response_error_message(response), response)
+        super().validate_response(response)
+
+    def _write_request_duration_log(
+        self,
+        endpoint: str,
+        response: requests.Response,
+        context: dict | None,
+        extra_tags: dict | None,
+    ) -> None:
+        extra_tags = extra_tags or {}
+        extra_tags["page_size"] = sent_page_size(response.request)
+        super()._write_request_duration_log(endpoint, response, context, extra_tags)
+
+    def request_records(self, context: dict | None) -> t.Iterable[dict]:
+        """Request records from REST endpoint(s), returning response records.
+
+        If pagination is detected, pages will be recursed automatically.
+
+        Args:
+            context: Stream partition or context dictionary.
+
+        Yields:
+            An item for every record in the response.
+        """
+        yield from self._request_pages(context)
+
+    def _request_pages(
+        self,
+        context: dict | None,
+        next_page_token: t.Any = None,  # noqa: ANN401
+        on_page: t.Callable[[t.Any], None] | None = None,
+    ) -> t.Iterable[dict]:
+        """Request all pages of a request context, returning response records.
+
+        When the API rejects the first page, the request is retried with the
+        next page size candidate, if any. With `prefetch` enabled, the next
+        pages are requested in a background thread while the records of the
+        current page are emitted.
+
+        Args:
+            context: Stream partition or request context dictionary.
+            next_page_token: Token of the page to start from, if not the first.
+            on_page: Called with the token of the next page once all records
+                of a page have been yielded, unless it was the last page.
+
+        Yields:
+            An item for every record in the response.
+        """
+        items = self._iter_pages(context, next_page_token)
+        prefetch = self.config.get("prefetch") or {}
+        if prefetch.get("enabled"):
+            items = self._prefetch_pages(items, prefetch)
+        for item in items:
+            if item.__class__ is _PageEnd:
+                if on_page is not None and item.next_page_token is not None:
+                    on_page(item.next_page_token)
+                continue
+            yield item
+
+    def _prefetch_pages(
+        self,
+        items: t.Iterable[dict | _PageEnd],
+        prefetch: dict,
+    ) -> t.Iterable[dict | _PageEnd]:
+        """Request pages ahead of their consumer in a background thread.
+
+        Args:
+            items: The records and page ends of a request context.
+            prefetch: The `prefetch` settings.
+
+        Yields:
+            The items of `items`, in order.
+        """
+        from tap_flipkart.concurrency import PREFETCH_QUEUE_DEPTH, Prefetcher  # noqa: PLC0415
+
+        partition = self._partition_context
+
+        def pages() -> t.Iterable[list[dict | _PageEnd]]:
+            # Runs in the prefetch thread, measured as the same partition
+            self._partition_local.context = partition
+            page: list[dict | _PageEnd] = []
+            for item in items:
+                page.append(item)
+                if item.__class__ is _PageEnd:
+                    yield page
+                    page = []
+
+        prefetcher = Prefetcher(
+            pages(),
+            queue_depth=prefetch.get("queue_depth", PREFETCH_QUEUE_DEPTH),
+            max_buffer_bytes=prefetch.get(
+                "max_buffer_bytes",
+                DEFAULT_PREFETCH_BUFFER_BYTES,
+            ),
+            size=lambda page: page[-1].size,
+            name=f"flipkart-{self.name}-pages",
+        )
+        for page in prefetcher:
+            yield from page
+
+    def _iter_pages(
+        self,
+        context: dict | None,
+        next_page_token: t.Any = None,  # noqa: ANN401
+    ) -> t.Iterable[dict | _PageEnd]:
+        """Request all pages of a request context.
+
+        Args:
+            context: Stream partition or request context dictionary.
+            next_page_token: Token of the page to start from, if not the first.
+
+        Yields:
+            The records of every page, each page followed by a `_PageEnd`.
+        """
+        paginator = self.get_new_paginator()
+        if next_page_token is not None:
+            paginator.resume(next_page_token)
+        decorated_request = self.request_decorator(self._request)
+
+        with metrics.http_request_counter(self.name, self.path) as request_counter:
+            request_counter.context = context
+
+            while not paginator.finished:
+                page_size = self.page_size_tuner.page_size
+                request_counter.tags["page_size"] = page_size
+                prepared_request = self.prepare_request(
+                    context,
+                    next_page_token=paginator.current_value,
+                )
+                try:
+                    resp = decorated_request(prepared_request, context)
+                except BadRequestError as ex:
+                    if not rejects_page_size(ex.response):
+                        raise
+                    if paginator.current_value is None and self.page_size_tuner.reject(
+                        page_size,
+                    ):
+                        continue
+                    # Not a filter matching too many results: never split on it
+                    raise FatalAPIError(str(ex)) from ex
+                request_counter.increment()
+                self.update_sync_costs(prepared_request, resp, context)
+                archive = self._tap.page_archive
+                if archive is not None:
+                    archive.add(
+                        self.name,
+                        self._partition_context,
+                        context,
+                        prepared_request,
+                        resp,
+                    )
+                yield from self._parse_page(resp)
+                paginator.advance(resp)
+                yield _PageEnd(
+                    None if paginator.finished else paginator.current_value,
+                    response_size(resp),
+                )
+
+    @property
+    def _partition_context(self) -> dict | None:
+        return getattr(self._partition_local, "context", None)
+
+    def _parse_page(self, response: requests.Response) -> t.Iterable[dict]:
+        """Parse the records of a page, timing it when instrumentation is on.
+
+        Args:
+            response: A validated page response.
+
+        Yields:
+            One item for every record in the response.
+        """
+        profile = self.sync_profile
+        if profile is None:
+            yield from self.parse_response(response)
+            return
+        from tap_flipkart.instrumentation import Measurement  # noqa: PLC0415
+
+        partition = self._partition_context
+        streamed = self.stream_responses and response._content is False  # noqa: SLF001
+        if not streamed:
+            # Decoded once and cached on the response for `parse_response`
+            with profile.timer(Measurement.DECODE, self.name, partition):
+                decode_json(response)
+        yield from profile.time_iterator(
+            self.parse_response(response),
+            # Streamed responses are downloaded and decoded while parsing
+            Measurement.DECODE if streamed else Measurement.EXTRACT,
+            self.name,
+            partition,
+        )
+        profile.add(
+            Measurement.RESPONSE_BYTES,
+            response_size(response),
+            self.name,
+            partition,
+        )
+
+    def backoff_wait_generator(self) -> t.Generator[float, None, None]:
+        """Back off exponentially with full jitter, at least for `Retry-After`.
+
+        The delay is drawn at random up to the exponential backoff, so the
+        partitions and accounts throttled at the same time do not retry in
+        lockstep.
+
+        Returns:
+            The wait generator.
+        """
+
+        def wait_generator() -> t.Generator[float, t.Any, None]:
+            attempt = 0
+            exception = yield  # type: ignore[misc]
+            while True:
+                backoff = min(2 ** (attempt + 1), MAX_BACKOFF_SECONDS)
+                delay = random.uniform(0, backoff)  # noqa: S311
+                retry_after = get_retry_after(getattr(exception, "response", None))
+                if retry_after is not None:
+                    delay = max(delay, retry_after)
+                attempt += 1
+                exception = yield delay
+
+        return wait_generator()
+
+    @property
+    def authenticator(self) -> FlipkartAuthenticator:
+        """Return the authenticator of the partition synced by this thread.
+
+        Returns:
+            The authenticator of the partition's account.
+        """
+        return self._tap.get_authenticator(
+            self,
+            get_account_id(self._partition_context),
+        )
+
+    def parse_response(self, response: requests.Response) -> t.Iterable[dict]:
+        """Parse the response and return an iterator of result records.
+
+        The body is decoded once and shared with the paginator. With
+        `stream_responses` enabled, records of a `$.key[*]` array are yielded
+        one at a time while the body is still being downloaded, and the
+        remaining fields become available to the paginator once the records
+        are exhausted.
+
+        Args:
+            response: A raw `requests.Response` object.
+
+        Yields:
+            One item for every item found in the response.
+        """
+        key = array_key(self.records_jsonpath)
+        if self.stream_responses and key and response._content is False:  # noqa: SLF001
+            yield from iter_json_array(response, key)
+            return
+        yield from extract(self.records_jsonpath, decode_json(response))
@@ -0,0 +1,133 @@
+"""Child streams enriching parent records through bulk lookup endpoints.
+
+Rather than a sync per parent record, as for SDK child streams, the IDs of
+the emitted parent records are queued per seller account and requested in
+batches from endpoints taking a comma-separated list of IDs. The batches of
+a queue are requested concurrently.
+"""
+
+from __future__ import annotations
+
+import functools
+import typing as t
+
+from tap_flipkart.accounts import ACCOUNT_KEY, get_account_id
+from tap_flipkart.client import FlipkartStream
+from tap_flipkart.concurrency import PartitionFetcher
+
+# Batches requested at once by default
+DEFAULT_ENRICHMENT_CONCURRENCY = 4
+
+
+class BatchedChildStream(FlipkartStream):
+    """A child stream requesting many parent records per request.
+
+    The `path` takes the comma-separated IDs of a batch as `{ids_key}`. The
+    state of the stream is not partitioned by batch.
+    """
+
+    batches_parent_contexts = True
+    # Enrichment streams are opted into through the catalog
+    selected_by_default = False
+
+    # Key of the parent record's ID in the child context
+    parent_key = "shipmentId"
+    # Context key of the comma-separated IDs of a batch
+    ids_key = "shipmentIds"
+    # Maximum number of IDs the endpoint accepts per request
+    max_batch_ids = 100
+
+    def __init__(self, *args: t.Any, **kwargs: t.Any) -> None:
+        """Initialize the stream.
+
+        Args:
+            args: Positional arguments for the Flipkart stream.
+            kwargs: Keyword arguments for the Flipkart stream.
+        """
+        super().__init__(*args, **kwargs)
+        self.state_partitioning_keys = []
+        self._queued_ids: dict[str | None, list[str]] = {}
+
+    @property
+    def batch_size(self) -> int:
+        """Return the number of IDs requested at once."""
+        enrichment = self.config.get("enrichment") or {}
+        return min(enrichment.get("batch_size", self.max_batch_ids), self.max_batch_ids)
+
+    @property
+    def max_concurrency(self) -> int:
+        """Return the number of batches requested at the same time."""
+        enrichment = self.config.get("enrichment") or {}
+        return enrichment.get("max_concurrency", DEFAULT_ENRICHMENT_CONCURRENCY)
+
+    @property
+    def page_size_partition(self) -> dict | None:
+        """Return the account whose batches share a page size tuner.
+
+        The partition context of a batch carries its IDs, which would give
+        every batch a tuner of its own.
+
+        Returns:
+            The account of the batch synced by this thread, if any.
+        """
+        account_id = get_account_id(self._partition_context)
+        return None if account_id is None else {ACCOUNT_KEY: account_id}
+
+    def queue_parent_context(self, context: dict) -> None:
+        """Queue a parent record, syncing the queue of its account once full.
+
+        Args:
+            context: Child context of the parent record.
+        """
+        account_id = get_account_id(context)
+        ids = self._queued_ids.setdefault(account_id, [])
+        ids.append(context[self.parent_key])
+        if len(ids) >= self.batch_size * max(self.max_concurrency, 1):
+            self._sync_queue(account_id)
+
+    def flush_parent_contexts(self) -> None:
+        """Sync the parent records queued for every account."""
+        for account_id in list(self._queued_ids):
+            self._sync_queue(account_id)
+
+    def _sync_queue(self, account_id: str | None) -> None:
+        ids = self._queued_ids.pop(account_id, None)
+        if not ids:
+            return
+        context = {self.ids_key: ",".join(dict.fromkeys(ids))}
+        if account_id is not None:
+            context[ACCOUNT_KEY] = account_id
+        self.sync(context=context)
+
+    def request_records(self, context: dict | None) -> t.Iterable[dict]:
+        """Request the queued IDs of a context in concurrent batches.
+
+        Args:
+            context: Context with the comma-separated IDs of a queue.
+
+        Yields:
+            The records of every batch, in the order of the queued IDs.
+        """
+        ids = context[self.ids_key].split(",")
+        batches = [
+            {**context, self.ids_key: ",".join(ids[i : i + self.batch_size])}
+            for i in range(0, len(ids), self.batch_size)
+        ]
+        request_batch = functools.partial(self._request_batch, context)
+        if len(batches) == 1 or self.max_concurrency <= 1:
+            for batch in batches:
+                yield from request_batch(batch)
+            return
+        fetcher = PartitionFetcher(
+            request_batch,
+            batches,
+            max_workers=min(self.max_concurrency, len(batches)),
+            logger=self.logger,
+        )
+        for batch in batches:
+            yield from fetcher.records(batch)
+
+    def _request_batch(self, context: dict, batch: dict) -> t.Iterable[dict]:
+        # Runs in a worker thread when batches are requested concurrently
+        self._partition_local.context = context
+        yield from super().request_records(batch)
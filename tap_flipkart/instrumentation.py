@@ -0,0 +1,463 @@
+"""Tap specific Singer metrics and sync instrumentation."""
+
+from __future__ import annotations
+
+import contextlib
+import enum
+import functools
+import json
+import logging
+import math
+import sys
+import threading
+import time
+import typing as t
+from pathlib import Path
+
+from singer_sdk import metrics
+from singer_sdk.exceptions import ConfigValidationError
+
+if t.TYPE_CHECKING:
+    import cProfile
+
+# Histogram buckets are this many per doubling, which bounds the relative
+# error of the reported percentiles to about 2%.
+_BUCKETS_PER_DOUBLING = 16
+PERCENTILES = (50, 95, 99)
+
+
+class FlipkartMetric(str, enum.Enum):
+    """Metric types emitted by tap-flipkart in addition to the SDK metrics."""
+
+    THROTTLE_DURATION = "throttle_duration"
+    DUPLICATE_RECORDS = "duplicate_records"
+    UNCHANGED_RECORDS = "unchanged_records"
+    PHASE_DURATION = "phase_duration"
+    RESPONSE_BYTES = "response_bytes"
+    PAGE_RECORDS = "page_records"
+
+
+class Measurement(str, enum.Enum):
+    """Quantities measured by the sync instrumentation."""
+
+    # Durations, in seconds
+    AUTH = "auth"
+    THROTTLE = "throttle"
+    REQUEST = "request"
+    DOWNLOAD = "download"
+    DECODE = "decode"
+    EXTRACT = "extract"
+    CONFORM = "conform"
+    WRITE = "write"
+    # Sizes, per page
+    RESPONSE_BYTES = "response_bytes"
+    PAGE_RECORDS = "page_records"
+
+
+_SIZE_METRICS = {
+    Measurement.RESPONSE_BYTES: FlipkartMetric.RESPONSE_BYTES,
+    Measurement.PAGE_RECORDS: FlipkartMetric.PAGE_RECORDS,
+}
+
+
+def log_metric(
+    metric: FlipkartMetric,
+    value: t.Any,  # noqa: ANN401
+    *,
+    metric_type: str = "timer",
+    **tags: t.Any,
+) -> None:
+    """Write a single metric point to the Singer metrics logger.
+
+    Args:
+        metric: The metric to log.
+        value: The measured value.
+        metric_type: The Singer metric type, e.g. `timer` or `counter`.
+        tags: Tags to add to the measurement.
+    """
+    metrics.log(
+        metrics.get_metrics_logger(),
+        metrics.Point(metric_type, metric, value, tags),  # type: ignore[arg-type]
+    )
+
+
+class Histogram:
+    """Summarize non-negative values in logarithmic buckets.
+
+    Memory is bounded by the range of the values rather than their number,
+    so every request and record of a sync can be added.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty histogram."""
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._zeros = 0
+        self._buckets: dict[int, int] = {}
+
+    def add(self, value: float) -> None:
+        """Add a value.
+
+        Args:
+            value: The value to add.
+        """
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        if value <= 0:
+            self._zeros += 1
+            return
+        bucket = math.floor(math.log2(value) * _BUCKETS_PER_DOUBLING)
+        self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+
+    def merge(self, other: Histogram) -> None:
+        """Add all values of another histogram.
+
+        Args:
+            other: The histogram to add.
+        """
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        self._zeros += other._zeros
+        for bucket, count in other._buckets.items():
+            self._buckets[bucket] = self._buckets.get(bucket, 0) + count
+
+    def percentile(self, percent: float) -> float:
+        """Return an approximate percentile of the values.
+
+        Args:
+            percent: The percentile, from 0 to 100.
+
+        Returns:
+            The value below which `percent` of the values fall.
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * percent / 100))
+        seen = self._zeros
+        if seen >= rank:
+            return 0.0
+        for bucket in sorted(self._buckets):
+            seen += self._buckets[bucket]
+            if seen >= rank:
+                middle = 2 ** ((bucket + 0.5) / _BUCKETS_PER_DOUBLING)
+                return min(middle, self.max)
+        return self.max
+
+    def summary(self) -> dict[str, float]:
+        """Return the count, total, mean, percentiles and maximum."""
+        summary = {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+        }
+        for percent in PERCENTILES:
+            summary[f"p{percent}"] = self.percentile(percent)
+        summary["max"] = self.max
+        return summary
+
+
+class SyncProfile:
+    """Collect the time spent in each phase of a sync, by stream and partition.
+
+    Phases cover a request from OAuth token refreshes and client-side
+    throttling, through the request until the response headers arrive
+    (including connection setup), the download, JSON decoding and record
+    extraction, to type conformance and writing messages. Response sizes and
+    records per page are collected alongside.
+
+    Measurements from partition worker threads are added under a lock.
+    """
+
+    def __init__(
+        self,
+        *,
+        write_metrics: bool = True,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        """Create an empty profile.
+
+        Args:
+            write_metrics: Write a Singer metric per phase once a partition
+                completes.
+            logger: Logger used to report the summary file.
+        """
+        self.write_metrics = write_metrics
+        self.logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        # (stream, partition key) -> (context, measurement -> histogram)
+        self._partitions: dict[
+            tuple[str | None, str | None],
+            tuple[dict | None, dict[Measurement, Histogram]],
+        ] = {}
+        # id(context) -> (context, key), so contexts are serialized once
+        self._context_keys: dict[int, tuple[dict, str]] = {}
+
+    def _context_key(self, context: dict | None) -> str | None:
+        if context is None:
+            return None
+        cached = self._context_keys.get(id(context))
+        if cached is None or cached[0] is not context:
+            cached = (context, json.dumps(context, sort_keys=True))
+            self._context_keys[id(context)] = cached
+        return cached[1]
+
+    def add(
+        self,
+        measurement: Measurement,
+        value: float,
+        stream: str | None = None,
+        context: dict | None = None,
+    ) -> None:
+        """Add a measured value.
+
+        Args:
+            measurement: What was measured.
+            value: Duration in seconds, or the size.
+            stream: Name of the stream, or None for the tap as a whole.
+            context: Stream partition context.
+        """
+        with self._lock:
+            key = (stream, self._context_key(context))
+            partition = self._partitions.get(key)
+            if partition is None:
+                partition = self._partitions[key] = (context, {})
+            histogram = partition[1].get(measurement)
+            if histogram is None:
+                histogram = partition[1][measurement] = Histogram()
+            histogram.add(value)
+
+    @contextlib.contextmanager
+    def timer(
+        self,
+        measurement: Measurement,
+        stream: str | None = None,
+        context: dict | None = None,
+    ) -> t.Iterator[None]:
+        """Measure the duration of the enclosed block.
+
+        Args:
+            measurement: The phase being timed.
+            stream: Name of the stream, or None for the tap as a whole.
+            context: Stream partition context.
+
+        Yields:
+            Nothing.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(measurement, time.perf_counter() - started, stream, context)
+
+    def time_iterator(
+        self,
+        items: t.Iterable[t.Any],
+        measurement: Measurement,
+        stream: str | None = None,
+        context: dict | None = None,
+    ) -> t.Iterator[t.Any]:
+        """Measure the time spent producing the items of an iterator.
+
+        The time the consumer spends on each item is not included. The
+        number of items is added as `PAGE_RECORDS` once exhausted.
+
+        Args:
+            items: The iterable to time.
+            measurement: The phase being timed.
+            stream: Name of the stream.
+            context: Stream partition context.
+
+        Yields:
+            The items of `items`.
+        """
+        iterator = iter(items)
+        elapsed = 0.0
+        count = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                break
+            finally:
+                elapsed += time.perf_counter() - started
+            count += 1
+            yield item
+        self.add(measurement, elapsed, stream, context)
+        self.add(Measurement.PAGE_RECORDS, count, stream, context)
+
+    def summary(self) -> dict:
+        """Return the measurements of the sync so far.
+
+        Returns:
+            An object with the total duration, the tap-wide measurements, and
+            per stream the measurements of the stream and of each partition.
+        """
+        tap: dict[Measurement, Histogram] = {}
+        streams: dict[str, dict] = {}
+        with self._lock:
+            for (stream, _), (context, histograms) in self._partitions.items():
+                if stream is None:
+                    tap = histograms
+                    continue
+                stream_summary = streams.setdefault(
+                    stream,
+                    {"phases": {}, "partitions": []},
+                )
+                for measurement, histogram in histograms.items():
+                    phases = stream_summary["phases"]
+                    phases.setdefault(measurement, Histogram()).merge(histogram)
+                stream_summary["partitions"].append(
+                    {"context": context, "phases": _summarize(histograms)},
+                )
+        for stream_summary in streams.values():
+            stream_summary["phases"] = _summarize(stream_summary["phases"])
+        return {
+            "duration": time.perf_counter() - self._started,
+            "phases": _summarize(tap),
+            "streams": streams,
+        }
+
+    def log_partition(self, stream: str, context: dict | None) -> None:
+        """Write the measurements of a completed partition as Singer metrics.
+
+        Durations are written as `phase_duration` timers tagged with the
+        phase, sizes as `response_bytes` and `page_records` counters. The
+        value is the total, and the percentiles are added as tags.
+
+        Args:
+            stream: Name of the stream.
+            context: Stream partition context.
+        """
+        if not self.write_metrics:
+            return
+        with self._lock:
+            key = (stream, self._context_key(context))
+            _, histograms = self._partitions.get(key, (None, {}))
+            summaries = _summarize(histograms)
+        for measurement, summary in summaries.items():
+            metric = _SIZE_METRICS.get(Measurement(measurement))
+            tags = {"stream": stream, "context": context}
+            if metric is None:
+                metric = FlipkartMetric.PHASE_DURATION
+                tags["phase"] = measurement
+            value = summary.pop("total")
+            log_metric(
+                metric,
+                value,
+                metric_type=(
+                    "timer" if metric == FlipkartMetric.PHASE_DURATION else "counter"
+                ),
+                **tags,
+                **summary,
+            )
+
+    def write_summary(self, path: str) -> None:
+        """Write the summary of the sync to a JSON file.
+
+        Args:
+            path: The file to write.
+        """
+        Path(path).write_text(json.dumps(self.summary(), indent=2))
+        self.logger.info("Wrote sync instrumentation summary to %s.", path)
+
+
+def _summarize(histograms: dict[Measurement, Histogram]) -> dict[str, dict]:
+    return {
+        measurement.value: histogram.summary()
+        for measurement, histogram in sorted(histograms.items())
+    }
+
+
+def _profile_thread(profiles: list[cProfile.Profile], *_: t.Any) -> None:
+    """Profile a new thread, on its first profile event.
+
+    Args:
+        profiles: List the profile of the thread is added to.
+    """
+    import cProfile  # noqa: PLC0415
+
+    profile = cProfile.Profile()
+    profiles.append(profile)
+    # Replaces this function as the profile function of the thread
+    profile.enable()
+
+
+@contextlib.contextmanager
+def run_profiler(
+    profiler: str,
+    path: str | None,
+    logger: logging.Logger,
+) -> t.Iterator[None]:
+    """Profile the enclosed block with cProfile or pyinstrument.
+
+    cProfile profiles the threads started within the block too, such as the
+    workers of concurrent partitions, windows and prefetching, and writes the
+    statistics of all threads combined. pyinstrument samples the calling
+    thread only.
+
+    Args:
+        profiler: `cprofile` or `pyinstrument`.
+        path: File the profile is written to. cProfile writes `pstats` data,
+            pyinstrument an HTML report if the path ends in `.html` and text
+            otherwise.
+        logger: Logger used to report the profile file.
+
+    Yields:
+        Nothing.
+
+    Raises:
+        ValueError: If the profiler is unknown.
+        ConfigValidationError: If pyinstrument is selected but not installed.
+    """
+    if profiler == "cprofile":
+        import cProfile  # noqa: PLC0415
+        import pstats  # noqa: PLC0415
+
+        path = path or "tap-flipkart.prof"
+        cprofile = cProfile.Profile()
+        thread_profiles: list[cProfile.Profile] = []
+        # From Python 3.12, a profile covers every thread of the interpreter
+        if sys.version_info < (3, 12):
+            threading.setprofile(functools.partial(_profile_thread, thread_profiles))
+        cprofile.enable()
+        try:
+            yield
+        finally:
+            cprofile.disable()
+            threading.setprofile(None)
+            stats = pstats.Stats(cprofile)
+            for thread_profile in thread_profiles:
+                thread_profile.create_stats()
+                if thread_profile.stats:
+                    stats.add(thread_profile)
+            stats.dump_stats(path)
+            logger.info("Wrote cProfile statistics to %s.", path)
+        return
+    if profiler != "pyinstrument":
+        msg = f"Unknown profiler '{profiler}', expected 'cprofile' or 'pyinstrument'"
+        raise ValueError(msg)
+
+    # Optional dependency, only needed when selected
+    try:
+        from pyinstrument import Profiler  # noqa: PLC0415
+    except ImportError as ex:
+        msg = "The pyinstrument profiler requires the `profiling` extra"
+        raise ConfigValidationError(msg) from ex
+
+    path = path or "tap-flipkart-profile.html"
+    sampler = Profiler()
+    sampler.start()
+    try:
+        yield
+    finally:
+        sampler.stop()
+        if path.endswith(".html"):
+            Path(path).write_text(sampler.output_html())
+        else:
+            Path(path).write_text(sampler.output_text())
+        logger.info("Wrote pyinstrument profile to %s.", path)
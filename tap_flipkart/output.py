@@ -0,0 +1,111 @@
+"""Buffered output of Singer messages."""
+
+from __future__ import annotations
+
+import datetime
+import sys
+import typing as t
+
+from singer_sdk._singerlib import SingerMessageType
+from singer_sdk._singerlib.messages import format_message
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+if t.TYPE_CHECKING:
+    from singer_sdk._singerlib import Message
+
+# Bytes of messages collected before they are written to stdout.
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+
+def _default(value: t.Any) -> str:  # noqa: ANN401
+    # Decimals would lose precision as floats, so they fall back to the SDK
+    if type(value).__name__ == "Decimal":
+        msg = "Decimal values are encoded by the SDK"
+        raise TypeError(msg)
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(sep="T")
+    return str(value)
+
+
+def encode_message(message: Message) -> bytes:
+    """Encode a message as a line of JSON.
+
+    Messages are encoded with orjson when it is installed, which formats
+    datetimes natively. The output only differs from the SDK's in
+    whitespace. Values orjson cannot encode the way the SDK does, such as
+    decimals and integers beyond 64 bits, fall back to the SDK encoder.
+
+    Args:
+        message: The message to encode.
+
+    Returns:
+        The UTF-8 encoded message, ending in a newline.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                message.to_dict(),
+                default=_default,
+                option=orjson.OPT_APPEND_NEWLINE,
+            )
+        except TypeError:
+            pass
+    return (format_message(message) + "\n").encode()
+
+
+class MessageWriter:
+    """Write Singer messages to stdout in large batches.
+
+    The SDK writes and flushes stdout once per message. Here encoded messages
+    are collected until `buffer_size` bytes are pending and then written with
+    a single call. STATE messages are flushed at once, so a target never
+    waits on a bookmark that was already emitted.
+    """
+
+    def __init__(self, buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+        """Create a writer.
+
+        Args:
+            buffer_size: Bytes of messages collected before they are written.
+        """
+        self.buffer_size = buffer_size
+        self._pending: list[bytes] = []
+        self._pending_size = 0
+
+    def write(self, message: Message) -> None:
+        """Write a message, or queue it for the next batch.
+
+        Args:
+            message: The message to write.
+        """
+        line = encode_message(message)
+        self._pending.append(line)
+        self._pending_size += len(line)
+        if (
+            self._pending_size >= self.buffer_size
+            or message.type == SingerMessageType.STATE
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all queued messages to stdout."""
+        if not self._pending:
+            return
+        data = b"".join(self._pending)
+        self._pending.clear()
+        self._pending_size = 0
+        # Looked up on every flush, as stdout may be redirected
+        stdout = sys.stdout
+        binary = getattr(stdout, "buffer", None)
+        if binary is None:
+            stdout.write(data.decode())
+            stdout.flush()
+            return
+        # Text written to stdout directly must come out first
+        stdout.flush()
+        binary.write(data)
+        binary.flush()
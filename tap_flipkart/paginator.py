@@ -1,9 +1,36 @@
+from __future__ import annotations
+
+import logging
+import threading
+import typing as t
+
 from singer_sdk.pagination import JSONPathPaginator
 
 from requests import Response
 
+from tap_flipkart.parsing import decode_json, extract
+
 class FlipkartPaginator(JSONPathPaginator):
 
+    def resume(self, value: str) -> None:
+        """Continue paginating from a token returned by an earlier request.
+
+        Args:
+            value: The next page token to request.
+        """
+        self._value = value
+
+    def get_next(self, response: Response) -> str | None:
+        """Get the next page token from the already decoded response body.
+
+        Args:
+            response: API response object.
+
+        Returns:
+            The next page token.
+        """
+        return next(extract(self._jsonpath, decode_json(response)), None)
+
     def has_more(self, response: Response) -> bool:  # noqa: ARG002
         """Override this method to check if the endpoint has any pages left.
 
@@ -13,4 +40,75 @@ class FlipkartPaginator(JSONPathPaginator):
         Returns:
             Boolean flag used to indicate if the endpoint has more pages.
         """
-        return response.json().get("hasMore")
+        return decode_json(response).get("hasMore")
+
+
+def rejects_page_size(response: Response | None) -> bool:
+    """Check whether an error response rejects the requested page size.
+
+    The API answers both too large page sizes and too wide filters with a
+    400, so only errors naming the page size are page size rejections.
+
+    Args:
+        response: The error response, if any.
+
+    Returns:
+        True if the error body mentions the page size.
+    """
+    if response is None:
+        return False
+    text = (response.text or "").lower().replace(" ", "").replace("_", "")
+    return "pagesize" in text
+
+
+class PageSizeTuner:
+    """Track the page size requested for a partition.
+
+    Candidates are tried from first to last: every time the API rejects the
+    current page size, the tuner falls back to the next candidate for the rest
+    of the partition.
+    """
+
+    def __init__(
+        self,
+        candidates: t.Sequence[int | None],
+        logger: logging.Logger | None = None,
+    ) -> None:
+        """Create a new tuner.
+
+        Args:
+            candidates: Page sizes in order of preference. `None` sends no hint.
+            logger: Logger used to report fallbacks.
+        """
+        self._candidates = list(candidates) or [None]
+        self._index = 0
+        self._lock = threading.Lock()
+        self.logger = logger or logging.getLogger(__name__)
+
+    @property
+    def page_size(self) -> int | None:
+        """Return the page size to request."""
+        return self._candidates[self._index]
+
+    def reject(self, page_size: int | None) -> bool:
+        """Register that the API rejected a request made with `page_size`.
+
+        Args:
+            page_size: The page size of the rejected request.
+
+        Returns:
+            True if the request should be retried with the current page size.
+        """
+        with self._lock:
+            if page_size != self.page_size:
+                # Another request already fell back from this page size
+                return True
+            if self._index + 1 >= len(self._candidates):
+                return False
+            self._index += 1
+            self.logger.warning(
+                "Page size %s was rejected, falling back to %s.",
+                page_size,
+                self.page_size,
+            )
+            return True
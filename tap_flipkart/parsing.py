@@ -0,0 +1,213 @@
+"""Response body parsing helpers for Flipkart streams."""
+
+from __future__ import annotations
+
+import codecs
+import functools
+import json
+import re
+import typing as t
+
+from singer_sdk.helpers.jsonpath import extract_jsonpath
+
+if t.TYPE_CHECKING:
+    import requests
+
+_SIMPLE_JSONPATH = re.compile(r"^\$(?:\.(?P<key>\w+))?(?P<wildcard>\[\*\])?$")
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER_CHARACTERS = frozenset("0123456789.eE+-")
+
+# Bytes read from the network at a time when parsing a streamed response.
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def decode_json(response: requests.Response) -> t.Any:  # noqa: ANN401
+    """Decode a response body, caching the result on the response.
+
+    Pagination and record extraction both read the body, so each page is
+    decoded only once.
+
+    Args:
+        response: A raw `requests.Response` object.
+
+    Returns:
+        The decoded JSON document.
+    """
+    try:
+        return response._flipkart_json  # type: ignore[attr-defined]  # noqa: SLF001
+    except AttributeError:
+        decoded = response.json()
+        response._flipkart_json = decoded  # type: ignore[attr-defined]  # noqa: SLF001
+        return decoded
+
+
+@functools.lru_cache(maxsize=None)
+def _parse_simple_jsonpath(expression: str) -> tuple[str | None, bool] | None:
+    match = _SIMPLE_JSONPATH.match(expression)
+    if not match:
+        return None
+    return match.group("key"), bool(match.group("wildcard"))
+
+
+def extract(expression: str, document: t.Any) -> t.Iterator[t.Any]:  # noqa: ANN401
+    """Extract values from a decoded document.
+
+    Expressions of the form `$`, `$.key`, `$[*]` and `$.key[*]`, which cover
+    all Flipkart response layouts, are resolved with direct key access. Any
+    other expression falls back to the SDK's JSONPath engine.
+
+    Args:
+        expression: JSONPath expression to match against the document.
+        document: A decoded JSON document.
+
+    Yields:
+        Each value matched by the expression.
+    """
+    simple = _parse_simple_jsonpath(expression)
+    if simple is None:
+        yield from extract_jsonpath(expression, input=document)
+        return
+
+    key, wildcard = simple
+    value = document
+    if key is not None:
+        if not isinstance(document, dict) or key not in document:
+            return
+        value = document[key]
+    if wildcard and isinstance(value, list):
+        yield from value
+    else:
+        yield value
+
+
+def array_key(expression: str) -> str | None:
+    """Return `key` for expressions of the form `$.key[*]`, else None.
+
+    Args:
+        expression: A JSONPath expression.
+
+    Returns:
+        The top-level key holding the array of matched values, if any.
+    """
+    simple = _parse_simple_jsonpath(expression)
+    if simple is None or simple[0] is None or not simple[1]:
+        return None
+    return simple[0]
+
+
+class _JSONStream:
+    """Tokenizer over the text of a JSON document arriving in chunks.
+
+    Only the structure needed to walk a top-level object is parsed here. Each
+    value is decoded as a whole with the C accelerated `json` decoder.
+    """
+
+    def __init__(self, chunks: t.Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer, returning False at the end."""
+        if self._eof:
+            return False
+        self._buffer = self._buffer[self._pos :]
+        self._pos = 0
+        for chunk in self._chunks:
+            text = self._text.decode(chunk)
+            if text:
+                self._buffer += text
+                return True
+        self._buffer += self._text.decode(b"", final=True)
+        self._eof = True
+        return True
+
+    def _error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self._buffer, self._pos)
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character, or "" at the end."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()  # type: ignore[union-attr]
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, characters: str) -> str:
+        """Consume the next character, which must be one of `characters`."""
+        character = self.peek()
+        if not character or character not in characters:
+            msg = f"Expecting one of {characters!r}"
+            raise self._error(msg)
+        self._pos += 1
+        return character
+
+    def value(self) -> t.Any:  # noqa: ANN401
+        """Decode the next complete JSON value."""
+        if not self.peek():
+            msg = "Expecting value"
+            raise self._error(msg)
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number cut off by the end of a chunk decodes as a shorter one
+            truncated = end == len(self._buffer) or (
+                isinstance(value, (int, float))
+                and self._buffer[end] in _NUMBER_CHARACTERS
+            )
+            if not truncated or not self._fill():
+                self._pos = end
+                return value
+
+
+def iter_json_array(response: requests.Response, key: str) -> t.Iterator[t.Any]:
+    """Yield the items of the top-level array `key` while the body arrives.
+
+    Only one item is held in memory at a time. All other top-level values,
+    such as pagination fields, are decoded as usual and cached for
+    :func:`decode_json` once the body has been read, without the array.
+
+    Args:
+        response: A `requests.Response` whose body has not been read yet.
+        key: Key of the array within the top-level object.
+
+    Yields:
+        Each item of the array.
+
+    Raises:
+        JSONDecodeError: If the body is not a JSON object.
+    """
+    stream = _JSONStream(response.iter_content(STREAM_CHUNK_SIZE))
+    document: dict[str, t.Any] = {}
+    stream.expect("{")
+    if stream.peek() == "}":
+        stream.expect("}")
+    else:
+        while True:
+            name = stream.value()
+            if not isinstance(name, str):
+                msg = "Expecting property name"
+                raise stream._error(msg)  # noqa: SLF001
+            stream.expect(":")
+            if name == key and stream.peek() == "[":
+                stream.expect("[")
+                if stream.peek() == "]":
+                    stream.expect("]")
+                else:
+                    while True:
+                        yield stream.value()
+                        if stream.expect(",]") == "]":
+                            break
+            else:
+                document[name] = stream.value()
+            if stream.expect(",}") == "}":
+                break
+    response._flipkart_json = document  # type: ignore[attr-defined]  # noqa: SLF001
@@ -0,0 +1,132 @@
+"""Client-side rate limiting for the Flipkart API."""
+
+from __future__ import annotations
+
+import email.utils
+import threading
+import time
+import typing as t
+
+if t.TYPE_CHECKING:
+    import requests
+
+# Throttled requests reduce the request rate to no less than this fraction
+MIN_RATE_FRACTION = 0.1
+
+
+def get_retry_after(response: requests.Response | None) -> float | None:
+    """Return the number of seconds a response asks the client to wait.
+
+    Args:
+        response: A response which may carry a `Retry-After` header.
+
+    Returns:
+        The delay in seconds, or None if the response has no usable header.
+    """
+    if response is None:
+        return None
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+class RateLimiter:
+    """Token bucket shared by every request of the tap process.
+
+    When a request is throttled by the API the bucket pauses all requests for
+    the `Retry-After` delay and halves its rate, which then recovers
+    additively with each successful request (AIMD). Without a configured rate
+    the bucket never blocks, but still honors `Retry-After` pauses.
+    """
+
+    def __init__(
+        self,
+        rate: float | None = None,
+        burst: int | None = None,
+        clock: t.Callable[[], float] = time.monotonic,
+        sleep: t.Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Create a new rate limiter.
+
+        Args:
+            rate: Maximum sustained requests per second, or None for no limit.
+            burst: Maximum number of requests sent back to back.
+            clock: Monotonic clock returning seconds.
+            sleep: Function used to wait.
+        """
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(burst or 1, 1)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self.throttled_seconds = 0.0
+        self.throttle_count = 0
+
+    def acquire(self) -> float:
+        """Wait until a request may be sent.
+
+        Returns:
+            The number of seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                wait = self._reserve()
+                if wait <= 0:
+                    self.throttled_seconds += waited
+                    return waited
+            self._sleep(wait)
+            waited += wait
+
+    def throttle(self, retry_after: float | None = None) -> None:
+        """Register a throttled response.
+
+        Args:
+            retry_after: Seconds the API asked the client to wait, if any.
+        """
+        with self._lock:
+            self.throttle_count += 1
+            if retry_after:
+                self._paused_until = max(
+                    self._paused_until,
+                    self._clock() + retry_after,
+                )
+            if self.max_rate:
+                self.rate = max(self.rate / 2, self.max_rate * MIN_RATE_FRACTION)
+
+    def succeed(self) -> None:
+        """Register a successful response, recovering the request rate."""
+        if not self.max_rate or self.rate >= self.max_rate:
+            return
+        with self._lock:
+            step = self.max_rate * MIN_RATE_FRACTION / 10
+            self.rate = min(self.rate + step, self.max_rate)
+
+    def _reserve(self) -> float:
+        now = self._clock()
+        if now < self._paused_until:
+            return self._paused_until - now
+        if not self.rate:
+            return 0.0
+        self._tokens = min(
+            self._tokens + (now - self._updated) * self.rate,
+            float(self.burst),
+        )
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
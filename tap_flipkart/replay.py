@@ -0,0 +1,49 @@
+"""Offline replay of archived response pages.
+
+In `page_archive.mode` `replay`, the records of every partition are parsed
+from the pages archived by the latest complete sync, instead of being
+requested, and post-processed as if they came from the API.
+"""
+
+from __future__ import annotations
+
+import typing as t
+
+from tap_flipkart.engine import PagedStream
+
+
+class ReplayableStream(PagedStream):
+    """A stream reading its pages from the page archive when replaying."""
+
+    def get_records(self, context: dict | None) -> t.Iterable[dict[str, t.Any]]:
+        """Return the records of a partition, from the archive when replaying.
+
+        Args:
+            context: Stream partition or context dictionary.
+
+        Yields:
+            One item per (possibly processed) record.
+        """
+        archive = self._tap.page_archive
+        if archive is not None and archive.replay:
+            yield from self._replay_partition(context)
+        else:
+            yield from super().get_records(context)
+
+    def _replay_partition(
+        self,
+        context: dict | None,
+    ) -> t.Iterable[dict[str, t.Any]]:
+        """Parse and post-process the archived pages of a partition.
+
+        Args:
+            context: Stream partition or context dictionary.
+
+        Yields:
+            One item per (possibly processed) archived record.
+        """
+        for response in self._tap.page_archive.responses(self.name, context):
+            for record in self._parse_page(response):
+                transformed = self.post_process(record, context)
+                if transformed is not None:
+                    yield transformed
@@ -0,0 +1,381 @@
+"""Sharded extraction across independent tap processes.
+
+A sync is split into units of work: the partitions of every stream, with
+shipment partitions further split into fixed date windows. Each tap process
+syncs the units of one shard, selected by `sharding.shard_index` out of
+`sharding.shard_count` or listed in a plan file, and writes its own state.
+The shard states are then combined into one state with :func:`merge_states`.
+
+Example:
+    python -m tap_flipkart.sharding plan --config config.json --shards 4 > plan.json
+    python -m tap_flipkart.sharding merge state-0.json state-1.json > state.json
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import sys
+import typing as t
+from pathlib import Path
+
+import pendulum
+from singer_sdk.exceptions import ConfigValidationError
+
+from tap_flipkart.cadence import LAST_SYNCED_KEY
+
+if t.TYPE_CHECKING:
+    from singer_sdk import Tap
+
+# Context key of the date window of a sharded partition
+SHARD_WINDOW_KEY = "shard_window"
+# Partition state key set once all records of a window were emitted
+WINDOW_COMPLETE_KEY = "shard_window_complete"
+# Partition state key of the end of the last emitted request window, for
+# partitions bookmarked by their request windows rather than their records
+WINDOW_END_KEY = "window_end"
+DEFAULT_WINDOW_DAYS = 30
+
+
+def default_end_date() -> datetime.datetime:
+    """Return the start of the current UTC day.
+
+    Windows end on a date every shard of a run agrees on, rather than on the
+    time each process happens to start.
+    """
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def split_windows(
+    start: datetime.datetime,
+    end: datetime.datetime,
+    width: datetime.timedelta,
+) -> list[tuple[datetime.datetime, datetime.datetime]]:
+    """Split `start` to `end` into consecutive windows of `width`.
+
+    Args:
+        start: Start of the first window.
+        end: End of the last window, which may be shorter than `width`.
+        width: Width of the windows.
+
+    Returns:
+        A list of `(start, end)` windows, empty if `start` is not before `end`.
+    """
+    windows = []
+    while start < end:
+        windows.append((start, min(start + width, end)))
+        start += width
+    return windows
+
+
+def window_context(
+    context: dict,
+    start: datetime.datetime,
+    end: datetime.datetime,
+) -> dict:
+    """Return the partition context of `context` restricted to a window.
+
+    Args:
+        context: A stream partition context.
+        start: Start of the window.
+        end: End of the window.
+
+    Returns:
+        A new partition context, whose state is kept apart from `context`.
+    """
+    return {
+        **context,
+        SHARD_WINDOW_KEY: {"start": start.isoformat(), "end": end.isoformat()},
+    }
+
+
+def parse_window(context: dict) -> tuple[datetime.datetime, datetime.datetime] | None:
+    """Return the window of a sharded partition context, if any.
+
+    Args:
+        context: A stream partition context.
+
+    Returns:
+        The `(start, end)` window, or None for whole partitions.
+    """
+    window = context.get(SHARD_WINDOW_KEY)
+    if not window:
+        return None
+    return (
+        datetime.datetime.fromisoformat(window["start"]),
+        datetime.datetime.fromisoformat(window["end"]),
+    )
+
+
+def base_context(context: dict) -> dict:
+    """Return the whole partition of a sharded partition context.
+
+    Args:
+        context: A stream partition context.
+
+    Returns:
+        `context` without its window.
+    """
+    return {k: v for k, v in context.items() if k != SHARD_WINDOW_KEY}
+
+
+class ShardPlan:
+    """Assign units of work to the shard run by this process.
+
+    Without a plan file, the units of every stream are dealt round-robin to
+    `shard_count` shards in order, so consecutive date windows go to
+    different shards. A plan file instead lists the units of every shard
+    explicitly, as written by `python -m tap_flipkart.sharding plan`.
+    """
+
+    def __init__(
+        self,
+        shard_index: int,
+        shard_count: int = 1,
+        shards: list[list[dict]] | None = None,
+    ) -> None:
+        """Create a plan.
+
+        Args:
+            shard_index: Index of the shard run by this process.
+            shard_count: Number of shards. Ignored when `shards` is given.
+            shards: Units of every shard, as `{"stream", "context"}` objects.
+
+        Raises:
+            ConfigValidationError: If the shard index is out of range.
+        """
+        if shards is not None:
+            shard_count = len(shards)
+        if not 0 <= shard_index < shard_count:
+            msg = f"Shard index {shard_index} is out of range for {shard_count} shards"
+            raise ConfigValidationError(msg)
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.shards = shards
+
+    @classmethod
+    def from_config(cls, config: t.Mapping[str, t.Any]) -> ShardPlan | None:
+        """Create the plan of a tap from its `sharding` settings.
+
+        Args:
+            config: Tap configuration.
+
+        Returns:
+            The plan, or None if sharding is not configured.
+        """
+        sharding = config.get("sharding") or {}
+        if "shard_index" not in sharding:
+            return None
+        shards = None
+        if sharding.get("plan_file"):
+            plan = json.loads(Path(sharding["plan_file"]).read_text())
+            shards = plan["shards"]
+        return cls(sharding["shard_index"], sharding.get("shard_count", 1), shards)
+
+    def select(self, stream_name: str, units: list[dict]) -> list[dict]:
+        """Return the partitions of a stream synced by this shard.
+
+        Args:
+            stream_name: Name of the stream.
+            units: All units of work of the stream, in order.
+
+        Returns:
+            The partition contexts assigned to this shard.
+        """
+        if self.shards is not None:
+            return [
+                unit["context"]
+                for unit in self.shards[self.shard_index]
+                if unit["stream"] == stream_name
+            ]
+        return units[self.shard_index :: self.shard_count]
+
+
+def build_plan(tap: Tap, shard_count: int) -> dict:
+    """Deal the units of work of every stream of `tap` to `shard_count` shards.
+
+    Units are dealt round-robin over all streams, so shards get a similar
+    number of units and consecutive date windows go to different shards.
+
+    Args:
+        tap: A tap configured without a shard index.
+        shard_count: Number of shards.
+
+    Returns:
+        A plan object, as read by the `sharding.plan_file` setting.
+    """
+    shards: list[list[dict]] = [[] for _ in range(shard_count)]
+    index = 0
+    for stream in tap.streams.values():
+        if not stream.selected:
+            continue
+        for context in stream.shard_units(stream.partitions or []):
+            unit = {"stream": stream.name, "context": context}
+            shards[index % shard_count].append(unit)
+            index += 1
+    return {"shards": shards}
+
+
+def _context_key(context: dict) -> str:
+    return json.dumps(context, sort_keys=True)
+
+
+def _timestamp(value: t.Any) -> datetime.datetime:  # noqa: ANN401
+    return pendulum.parse(str(value))
+
+
+def _bookmark(entry: dict) -> str | None:
+    """Return the bookmark of a partition state, by window end or by record."""
+    return entry.get(WINDOW_END_KEY) or entry.get("replication_key_value")
+
+
+def _latest(entries: list[dict]) -> dict:
+    """Return the partition state with the most recent bookmark."""
+    bookmarked = [e for e in entries if _bookmark(e) is not None]
+    if not bookmarked:
+        return entries[0]
+    return max(bookmarked, key=lambda e: _timestamp(_bookmark(e)))
+
+
+def _merge_windows(base: dict | None, windows: list[dict]) -> str | None:
+    """Return the bookmark covered by the windows of a partition.
+
+    The bookmark only advances over windows that follow each other without a
+    gap. It moves to the end of every complete window, and into the first
+    incomplete one as far as that window was checkpointed.
+    """
+    windows = sorted(windows, key=lambda e: parse_window(e["context"])[0])
+    value = _bookmark(base) if base else None
+    covered = parse_window(windows[0]["context"])[0]
+    for entry in windows:
+        start, end = parse_window(entry["context"])
+        if start > covered:
+            break
+        if entry.get(WINDOW_COMPLETE_KEY):
+            value = end.isoformat()
+            covered = end
+            continue
+        checkpoint = _bookmark(entry)
+        if checkpoint is not None and start <= _timestamp(checkpoint) <= end:
+            value = checkpoint
+        break
+    return value
+
+
+def merge_states(states: t.Iterable[dict]) -> dict:
+    """Combine the states written by the shards of a sync into one state.
+
+    For partitions synced whole, the most recent bookmark of any shard wins.
+    Partitions synced in date windows are bookmarked up to the end of the
+    windows completed without a gap, and their window states are dropped.
+
+    Args:
+        states: Singer states of the shards, all started from the same state.
+
+    Returns:
+        The merged state, to pass to the next sync.
+    """
+    # stream -> context key -> (partition states, window partition states)
+    partitions: dict[str, dict[str, tuple[list[dict], list[dict]]]] = {}
+    for state in states:
+        for stream_name, stream_state in state.get("bookmarks", {}).items():
+            stream_partitions = partitions.setdefault(stream_name, {})
+            for entry in stream_state.get("partitions", []):
+                context = dict(entry["context"])
+                is_window = context.pop(SHARD_WINDOW_KEY, None) is not None
+                entries = stream_partitions.setdefault(_context_key(context), ([], []))
+                entries[is_window].append(entry)
+
+    bookmarks = {
+        stream_name: {
+            "partitions": [
+                _merge_partition(entries, windows)
+                for entries, windows in stream_partitions.values()
+            ],
+        }
+        for stream_name, stream_partitions in partitions.items()
+    }
+    return {"bookmarks": bookmarks}
+
+
+def _merge_partition(entries: list[dict], windows: list[dict]) -> dict:
+    """Merge the states of a partition, synced whole or in date windows."""
+    base = _latest(entries) if entries else None
+    # The sync cadence is kept per whole partition by every shard
+    last_synced = [e[LAST_SYNCED_KEY] for e in entries if e.get(LAST_SYNCED_KEY)]
+    if not windows:
+        if last_synced:
+            base = {**base, LAST_SYNCED_KEY: max(last_synced, key=_timestamp)}
+        return base
+    context = dict(windows[0]["context"])
+    context.pop(SHARD_WINDOW_KEY)
+    entry = {"context": context}
+    if last_synced:
+        entry[LAST_SYNCED_KEY] = max(last_synced, key=_timestamp)
+    replication_key = next(
+        (e["replication_key"] for e in windows if "replication_key" in e),
+        base and base.get("replication_key"),
+    )
+    value = _merge_windows(base, windows)
+    if value is not None and any(WINDOW_END_KEY in e for e in [*windows, base or {}]):
+        entry[WINDOW_END_KEY] = value
+    elif replication_key and value is not None:
+        entry["replication_key"] = replication_key
+        entry["replication_key_value"] = value
+    return entry
+
+
+def _read_state(path: str) -> dict:
+    """Read a state file, or the last STATE message of a Singer output file."""
+    text = Path(path).read_text()
+    try:
+        state = json.loads(text)
+    except json.JSONDecodeError:
+        # One message per line
+        messages = [json.loads(line) for line in text.splitlines() if line.strip()]
+        state = next(m for m in reversed(messages) if m.get("type") == "STATE")
+    if state.get("type") == "STATE":
+        return state["value"]
+    return state
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Write a shard plan or a merged state to stdout."""
+    # Imported here, as the tap itself only needs the plan helpers
+    import argparse  # noqa: PLC0415
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    plan = commands.add_parser("plan", help="Write a plan file for a sharded sync.")
+    plan.add_argument("--config", required=True, help="Tap config file.")
+    plan.add_argument("--state", help="State the shards will be started from.")
+    plan.add_argument("--catalog", help="Catalog the shards will be run with.")
+    plan.add_argument("--shards", type=int, required=True)
+    merge = commands.add_parser("merge", help="Merge the states written by shards.")
+    merge.add_argument("states", nargs="+", help="State or Singer output files.")
+    args = parser.parse_args(argv)
+
+    if args.command == "merge":
+        output = merge_states(_read_state(path) for path in args.states)
+    else:
+        from tap_flipkart.tap import TapFlipkart  # noqa: PLC0415
+
+        config = json.loads(Path(args.config).read_text())
+        sharding = {
+            key: value
+            for key, value in (config.get("sharding") or {}).items()
+            if key not in ("shard_index", "shard_count", "plan_file")
+        }
+        tap = TapFlipkart(
+            config={**config, "sharding": sharding},
+            state=args.state and _read_state(args.state),
+            catalog=args.catalog,
+        )
+        output = build_plan(tap, args.shards)
+    json.dump(output, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
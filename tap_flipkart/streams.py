@@ -2,17 +2,28 @@
 
 from __future__ import annotations
 
+import functools
 import typing as t
-from pathlib import Path
 import requests
 import datetime
 
+import pendulum
+
+from tap_flipkart.accounts import ACCOUNT_KEY
 from tap_flipkart.client import FlipkartStream
-from singer_sdk import metrics
+from tap_flipkart.engine import BadRequestError
+from tap_flipkart.enrichment import BatchedChildStream
+from tap_flipkart.sharding import (
+    DEFAULT_WINDOW_DAYS,
+    WINDOW_END_KEY,
+    default_end_date,
+    parse_window,
+    split_windows,
+    window_context,
+)
+from tap_flipkart.windows import AdaptiveWindowPlanner
+from singer_sdk.exceptions import FatalAPIError, RetriableAPIError
 from singer_sdk.streams.rest import _TToken
-from typing import Iterable, Any
-
-SCHEMAS_DIR = Path(__file__).parent / Path("./schemas")
 
 
 class ReturnsStream(FlipkartStream):
@@ -23,9 +34,10 @@ class ReturnsStream(FlipkartStream):
     path = f"/{api_version}/returns"
     records_jsonpath = "$.returnItems[*]"
     primary_keys: t.ClassVar[list[str]] = ["returnId"]
-    schema_filepath = SCHEMAS_DIR / "returns.json"
+    replication_key = "updatedDate"
     rest_method = "GET"
     next_page_token_jsonpath = "$.nextUrl"
+    page_size_candidates = (100, 50, 20, None)
 
     def get_url_params(
         self,
@@ -34,9 +46,16 @@ class ReturnsStream(FlipkartStream):
     ) -> dict[str, t.Any] | str:
         if next_page_token:
             return {}
-        return {
+        params = {
             "source": context["source"]
         }
+        page_size = self.page_size_tuner.page_size
+        if page_size:
+            params["pageSize"] = page_size
+        starting_timestamp = self.get_starting_timestamp(context)
+        if starting_timestamp:
+            params["modifiedAfter"] = self.format_api_date(starting_timestamp)
+        return params
     
     def prepare_request(
         self,
@@ -75,7 +94,24 @@ class ReturnsStream(FlipkartStream):
         Returns:
             A list of partition key dicts (if applicable), otherwise `None`.
         """
-        return [{"source": "courier_return"}, {"source": "customer_return"}]
+        return self.select_shard_partitions(
+            self.select_due_partitions(
+                self.get_account_partitions(
+                    [{"source": "courier_return"}, {"source": "customer_return"}],
+                ),
+            ),
+        )
+
+    def partition_name(self, context: dict) -> str | None:
+        """Return the name of a partition in `sync_cadence` rules.
+
+        Args:
+            context: Stream partition context.
+
+        Returns:
+            The return source of the partition.
+        """
+        return context.get("source")
 
     def post_process(
         self,
@@ -109,69 +145,42 @@ class ShipmentsStream(FlipkartStream):
     path = "/v3/shipments/filter"
     records_jsonpath = "$.shipments[*]"
     primary_keys: t.ClassVar[list[str]] = ["shipmentId"]
-    schema_filepath = SCHEMAS_DIR / "shipments.json"
+    replication_key = "updatedAt"
     rest_method = "POST"
+    default_page_size = 20
+    page_size_candidates = (100, 50, 20)
+    # Shipments move between states, and so between partitions, during a sync
+    deduplicate_records = True
 
-
-    def __init__(self, *args, **kwargs):
-        """Initialize the REST stream.
-
-        Args:
-            tap: Singer Tap this stream belongs to.
-            schema: JSON schema for records in this stream.
-            name: Name of this stream.
-            path: URL path for this entity stream.
-        """
-        super().__init__(*args, **kwargs)
-        self._from_date = None
-        self._to_date = None
-
-    def _get_date_ranges(self, start_date: datetime.datetime, hours: int) -> list[tuple[datetime.datetime, datetime.datetime]]:
-        """
-        Generates a list of tuples representing time ranges from a past date until today.
+    def _get_window_planner(
+        self,
+        start_date: datetime.datetime,
+        end_date: datetime.datetime | None = None,
+    ) -> AdaptiveWindowPlanner:
+        """Return a planner covering the order dates from `start_date`.
 
         Args:
-            start_date: A datetime object representing a date in the past.
+            start_date: The earliest order date to request.
+            end_date: The latest order date to request. Defaults to now.
 
         Returns:
-            A list of tuples, where each tuple represents a time range (start date, end date).
+            An adaptive date window planner.
         """
-        current_date = datetime.datetime.combine(start_date, datetime.time.min)
-
-        ranges = []
-        now = datetime.datetime.now()
-        while current_date <= now:
-            range_end = current_date + datetime.timedelta(hours=hours)
-            ranges.append((current_date, range_end))
-            current_date = range_end
-        return ranges
-
-    def get_records(self, context: dict | None) -> Iterable[dict[str, Any]]:
-        """Return a generator of record-type dictionary objects.
-
-        Each record emitted should be a dictionary of property names to their values.
-
-        Args:
-            context: Stream partition or context dictionary.
-
-        Yields:
-            One item per (possibly processed) record in the API.
-        """
-        # TODO: use SDK method for coalescing start_date and bookmark
-        start_date = self.config.get("start_date")
-        # Related to challenges with https://github.com/meltano/tap-flipkart/issues/9
-        if start_date and context["filter"]["states"][0] == "DELIVERED":
-            hour_diff = 1
-            previous_range = (datetime.date.today() - datetime.timedelta(hours=hour_diff))
-            start_date = datetime.datetime.strptime(start_date, '%Y-%m-%d').date()
-            if start_date < previous_range:
-                ranges = self._get_date_ranges(start_date, hour_diff)
-                for (start, end) in ranges:
-                    self._from_date =  datetime.datetime.strftime(start, "%Y-%m-%dT%H:%M:%S.%fZ")
-                    self._to_date = datetime.datetime.strftime(end, "%Y-%m-%dT%H:%M:%S.%fZ")
-                    yield from super().get_records(context)
-        else:
-            yield from super().get_records(context)
+        window_config = self.config.get("delivered_window") or {}
+        return AdaptiveWindowPlanner(
+            start_date,
+            end_date or datetime.datetime.now(datetime.timezone.utc),
+            initial_window=datetime.timedelta(
+                hours=window_config.get("initial_hours", 24 * 7),
+            ),
+            min_window=datetime.timedelta(hours=window_config.get("min_hours", 1)),
+            max_window=datetime.timedelta(
+                hours=window_config.get("max_hours", 24 * 30),
+            ),
+            target_records=window_config.get("target_records", 1000),
+            split_errors=(BadRequestError,),
+            logger=self.logger,
+        )
 
     def prepare_request_payload(
         self,
@@ -189,19 +198,41 @@ class ShipmentsStream(FlipkartStream):
         Returns:
             A dictionary with the JSON body for a POST requests.
         """
-        if context["filter"]["states"][0] == "DELIVERED":
-            # Related to challenges with https://github.com/meltano/tap-flipkart/issues/9
-            context["filter"]["orderDate"] = {
-                "from": self._from_date,
-                "to": self._to_date
-            }
         return {
             "filter": context["filter"],
             "pagination": {
-                "pageSize": 20
+                "pageSize": self.page_size_tuner.page_size
             },
         }
 
+    def prepare_request(
+        self,
+        context: dict | None,
+        next_page_token: _TToken | None,
+    ) -> requests.PreparedRequest:
+        """Prepare a request object for this stream.
+
+        The first page is requested by POSTing the filter. Subsequent pages
+        are fetched with a GET request to the returned `nextPageUrl`.
+
+        Args:
+            context: Stream partition or context dictionary.
+            next_page_token: Token, page number or any request argument to request the
+                next page of data.
+
+        Returns:
+            Build a request with the stream's URL, path, query parameters,
+            HTTP headers and authenticator.
+        """
+        if not next_page_token:
+            return super().prepare_request(context, next_page_token)
+        # It wants you to switch from POST to GET once you get a pagination URL
+        return self.build_prepared_request(
+            method="GET",
+            url="".join([self.url_base, next_page_token]),
+            headers=self.http_headers,
+        )
+
     @property
     def partitions(self) -> list[dict] | None:
         """Get stream partitions.
@@ -300,7 +331,75 @@ class ShipmentsStream(FlipkartStream):
                     partitions.append(partition)
         else:
             partitions = available_partitions
-        return partitions
+        return self.select_shard_partitions(
+            self.select_due_partitions(self.get_account_partitions(partitions)),
+        )
+
+    def partition_name(self, context: dict) -> str | None:
+        """Return the name of a partition in `sync_cadence` rules.
+
+        Args:
+            context: Stream partition context.
+
+        Returns:
+            The shipment state of the partition.
+        """
+        return context["filter"]["states"][0]
+
+    def bookmarks_windows(self, context: dict) -> bool:
+        """Return True for the DELIVERED partition.
+
+        DELIVERED is requested by order date, so it is bookmarked on the end
+        of its last order date window rather than on the `updatedAt` of its
+        records.
+
+        Args:
+            context: Stream partition context.
+
+        Returns:
+            True if the partition is bookmarked by its order date windows.
+        """
+        return context["filter"]["states"][0] == "DELIVERED"
+
+    def shard_units(self, partitions: list[dict]) -> list[dict]:
+        """Split partitions into date windows for a sharded sync.
+
+        Partitions with a bookmark or `start_date` are split into windows of
+        `sharding.window_days` from their bookmark until `sharding.end_date`.
+        Partitions without a starting date are synced whole.
+
+        Args:
+            partitions: The partitions of the stream.
+
+        Returns:
+            Partition contexts, restricted to date windows where possible.
+        """
+        sharding = self.config.get("sharding") or {}
+        end = sharding.get("end_date")
+        end = pendulum.parse(end) if end else default_end_date()
+        window_days = sharding.get("window_days", DEFAULT_WINDOW_DAYS)
+        width = datetime.timedelta(days=window_days)
+        units = []
+        for partition in partitions:
+            start = self._get_partition_bookmark(partition)
+            start = start or self.config.get("start_date")
+            if not start:
+                units.append(partition)
+                continue
+            units.extend(
+                window_context(partition, *window)
+                for window in split_windows(pendulum.parse(start), end, width)
+            )
+        return units
+
+    def _get_partition_bookmark(self, context: dict) -> str | None:
+        """Return the bookmark of a partition in the state, without adding it."""
+        for partition in self.stream_state.get("partitions", []):
+            if partition["context"] == context:
+                return partition.get(WINDOW_END_KEY) or partition.get(
+                    "replication_key_value",
+                )
+        return None
 
     def post_process(
         self,
@@ -329,10 +428,26 @@ class ShipmentsStream(FlipkartStream):
         row["shipment_status_cancellation_type"] = context["filter"].get("cancellationType")
         return row
 
+    def get_child_context(self, record: dict, context: dict | None) -> dict:  # noqa: ARG002
+        """Return the context of the enrichment streams of a shipment.
+
+        Args:
+            record: Individual record in the stream.
+            context: Stream partition or context dictionary.
+
+        Returns:
+            The shipment ID and, if set, the account of the shipment.
+        """
+        child_context = {"shipmentId": record["shipmentId"]}
+        if record.get(ACCOUNT_KEY) is not None:
+            child_context[ACCOUNT_KEY] = record[ACCOUNT_KEY]
+        return child_context
+
     def request_records(self, context: dict | None) -> t.Iterable[dict]:
         """Request records from REST endpoint(s), returning response records.
 
-        If pagination is detected, pages will be recursed automatically.
+        The DELIVERED partition is requested in adaptive order date windows.
+        Partitions of a sharded sync only cover their shard window.
 
         Args:
             context: Stream partition or context dictionary.
@@ -340,29 +455,203 @@ class ShipmentsStream(FlipkartStream):
         Yields:
             An item for every record in the response.
         """
-        paginator = self.get_new_paginator()
-        decorated_request = self.request_decorator(self._request)
-
-        with metrics.http_request_counter(self.name, self.path) as request_counter:
-            request_counter.context = context
-
-            first = True
-            while not paginator.finished:
-                if first:
-                    first = False
-                    prepared_request = self.prepare_request(
-                        context,
-                        next_page_token=paginator.current_value,
-                    )
-                else:
-                    # It wants you to switch from POST to GET once you get a pagination URL
-                    url = "".join([self.url_base, paginator.current_value])
-                    prepared_request = self.build_prepared_request(
-                        method="GET",
-                        url=url,
-                    )
-                resp = decorated_request(prepared_request, context)
-                request_counter.increment()
-                self.update_sync_costs(prepared_request, resp, context)
-                yield from self.parse_response(resp)
-                paginator.advance(resp)
+        starting_timestamp = self.get_starting_timestamp(context)
+        end = None
+        shard_window = parse_window(context)
+        if shard_window:
+            # Resume from the bookmark of the window itself, if synced before
+            starting_timestamp = max(
+                starting_timestamp or shard_window[0],
+                shard_window[0],
+            )
+            end = shard_window[1]
+        if not starting_timestamp:
+            synced_until = datetime.datetime.now(datetime.timezone.utc)
+            yield from self._request_pages(context)
+            if self.bookmarks_windows(context):
+                self.checkpoint(context, synced_until.isoformat())
+        elif self.bookmarks_windows(context):
+            # Related to challenges with https://github.com/meltano/tap-flipkart/issues/9
+            # DELIVERED is bookmarked on the end of the last order date window
+            cursor = self.pop_page_cursor(context, starting_timestamp)
+            if cursor is not None:
+                yield from self._resume_window(context, *cursor)
+                starting_timestamp = cursor[1]
+            planner = self._get_window_planner(starting_timestamp, end)
+            max_concurrency = (self.config.get("delivered_window") or {}).get(
+                "max_concurrency",
+                1,
+            )
+            if max_concurrency > 1:
+                yield from planner.run_concurrently(
+                    functools.partial(self._request_window_concurrently, context),
+                    max_concurrency,
+                )
+            else:
+                yield from planner.run(
+                    lambda start, end: self._request_window(
+                        context, "orderDate", start, end,
+                    ),
+                )
+        else:
+            yield from self._request_window(
+                context,
+                "modifiedDate",
+                starting_timestamp,
+                end or datetime.datetime.now(datetime.timezone.utc),
+            )
+        if shard_window:
+            self.complete_window(context)
+
+    def _request_window(
+        self,
+        context: dict,
+        date_filter: str,
+        start: datetime.datetime,
+        end: datetime.datetime,
+        next_page_token: t.Any = None,  # noqa: ANN401
+    ) -> t.Iterable[dict]:
+        """Request all records of a partition within a date window.
+
+        Completed order date windows are checkpointed, and with
+        `checkpoints.page_cursors` enabled so is every page within them.
+
+        Args:
+            context: Stream partition context.
+            date_filter: The filter field to restrict, e.g. `orderDate`.
+            start: Start of the date window.
+            end: End of the date window.
+            next_page_token: Token of the page to resume the window from.
+
+        Yields:
+            An item for every record in the window.
+        """
+        on_page = None
+        checkpoints = self.config.get("checkpoints") or {}
+        if date_filter == "orderDate" and checkpoints.get("page_cursors"):
+            on_page = functools.partial(self.checkpoint_page, context, (start, end))
+        yield from self._request_pages(
+            self._get_window_context(context, date_filter, start, end),
+            next_page_token=next_page_token,
+            on_page=on_page,
+        )
+        if date_filter == "orderDate":
+            self.checkpoint(context, end.isoformat())
+
+    def _resume_window(
+        self,
+        context: dict,
+        start: datetime.datetime,
+        end: datetime.datetime,
+        next_page_token: t.Any,  # noqa: ANN401
+    ) -> t.Iterable[dict]:
+        """Finish an order date window from the page cursor of a previous sync.
+
+        The window is requested from its start again if the API no longer
+        accepts the cursor.
+
+        Args:
+            context: Stream partition context.
+            start: Start of the date window.
+            end: End of the date window.
+            next_page_token: Token of the next page within the window.
+
+        Yields:
+            An item for every remaining record in the window.
+        """
+        self.logger.info(
+            "Resuming order date window %s - %s from its page cursor.",
+            start,
+            end,
+        )
+        records = iter(
+            self._request_window(context, "orderDate", start, end, next_page_token),
+        )
+        try:
+            first = next(records, None)
+        except (FatalAPIError, RetriableAPIError) as ex:
+            self.logger.warning(
+                "Page cursor was rejected, restarting window %s - %s: %s",
+                start,
+                end,
+                ex,
+            )
+            yield from self._request_window(context, "orderDate", start, end)
+            return
+        if first is not None:
+            yield first
+            yield from records
+
+    def _request_window_concurrently(
+        self,
+        context: dict,
+        start: datetime.datetime,
+        end: datetime.datetime,
+    ) -> t.Iterable[dict]:
+        # Runs in a window worker thread, requesting pages of the same partition
+        self._partition_local.context = context
+        yield from self._request_window(context, "orderDate", start, end)
+
+    def _get_window_context(
+        self,
+        context: dict,
+        date_filter: str,
+        start: datetime.datetime,
+        end: datetime.datetime,
+    ) -> dict:
+        """Return a copy of `context` restricted to a date window.
+
+        Args:
+            context: Stream partition context.
+            date_filter: The filter field to restrict, e.g. `orderDate`.
+            start: Start of the date window.
+            end: End of the date window.
+
+        Returns:
+            A request context whose filter includes the date window.
+        """
+        return {
+            **context,
+            "filter": {
+                **context["filter"],
+                date_filter: {
+                    "from": self.format_api_date(start),
+                    "to": self.format_api_date(end),
+                },
+            },
+        }
+
+
+class ShipmentOrderItemsStream(BatchedChildStream):
+    """Order item details of the synced shipments."""
+
+    name = "shipment_order_items"
+    parent_stream_type = ShipmentsStream
+    path = "/v3/shipments/{shipmentIds}"
+    records_jsonpath = "$.shipments[*]"
+    primary_keys: t.ClassVar[list[str]] = ["orderItemId"]
+    replication_key = None
+
+    def parse_response(self, response: requests.Response) -> t.Iterable[dict]:
+        """Parse the order items of every shipment in the response.
+
+        Args:
+            response: A raw `requests.Response` object.
+
+        Yields:
+            One item for every order item of a shipment in the response.
+        """
+        for shipment in super().parse_response(response):
+            for order_item in shipment.get("orderItems") or []:
+                yield {**order_item, "shipmentId": shipment["shipmentId"]}
+
+
+class ShipmentInvoicesStream(BatchedChildStream):
+    """Invoices of the synced shipments."""
+
+    name = "shipment_invoices"
+    parent_stream_type = ShipmentsStream
+    path = "/v3/shipments/{shipmentIds}/invoices"
+    records_jsonpath = "$.invoices[*]"
+    primary_keys: t.ClassVar[list[str]] = ["shipmentId"]
+    replication_key = None
@@ -2,10 +2,28 @@
 
 from __future__ import annotations
 
+import contextlib
+import typing as t
+from functools import cached_property
+
+import requests
+from requests.adapters import HTTPAdapter
+import singer_sdk._singerlib as singer
 from singer_sdk import Tap
 from singer_sdk import typing as th  # JSON schema typing helpers
 
 from tap_flipkart import streams
+from tap_flipkart.accounts import SellerAccount
+from tap_flipkart.auth import FlipkartAuthenticator, TokenManager
+from tap_flipkart.cadence import SyncCadence
+from tap_flipkart.ratelimit import RateLimiter
+from tap_flipkart.sharding import ShardPlan
+
+if t.TYPE_CHECKING:
+    from tap_flipkart.archive import PageArchive
+    from tap_flipkart.changes import ChangeIndex
+    from tap_flipkart.instrumentation import SyncProfile
+    from tap_flipkart.output import MessageWriter
 
 
 class TapFlipkart(Tap):
@@ -17,16 +35,62 @@ class TapFlipkart(Tap):
         th.Property(
             "client_id",
             th.StringType,
-            required=True,
             secret=True,
-            description="The Flipkart API client ID.",
+            description=(
+                "The Flipkart API client ID. Required unless `accounts` is set."
+            ),
         ),
         th.Property(
             "client_secret",
             th.StringType,
-            required=True,
             secret=True,
-            description="The Flipkart API client secret.",
+            description=(
+                "The Flipkart API client secret. Required unless `accounts` is set."
+            ),
+        ),
+        th.Property(
+            "accounts",
+            th.ArrayType(
+                th.ObjectType(
+                    th.Property(
+                        "account_id",
+                        th.StringType,
+                        required=True,
+                        description=(
+                            "Unique name of the account in partitions and records."
+                        ),
+                    ),
+                    th.Property(
+                        "client_id",
+                        th.StringType,
+                        required=True,
+                        secret=True,
+                        description="The account's Flipkart API client ID.",
+                    ),
+                    th.Property(
+                        "client_secret",
+                        th.StringType,
+                        required=True,
+                        secret=True,
+                        description="The account's Flipkart API client secret.",
+                    ),
+                ),
+            ),
+            description=(
+                "Seller accounts synced in one run instead of the top-level "
+                "credentials. Every stream partition is synced per account, with its "
+                "own OAuth token, bookmark and rate limiter, and records are tagged "
+                "with their `account_id`."
+            ),
+        ),
+        th.Property(
+            "api_url",
+            th.StringType,
+            default="https://api.flipkart.net",
+            description=(
+                "The root URL of the Flipkart API. Point this at a local mock server "
+                "for offline testing and benchmarks."
+            ),
         ),
         th.Property(
             "start_date",
@@ -48,9 +112,765 @@ class TapFlipkart(Tap):
                 ),
             ),
             description="An object of include or exclude options for shipment states. If left null then all available states will be selected.",
-        )
+        ),
+        th.Property(
+            "delivered_window",
+            th.ObjectType(
+                th.Property(
+                    "initial_hours",
+                    th.IntegerType,
+                    description=(
+                        "Width of the first order date window. Defaults to 168 (7 "
+                        "days)."
+                    ),
+                ),
+                th.Property(
+                    "min_hours",
+                    th.IntegerType,
+                    description=(
+                        "Windows are never split below this width. Defaults to 1."
+                    ),
+                ),
+                th.Property(
+                    "max_hours",
+                    th.IntegerType,
+                    description=(
+                        "Windows never grow beyond this width. Defaults to 720 (30 "
+                        "days)."
+                    ),
+                ),
+                th.Property(
+                    "target_records",
+                    th.IntegerType,
+                    description=(
+                        "Record count above which the next window is halved. Defaults "
+                        "to 1000."
+                    ),
+                ),
+                th.Property(
+                    "max_concurrency",
+                    th.IntegerType,
+                    description=(
+                        "Number of windows requested at once, in rounds of windows of "
+                        "the current width. Records are still emitted in window order. "
+                        "Defaults to 1."
+                    ),
+                ),
+            ),
+            description=(
+                "Tuning options for the adaptive order date windows used to sync "
+                "DELIVERED shipments. Windows are split when the API rejects them and "
+                "widened after empty windows."
+            ),
+        ),
+        th.Property(
+            "prefetch",
+            th.ObjectType(
+                th.Property(
+                    "enabled",
+                    th.BooleanType,
+                    description=(
+                        "Request the next pages of a partition in a background thread "
+                        "while the records of the current page are emitted."
+                    ),
+                ),
+                th.Property(
+                    "queue_depth",
+                    th.IntegerType,
+                    description=(
+                        "Maximum number of pages requested ahead. Defaults to 2."
+                    ),
+                ),
+                th.Property(
+                    "max_buffer_bytes",
+                    th.IntegerType,
+                    description=(
+                        "Maximum response bytes of the pages requested ahead. Defaults "
+                        "to 33554432 (32 MiB)."
+                    ),
+                ),
+            ),
+            description=(
+                "Opt-in page prefetching, overlapping the network wait for the next "
+                "page with record processing. Records, errors and page checkpoints "
+                "keep their order."
+            ),
+        ),
+        th.Property(
+            "checkpoints",
+            th.ObjectType(
+                th.Property(
+                    "interval_seconds",
+                    th.NumberType,
+                    description=(
+                        "Minimum time between two checkpoint STATE messages. Defaults "
+                        "to 0, a STATE message after every completed window."
+                    ),
+                ),
+                th.Property(
+                    "page_cursors",
+                    th.BooleanType,
+                    description=(
+                        "Also checkpoint the nextPageUrl cursor after every page "
+                        "within a window, and resume the window from it when the API "
+                        "still accepts it."
+                    ),
+                ),
+            ),
+            description=(
+                "Checkpointing of DELIVERED backfills. The bookmark is made resumable "
+                "after each completed order date window, so an interrupted sync "
+                "restarts from the last completed window instead of start_date."
+            ),
+        ),
+        th.Property(
+            "enrichment",
+            th.ObjectType(
+                th.Property(
+                    "batch_size",
+                    th.IntegerType,
+                    description=(
+                        "Shipment IDs requested per bulk lookup, at most 100. Defaults "
+                        "to 100."
+                    ),
+                ),
+                th.Property(
+                    "max_concurrency",
+                    th.IntegerType,
+                    description=(
+                        "Bulk lookups requested at the same time. Defaults to 4."
+                    ),
+                ),
+            ),
+            description=(
+                "Batching of the shipment_order_items and shipment_invoices streams, "
+                "which look up the details of the synced shipments through bulk "
+                "endpoints."
+            ),
+        ),
+        th.Property(
+            "page_archive",
+            th.ObjectType(
+                th.Property(
+                    "mode",
+                    th.StringType,
+                    allowed_values=["archive", "replay"],
+                    description=(
+                        "`archive` saves every response page. `replay` reads the pages "
+                        "of every partition from the archive instead of the API."
+                    ),
+                ),
+                th.Property(
+                    "path",
+                    th.StringType,
+                    description=(
+                        "Directory of the archive. Defaults to tap-flipkart-archive."
+                    ),
+                ),
+                th.Property(
+                    "max_age_days",
+                    th.NumberType,
+                    description=(
+                        "Days after which archived pages are removed. Defaults to "
+                        "keeping them."
+                    ),
+                ),
+            ),
+            description=(
+                "Archive of the raw response pages, gzipped and stored by content hash "
+                "along with their request metadata, and offline replay of the archive."
+            ),
+        ),
+        th.Property(
+            "sync_cadence",
+            th.ObjectType(
+                th.Property(
+                    "default_minutes",
+                    th.NumberType,
+                    description=(
+                        "Minimum minutes between two syncs of partitions that match no "
+                        "rule. Defaults to 0, every run."
+                    ),
+                ),
+                th.Property(
+                    "rules",
+                    th.ArrayType(
+                        th.ObjectType(
+                            th.Property("stream", th.StringType, required=True),
+                            th.Property(
+                                "partitions",
+                                th.ArrayType(th.StringType),
+                                description=(
+                                    "Shipment states of shipments partitions or "
+                                    "sources of returns partitions. Defaults to all "
+                                    "partitions of the stream."
+                                ),
+                            ),
+                            th.Property("minutes", th.NumberType, required=True),
+                        ),
+                    ),
+                    description=(
+                        "Minimum minutes between two syncs of the partitions of a "
+                        "stream. The first matching rule applies."
+                    ),
+                ),
+            ),
+            description=(
+                "Per-partition sync cadence. The start time of the last sync of every "
+                "partition is kept in its state, and each run only syncs the "
+                "partitions whose interval has passed."
+            ),
+        ),
+        th.Property(
+            "sharding",
+            th.ObjectType(
+                th.Property(
+                    "shard_index",
+                    th.IntegerType,
+                    description="Index of the shard synced by this process, from 0.",
+                ),
+                th.Property(
+                    "shard_count",
+                    th.IntegerType,
+                    description=(
+                        "Number of shards the units of work are dealt to round-robin. "
+                        "Defaults to 1."
+                    ),
+                ),
+                th.Property(
+                    "plan_file",
+                    th.StringType,
+                    description=(
+                        "Plan file listing the units of every shard, as written by "
+                        "`python -m tap_flipkart.sharding plan`. Overrides "
+                        "`shard_count`."
+                    ),
+                ),
+                th.Property(
+                    "window_days",
+                    th.IntegerType,
+                    description=(
+                        "Width of the date windows shipment partitions are split into. "
+                        "Defaults to 30."
+                    ),
+                ),
+                th.Property(
+                    "end_date",
+                    th.DateTimeType,
+                    description=(
+                        "End of the last date window. Defaults to the start of the "
+                        "current UTC day, so all shards of a run agree on the windows."
+                    ),
+                ),
+            ),
+            description=(
+                "Sync only one shard of the units of work, so a backfill can be spread "
+                "over several tap processes."
+            ),
+        ),
+        th.Property(
+            "max_concurrent_partitions",
+            th.IntegerType,
+            default=1,
+            description=(
+                "The maximum number of stream partitions to fetch in parallel threads. "
+                "Records are still emitted in partition order."
+            ),
+        ),
+        th.Property(
+            "page_size",
+            th.ObjectType(
+                th.Property(
+                    "shipments",
+                    th.IntegerType,
+                    description=(
+                        "Page size requested from the shipments endpoint. Defaults to "
+                        "20."
+                    ),
+                ),
+                th.Property(
+                    "returns",
+                    th.IntegerType,
+                    description=(
+                        "Page size requested from the returns endpoint. By default no "
+                        "page size is sent."
+                    ),
+                ),
+                th.Property(
+                    "auto_tune",
+                    th.BooleanType,
+                    description=(
+                        "Start with the largest known page size and fall back to "
+                        "smaller ones whenever the API rejects it."
+                    ),
+                ),
+            ),
+            description=(
+                "Page size options per stream. Request counts and durations are tagged "
+                "with the page size in metrics."
+            ),
+        ),
+        th.Property(
+            "http_pool_size",
+            th.IntegerType,
+            default=10,
+            description=(
+                "The maximum number of keep-alive connections kept open to the "
+                "Flipkart API."
+            ),
+        ),
+        th.Property(
+            "rate_limit",
+            th.ObjectType(
+                th.Property(
+                    "requests_per_second",
+                    th.NumberType,
+                    description="Maximum sustained number of requests per second.",
+                ),
+                th.Property(
+                    "burst",
+                    th.IntegerType,
+                    description=(
+                        "Maximum number of requests sent back to back. Defaults to 1."
+                    ),
+                ),
+            ),
+            description=(
+                "Client-side rate limit shared by all streams and partitions. "
+                "Throttled (429/503) responses pause all requests for their "
+                "Retry-After delay and temporarily halve the rate."
+            ),
+        ),
+        th.Property(
+            "stream_responses",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Parse records one at a time while each page is downloaded instead of "
+                "decoding whole pages, which lowers peak memory and time to first "
+                "record. Connection errors while reading a page are then not retried."
+            ),
+        ),
+        th.Property(
+            "fast_output",
+            th.ObjectType(
+                th.Property(
+                    "enabled",
+                    th.BooleanType,
+                    description=(
+                        "Encode messages with orjson when installed and write them to "
+                        "stdout in batches."
+                    ),
+                ),
+                th.Property(
+                    "buffer_size",
+                    th.IntegerType,
+                    description=(
+                        "Bytes of messages collected before they are written. Defaults "
+                        "to 1 MiB."
+                    ),
+                ),
+            ),
+            description=(
+                "Faster output of Singer messages. Messages are encoded with orjson "
+                "when it is installed, and written to stdout in batches rather than "
+                "one write and flush per message. STATE messages are flushed at once. "
+                "The output only differs from the default in JSON whitespace."
+            ),
+        ),
+        th.Property(
+            "trusted_fields",
+            th.ObjectType(
+                th.Property(
+                    "shipments",
+                    th.ArrayType(th.StringType),
+                    description=(
+                        "Top-level shipment fields passed through unchanged, e.g. "
+                        "`subShipments`."
+                    ),
+                ),
+                th.Property(
+                    "returns",
+                    th.ArrayType(th.StringType),
+                    description="Top-level return fields passed through unchanged.",
+                ),
+            ),
+            description=(
+                "Fields per stream whose API values are trusted to match the schema "
+                "and are emitted without type conformance. Fields with deselected "
+                "sub-properties are always conformed."
+            ),
+        ),
+        th.Property(
+            "change_detection",
+            th.ObjectType(
+                th.Property(
+                    "enabled",
+                    th.BooleanType,
+                    description=(
+                        "Skip records whose content is unchanged since they were "
+                        "last emitted."
+                    ),
+                ),
+                th.Property(
+                    "path",
+                    th.StringType,
+                    description=(
+                        "SQLite file of the change index, kept between syncs. Defaults "
+                        "to `tap-flipkart-changes.sqlite`."
+                    ),
+                ),
+                th.Property(
+                    "max_age_days",
+                    th.NumberType,
+                    description=(
+                        "Days after which records no longer returned by the API are "
+                        "removed from the index. Defaults to 30."
+                    ),
+                ),
+                th.Property(
+                    "max_keys",
+                    th.IntegerType,
+                    description=(
+                        "Maximum number of records in the index. The least recently "
+                        "seen records are removed first."
+                    ),
+                ),
+            ),
+            description=(
+                "Persistent change detection, which only emits records whose content "
+                "changed since they were last emitted."
+            ),
+        ),
+        th.Property(
+            "deduplication",
+            th.ObjectType(
+                th.Property(
+                    "enabled",
+                    th.BooleanType,
+                    description=(
+                        "Skip shipments already emitted in an equal or newer version "
+                        "by another state partition. Defaults to true."
+                    ),
+                ),
+                th.Property(
+                    "max_memory_keys",
+                    th.IntegerType,
+                    description=(
+                        "Number of shipment IDs kept in memory before the index spills "
+                        "to a temporary SQLite file. Defaults to 200000."
+                    ),
+                ),
+                th.Property(
+                    "spill_directory",
+                    th.StringType,
+                    description=(
+                        "Directory for the spill file. Defaults to the system "
+                        "temporary directory."
+                    ),
+                ),
+            ),
+            description=(
+                "In-run de-duplication of shipments that move between states while a "
+                "sync is running."
+            ),
+        ),
+        th.Property(
+            "instrumentation",
+            th.ObjectType(
+                th.Property(
+                    "enabled",
+                    th.BooleanType,
+                    description=(
+                        "Time every phase of the sync per stream and partition."
+                    ),
+                ),
+                th.Property(
+                    "metrics",
+                    th.BooleanType,
+                    description=(
+                        "Write the measurements of each completed partition as Singer "
+                        "metrics. Defaults to true."
+                    ),
+                ),
+                th.Property(
+                    "summary_path",
+                    th.StringType,
+                    description=(
+                        "JSON file the measurements of the whole sync are written to "
+                        "at exit."
+                    ),
+                ),
+                th.Property(
+                    "profiler",
+                    th.StringType,
+                    allowed_values=["cprofile", "pyinstrument"],
+                    description=(
+                        "Profile the sync with cProfile, including its worker threads, "
+                        "or pyinstrument if installed, which samples the main thread "
+                        "only."
+                    ),
+                ),
+                th.Property(
+                    "profile_path",
+                    th.StringType,
+                    description=(
+                        "File the profile is written to. Defaults to "
+                        "`tap-flipkart.prof` for cProfile and "
+                        "`tap-flipkart-profile.html` for pyinstrument."
+                    ),
+                ),
+            ),
+            description=(
+                "Timing of the sync phases (OAuth, throttling, request, download, JSON "
+                "decoding, record extraction, type conformance and writes), with "
+                "latency percentiles, response bytes and records per page, and an "
+                "optional profiler."
+            ),
+        ),
+        th.Property(
+            "token_cache_path",
+            th.StringType,
+            description=(
+                "Optional file in which OAuth access tokens are cached until they "
+                "expire, so consecutive or parallel runs can reuse them."
+            ),
+        ),
     ).to_dict()
 
+    def __init__(self, *args: t.Any, **kwargs: t.Any) -> None:
+        """Initialize the tap.
+
+        Args:
+            args: Positional arguments for the SDK tap.
+            kwargs: Keyword arguments for the SDK tap.
+        """
+        self.token_manager = TokenManager()
+        super().__init__(*args, **kwargs)
+
+    @cached_property
+    def accounts(self) -> dict[str | None, SellerAccount]:
+        """Return the seller accounts synced by the tap.
+
+        Returns:
+            The accounts by `account_id`, None for the top-level credentials.
+        """
+        return {
+            account.account_id: account
+            for account in SellerAccount.from_config(self.config)
+        }
+
+    def get_authenticator(
+        self,
+        stream: streams.FlipkartStream,
+        account_id: str | None = None,
+    ) -> FlipkartAuthenticator:
+        """Return the authenticator of an account, shared by all streams.
+
+        Args:
+            stream: The stream the authenticator is first created for.
+            account_id: The account, None for the top-level credentials.
+
+        Returns:
+            The authenticator of the account's credentials.
+        """
+        return self.token_manager.get_authenticator(stream, self.accounts[account_id])
+
+    @cached_property
+    def requests_session(self) -> requests.Session:
+        """Return the pooled HTTP session shared by all streams.
+
+        Returns:
+            A keep-alive `requests.Session` sized by `http_pool_size`.
+        """
+        pool_size = self.config.get("http_pool_size", 10)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @cached_property
+    def rate_limiters(self) -> dict[str | None, RateLimiter]:
+        """Return the rate limiters of the accounts, shared by all streams.
+
+        Returns:
+            A token bucket configured from `rate_limit` per account.
+        """
+        rate_limit = self.config.get("rate_limit") or {}
+        return {
+            account_id: RateLimiter(
+                rate=rate_limit.get("requests_per_second"),
+                burst=rate_limit.get("burst"),
+            )
+            for account_id in self.accounts
+        }
+
+    @cached_property
+    def shard_plan(self) -> ShardPlan | None:
+        """Return the plan selecting the work of this shard.
+
+        Returns:
+            The plan configured by `sharding`, or None for unsharded syncs.
+        """
+        return ShardPlan.from_config(self.config)
+
+    @cached_property
+    def sync_cadence(self) -> SyncCadence | None:
+        """Return the cadence selecting the partitions due in this sync.
+
+        Returns:
+            The cadence configured by `sync_cadence`, or None to sync every
+            partition.
+        """
+        return SyncCadence.from_config(self.config)
+
+    @cached_property
+    def sync_profile(self) -> SyncProfile | None:
+        """Return the instrumentation of this sync.
+
+        Returns:
+            A profile collecting per-phase timings, or None unless enabled
+            by `instrumentation`.
+        """
+        instrumentation = self.config.get("instrumentation") or {}
+        if not instrumentation.get("enabled"):
+            return None
+        from tap_flipkart.instrumentation import SyncProfile  # noqa: PLC0415
+
+        return SyncProfile(
+            write_metrics=instrumentation.get("metrics", True),
+            logger=self.logger,
+        )
+
+    @cached_property
+    def change_index(self) -> ChangeIndex | None:
+        """Return the persistent index of emitted record contents, if enabled.
+
+        Returns:
+            The index configured by `change_detection`, or None.
+        """
+        change_detection = self.config.get("change_detection") or {}
+        if not change_detection.get("enabled"):
+            return None
+        from tap_flipkart.changes import DEFAULT_MAX_AGE_DAYS, ChangeIndex  # noqa: PLC0415
+
+        return ChangeIndex(
+            change_detection.get("path", "tap-flipkart-changes.sqlite"),
+            max_age_days=change_detection.get("max_age_days", DEFAULT_MAX_AGE_DAYS),
+            max_keys=change_detection.get("max_keys"),
+            logger=self.logger,
+        )
+
+    @cached_property
+    def page_archive(self) -> PageArchive | None:
+        """Return the archive of raw response pages, if enabled.
+
+        Returns:
+            The archive configured by `page_archive`, or None.
+        """
+        page_archive = self.config.get("page_archive") or {}
+        if not page_archive.get("mode"):
+            return None
+        from tap_flipkart.archive import ARCHIVE_MODE, DEFAULT_ARCHIVE_PATH, PageArchive  # noqa: PLC0415
+
+        if page_archive["mode"] == ARCHIVE_MODE and self.config.get("stream_responses"):
+            self.logger.info(
+                "Response streaming is disabled, as archived pages are read whole.",
+            )
+        return PageArchive(
+            page_archive.get("path", DEFAULT_ARCHIVE_PATH),
+            mode=page_archive["mode"],
+            max_age_days=page_archive.get("max_age_days"),
+            logger=self.logger,
+        )
+
+    def _commit_change_index(self) -> None:
+        """Save the records emitted by a completed sync to the change index."""
+        change_index = self.__dict__.get("change_index")
+        if change_index is None:
+            return
+        from tap_flipkart.instrumentation import FlipkartMetric, log_metric  # noqa: PLC0415
+
+        for stream_name, count in sorted(change_index.suppressed_counts.items()):
+            self.logger.info(
+                "Skipped %d unchanged records of '%s'.",
+                count,
+                stream_name,
+            )
+            log_metric(
+                FlipkartMetric.UNCHANGED_RECORDS,
+                count,
+                metric_type="counter",
+                stream=stream_name,
+            )
+        change_index.commit()
+
+    @cached_property
+    def message_writer(self) -> MessageWriter | None:
+        """Return the buffered writer of Singer messages, if enabled.
+
+        Returns:
+            A writer configured by `fast_output`, or None to write every
+            message through the SDK.
+        """
+        fast_output = self.config.get("fast_output") or {}
+        if not fast_output.get("enabled"):
+            return None
+        from tap_flipkart.output import DEFAULT_BUFFER_SIZE, MessageWriter  # noqa: PLC0415
+
+        return MessageWriter(fast_output.get("buffer_size", DEFAULT_BUFFER_SIZE))
+
+    def write_message(self, message: singer.Message) -> None:
+        """Write a message to stdout.
+
+        Args:
+            message: The message to write.
+        """
+        if self.message_writer is None:
+            super().write_message(message)
+        else:
+            self.message_writer.write(message)
+
+    def sync_all(self) -> None:
+        """Sync all streams, profiling the sync when configured."""
+        instrumentation = self.config.get("instrumentation") or {}
+        profiler = instrumentation.get("profiler")
+        if profiler:
+            from tap_flipkart.instrumentation import run_profiler  # noqa: PLC0415
+
+            profiling = run_profiler(
+                profiler,
+                instrumentation.get("profile_path"),
+                self.logger,
+            )
+        else:
+            profiling = contextlib.nullcontext()
+        with profiling:
+            try:
+                super().sync_all()
+                if self.message_writer is not None:
+                    self.message_writer.flush()
+                # Only once all records of the sync were written
+                self._commit_change_index()
+                page_archive = self.__dict__.get("page_archive")
+                if page_archive is not None and not page_archive.replay:
+                    page_archive.complete()
+                    page_archive.compact()
+            finally:
+                self.token_manager.close()
+                change_index = self.__dict__.pop("change_index", None)
+                if change_index is not None:
+                    change_index.close()
+                page_archive = self.__dict__.pop("page_archive", None)
+                if page_archive is not None:
+                    page_archive.close()
+                if self.message_writer is not None:
+                    self.message_writer.flush()
+                summary_path = instrumentation.get("summary_path")
+                if self.sync_profile is not None and summary_path:
+                    self.sync_profile.write_summary(summary_path)
+
     def discover_streams(self) -> list[streams.FlipkartStream]:
         """Return a list of discovered streams.
 
@@ -60,6 +880,8 @@ class TapFlipkart(Tap):
         return [
             streams.ReturnsStream(self),
             streams.ShipmentsStream(self),
+            streams.ShipmentOrderItemsStream(self),
+            streams.ShipmentInvoicesStream(self),
         ]
 
 
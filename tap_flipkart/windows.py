@@ -0,0 +1,222 @@
+"""Adaptive date window planning for Flipkart filter requests."""
+
+from __future__ import annotations
+
+import logging
+import typing as t
+
+from tap_flipkart.concurrency import PartitionFetcher
+
+if t.TYPE_CHECKING:
+    import datetime
+
+_T = t.TypeVar("_T")
+
+
+class AdaptiveWindowPlanner:
+    """Walk a date range in adaptively sized windows.
+
+    Windows start wide. A window is split in half whenever its first request
+    fails with one of `split_errors` (which is how the API reports a filter
+    matching too many results), and the window width shrinks when a window
+    returns more than `target_records`. Empty windows double the width of the
+    next one, so long empty stretches are merged into few requests, but never
+    back to a width that was rejected.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        start: datetime.datetime,
+        end: datetime.datetime,
+        *,
+        initial_window: datetime.timedelta,
+        min_window: datetime.timedelta,
+        max_window: datetime.timedelta,
+        target_records: int,
+        split_errors: tuple[type[Exception], ...] = (Exception,),
+        logger: logging.Logger | None = None,
+    ) -> None:
+        """Create a new planner.
+
+        Args:
+            start: Start of the range to cover.
+            end: End of the range to cover.
+            initial_window: Width of the first window.
+            min_window: Windows are never split below this width.
+            max_window: Windows never grow beyond this width.
+            target_records: Record count above which the next window shrinks.
+            split_errors: Exceptions that cause a window to be split in half.
+            logger: Logger used to report planner decisions.
+        """
+        self.start = start
+        self.end = end
+        self.min_window = min_window
+        self.max_window = max_window
+        self.window = min(max(initial_window, min_window), max_window)
+        self.target_records = target_records
+        self.split_errors = split_errors
+        self.logger = logger or logging.getLogger(__name__)
+        # Smallest width the API rejected, which windows never grow back to
+        self.rejected_window: datetime.timedelta | None = None
+
+    def run(
+        self,
+        fetch: t.Callable[[datetime.datetime, datetime.datetime], t.Iterable[_T]],
+    ) -> t.Iterator[_T]:
+        """Fetch the whole range window by window.
+
+        Args:
+            fetch: Callable returning the records between two datetimes.
+
+        Yields:
+            Each record returned by `fetch`, in window order.
+        """
+        window_start = self.start
+        while window_start < self.end:
+            window_end = min(window_start + self.window, self.end)
+            records = iter(fetch(window_start, window_end))
+            try:
+                first = next(records, None)
+            except self.split_errors as ex:
+                if self.window <= self.min_window:
+                    raise
+                self._reject(window_end - window_start)
+                self._resize(
+                    self.window / 2,
+                    f"splitting window {window_start} - {window_end} after error: {ex}",
+                )
+                continue
+
+            count = 0
+            if first is not None:
+                yield first
+                count = 1
+                for record in records:
+                    yield record
+                    count += 1
+
+            self._adapt(window_start, window_end, count)
+            window_start = window_end
+
+    def run_concurrently(
+        self,
+        fetch: t.Callable[[datetime.datetime, datetime.datetime], t.Iterable[_T]],
+        max_concurrency: int,
+    ) -> t.Iterator[_T]:
+        """Fetch the whole range in rounds of windows requested concurrently.
+
+        Every round requests `max_concurrency` windows of the current width
+        in a :class:`PartitionFetcher`, whose records are streamed in window
+        order. Windows rejected by the API are split in half, and the width
+        of the next round adapts to the records of each window as in
+        :meth:`run`.
+
+        Args:
+            fetch: Callable returning the records between two datetimes. It is
+                called in worker threads.
+            max_concurrency: Maximum number of windows requested at once.
+
+        Yields:
+            Each record returned by `fetch`, in window order.
+        """
+        window_start = self.start
+        while window_start < self.end:
+            windows = []
+            while window_start < self.end and len(windows) < max_concurrency:
+                window_end = min(window_start + self.window, self.end)
+                windows.append({"start": window_start, "end": window_end})
+                window_start = window_end
+            fetcher = PartitionFetcher(
+                lambda window: self.fetch_window(fetch, window["start"], window["end"]),
+                windows,
+                max_workers=len(windows),
+                logger=self.logger,
+            )
+            try:
+                for window in windows:
+                    count = 0
+                    for record in fetcher.records(window):
+                        yield record
+                        count += 1
+                    self._adapt(window["start"], window["end"], count)
+            finally:
+                # Requests in flight finish before the round is left
+                fetcher.close(wait=True)
+
+    def fetch_window(
+        self,
+        fetch: t.Callable[[datetime.datetime, datetime.datetime], t.Iterable[_T]],
+        start: datetime.datetime,
+        end: datetime.datetime,
+    ) -> t.Iterator[_T]:
+        """Fetch a single window, splitting it in half while rejected.
+
+        Args:
+            fetch: Callable returning the records between two datetimes.
+            start: Start of the window.
+            end: End of the window.
+
+        Yields:
+            All records of the window, in order.
+        """
+        records = iter(fetch(start, end))
+        try:
+            first = next(records, None)
+        except self.split_errors as ex:
+            if end - start <= self.min_window:
+                raise
+            self._reject(end - start)
+            middle = start + (end - start) / 2
+            self.logger.info(
+                "Splitting window %s - %s after error: %s.",
+                start,
+                end,
+                ex,
+            )
+            yield from self.fetch_window(fetch, start, middle)
+            yield from self.fetch_window(fetch, middle, end)
+            return
+        if first is not None:
+            yield first
+            yield from records
+
+    def _adapt(
+        self,
+        window_start: datetime.datetime,
+        window_end: datetime.datetime,
+        count: int,
+    ) -> None:
+        self.logger.debug(
+            "Window %s - %s returned %d records.",
+            window_start,
+            window_end,
+            count,
+        )
+        if count == 0 and self._can_grow():
+            self._resize(
+                self.window * 2,
+                f"merging empty window {window_start} - {window_end}",
+            )
+        elif count > self.target_records:
+            self._resize(
+                self.window / 2,
+                f"window {window_start} - {window_end} returned {count} records",
+            )
+
+    def _reject(self, window: datetime.timedelta) -> None:
+        if self.rejected_window is None or window < self.rejected_window:
+            self.rejected_window = window
+
+    def _can_grow(self) -> bool:
+        return self.rejected_window is None or self.window * 2 < self.rejected_window
+
+    def _resize(self, window: datetime.timedelta, reason: str) -> None:
+        window = min(max(window, self.min_window), self.max_window)
+        if window != self.window:
+            self.logger.info(
+                "Resizing date window from %s to %s: %s.",
+                self.window,
+                window,
+                reason,
+            )
+        self.window = window
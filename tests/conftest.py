@@ -1,3 +1,141 @@
 """Test Configuration."""
 
+import contextlib
+import io
+import json
+
+import pytest
+import requests
+
+from tap_flipkart.auth import FlipkartAuthenticator
+from tap_flipkart.tap import TapFlipkart
+
 pytest_plugins = ("singer_sdk.testing.pytest_plugin",)
+
+
+def default_handler(request):
+    """Answer every request with a single page of canned records."""
+    if "/returns" in request.url:
+        return 200, {
+            "returnItems": [
+                {"returnId": "r1", "updatedDate": "2024-03-01T10:00:00+05:30"},
+                {"returnId": "r2", "updatedDate": "2024-03-02T10:00:00+05:30"},
+            ],
+            "hasMore": False,
+        }
+    return 200, {
+        "shipments": [
+            {"shipmentId": "s1", "updatedAt": "2024-03-03T10:00:00.000+05:30"},
+        ],
+        "hasMore": False,
+    }
+
+
+class FakeAPI:
+    """In-process stand-in for the Flipkart API.
+
+    `handler` maps a prepared request to a `(status_code, body)` tuple.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.handler = default_handler
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        status_code, body = self.handler(request)
+        response = requests.Response()
+        response.status_code = status_code
+        # The body is read lazily, as from a socket
+        response.raw = io.BytesIO(json.dumps(body).encode())
+        response.request = request
+        response.url = request.url
+        return response
+
+    def shipment_filters(self):
+        return [
+            json.loads(request.body)["filter"]
+            for request in self.requests
+            if request.method == "POST"
+        ]
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    """Route all HTTP requests of the tap to a `FakeAPI`."""
+    api = FakeAPI()
+
+    def update_access_token(authenticator):
+        authenticator.access_token = "token"  # noqa: S105
+        authenticator.expires_in = None
+        authenticator.last_refreshed = 0
+
+    monkeypatch.setattr(
+        FlipkartAuthenticator,
+        "update_access_token",
+        update_access_token,
+    )
+    monkeypatch.setattr(requests.Session, "send", lambda _, r, **kw: api.send(r))
+    return api
+
+
+class SyncResult:
+    """The Singer messages written by a sync, and the tap that wrote them."""
+
+    def __init__(self, tap, messages, error):
+        self.tap = tap
+        self.messages = messages
+        self.error = error
+
+    @property
+    def failed(self):
+        return self.error is not None
+
+    @property
+    def state(self):
+        return self.tap.state
+
+    @property
+    def states(self):
+        return [m["value"] for m in self.messages if m["type"] == "STATE"]
+
+    def records(self, stream=None):
+        return [
+            m["record"]
+            for m in self.messages
+            if m["type"] == "RECORD" and stream in (None, m["stream"])
+        ]
+
+
+@pytest.fixture
+def sync():
+    """Return a function running a full sync of the tap and capturing its output.
+
+    Only the `selected` streams are synced, if given. Sync errors are raised
+    unless `allow_errors` is set, in which case they end the sync early.
+    """
+
+    def run(config, state=None, selected=None, *, allow_errors=False):
+        catalog = None
+        if selected is not None:
+            catalog = TapFlipkart(config=config).catalog_dict
+            for entry in catalog["streams"]:
+                for metadata in entry["metadata"]:
+                    if not metadata["breadcrumb"]:
+                        metadata["metadata"]["selected"] = (
+                            entry["tap_stream_id"] in selected
+                        )
+        tap = TapFlipkart(config=config, state=state, catalog=catalog)
+        output = io.StringIO()
+        error = None
+        with contextlib.redirect_stdout(output):
+            try:
+                tap.sync_all()
+            except Exception as ex:
+                if not allow_errors:
+                    raise
+                error = ex
+        messages = [json.loads(line) for line in output.getvalue().splitlines()]
+        return SyncResult(tap, messages, error)
+
+    return run
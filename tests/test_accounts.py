@@ -0,0 +1,110 @@
+"""Tests for multi-account extraction."""
+
+import json
+
+import pytest
+from singer_sdk.exceptions import ConfigValidationError
+
+from tap_flipkart.accounts import SellerAccount
+from tap_flipkart.auth import FlipkartAuthenticator
+
+ACCOUNTS = [
+    {"account_id": "north", "client_id": "north-id", "client_secret": "a"},
+    {"account_id": "south", "client_id": "south-id", "client_secret": "b"},
+]
+CONFIG = {
+    "accounts": ACCOUNTS,
+    "start_date": "2024-02-25T00:00:00Z",
+    "shipment_state_selections": {"include": ["APPROVED", "PACKED"]},
+}
+
+
+def _handler(request):
+    # Record IDs reveal the token, and so the account, of their request
+    token = request.headers["Authorization"].split()[-1]
+    if "/returns" in request.url:
+        return 200, {
+            "returnItems": [
+                {"returnId": f"{token}-r1", "updatedDate": "2024-03-01T10:00:00+05:30"},
+            ],
+            "hasMore": False,
+        }
+    state = json.loads(request.body)["filter"]["states"][0]
+    return 200, {
+        "shipments": [
+            {
+                "shipmentId": f"{token}-{state}",
+                "updatedAt": "2024-03-03T10:00:00.000+05:30",
+            },
+        ],
+        "hasMore": False,
+    }
+
+
+@pytest.fixture
+def accounts_api(fake_api, monkeypatch):
+    def update_access_token(authenticator):
+        authenticator.access_token = f"token-{authenticator.client_id}"
+        authenticator.expires_in = None
+        authenticator.last_refreshed = 0
+
+    monkeypatch.setattr(
+        FlipkartAuthenticator, "update_access_token", update_access_token
+    )
+    fake_api.handler = _handler
+    return fake_api
+
+
+@pytest.mark.parametrize("max_concurrent_partitions", [1, 4])
+def test_records_are_synced_and_tagged_per_account(
+    accounts_api,
+    sync,
+    max_concurrent_partitions,
+):
+    records = sync(
+        {**CONFIG, "max_concurrent_partitions": max_concurrent_partitions},
+    ).records()
+    shipments = [r for r in records if "shipmentId" in r]
+    # Partitions are interleaved across accounts
+    assert [(r["shipment_status_state"], r["account_id"]) for r in shipments] == [
+        ("APPROVED", "north"),
+        ("APPROVED", "south"),
+        ("PACKED", "north"),
+        ("PACKED", "south"),
+    ]
+    for record in records:
+        record_id = record.get("shipmentId") or record["returnId"]
+        assert record_id.startswith(f"token-{record['account_id']}-id-")
+
+
+def test_bookmarks_are_kept_per_account(accounts_api, sync):
+    state = sync(CONFIG).states[-1]
+    partitions = state["bookmarks"]["returns"]["partitions"]
+    assert sorted(
+        (p["context"]["account_id"], p["context"]["source"]) for p in partitions
+    ) == [
+        ("north", "courier_return"),
+        ("north", "customer_return"),
+        ("south", "courier_return"),
+        ("south", "customer_return"),
+    ]
+    assert all(p["replication_key_value"] for p in partitions)
+
+
+def test_top_level_credentials_are_a_single_account():
+    accounts = SellerAccount.from_config({"client_id": "id", "client_secret": "secret"})
+
+    assert [(a.account_id, a.client_id) for a in accounts] == [(None, "id")]
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        {},
+        {"accounts": [ACCOUNTS[0], ACCOUNTS[0]]},
+        {"accounts": [{**ACCOUNTS[0], "account_id": ""}]},
+    ],
+)
+def test_invalid_accounts_are_rejected(config):
+    with pytest.raises(ConfigValidationError):
+        SellerAccount.from_config(config)
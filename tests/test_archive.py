@@ -0,0 +1,140 @@
+"""Tests for the raw page archive and its offline replay."""
+
+import gzip
+import json
+import threading
+
+import requests
+
+from tap_flipkart.archive import PageArchive
+from tests.test_checkpoints import CONFIG as WINDOWS_CONFIG
+from tests.test_checkpoints import WindowedAPI
+
+
+def test_replay_rebuilds_records_without_requests(fake_api, sync, tmp_path):
+    page_archive = {"mode": "archive", "path": str(tmp_path)}
+    fake_api.handler = WindowedAPI()
+    archived = sync({**WINDOWS_CONFIG, "page_archive": page_archive}).records()
+    requests_sent = len(fake_api.requests)
+
+    def offline(request):
+        raise AssertionError(f"Replay sent a request to {request.url}")
+
+    fake_api.handler = offline
+    fake_api.requests.clear()
+    replayed = sync(
+        {
+            **WINDOWS_CONFIG,
+            "page_archive": {**page_archive, "mode": "replay"},
+            "stream_maps": {"shipments": {"replayed": "True"}},
+        },
+    ).records()
+
+    assert fake_api.requests == []
+    assert [
+        {k: v for k, v in record.items() if k != "replayed"} for record in replayed
+    ] == archived
+    assert all(record["replayed"] for record in replayed if "shipmentId" in record)
+
+    archive = PageArchive(str(tmp_path), mode="replay")
+    assert len(archive) == requests_sent
+    # Identical pages, such as the empty return pages, are stored once
+    objects = list((tmp_path / "objects").glob("*/*.json.gz"))
+    assert len(objects) < requests_sent
+    archive.close()
+
+
+def _page(archive, url, body):
+    request = requests.Request("GET", url).prepare()
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(body).encode()
+    return archive.add("returns", {"source": "s"}, {"source": "s"}, request, response)
+
+
+def test_compaction_removes_expired_pages_and_unreferenced_bodies(tmp_path):
+    day = 86400
+    old = PageArchive(str(tmp_path), now=0)
+    expired = _page(old, "https://api/a", {"page": 1})
+    shared = _page(old, "https://api/b", {"page": 2})
+    old.close()
+
+    archive = PageArchive(str(tmp_path), max_age_days=7, now=10 * day)
+    _page(archive, "https://api/b", {"page": 2})
+    archive.complete()
+    archive.compact()
+
+    assert len(archive) == 1
+    objects = {path.name.split(".")[0] for path in (tmp_path / "objects").glob("*/*")}
+    assert objects == {shared}
+    assert expired != shared
+    responses = list(archive.responses("returns", {"source": "s"}))
+    assert [r.json() for r in responses] == [{"page": 2}]
+    assert responses[0].url == "https://api/b"
+    body = gzip.decompress(next((tmp_path / "objects").glob("*/*")).read_bytes())
+    assert json.loads(body) == {"page": 2}
+    archive.close()
+
+
+def test_replay_reads_the_latest_complete_run(fake_api, sync, tmp_path):
+    config = {
+        **WINDOWS_CONFIG,
+        "page_archive": {"mode": "archive", "path": str(tmp_path)},
+        "stream_responses": True,
+    }
+    fake_api.handler = WindowedAPI()
+    sync(config)
+    fake_api.handler = WindowedAPI()
+    latest = sync(config).records()
+    # Pages of an interrupted sync are never replayed
+    fake_api.handler = WindowedAPI(failing_window=2)
+    assert sync(config, allow_errors=True).failed
+
+    fake_api.handler = WindowedAPI()
+    replayed = sync(
+        {**config, "page_archive": {**config["page_archive"], "mode": "replay"}},
+    ).records()
+
+    assert replayed == latest
+
+
+def test_compaction_keeps_the_bodies_of_concurrent_syncs(tmp_path):
+    archive = PageArchive(str(tmp_path))
+    _page(archive, "https://api/a", {"page": 1})
+    stale = next((tmp_path / "objects").glob("*")) / "stale.json.gz.1.tmp"
+    stale.write_bytes(b"partial")
+
+    # Another sync has written a body, but has not indexed its page yet
+    concurrent = PageArchive(str(tmp_path))
+    written = threading.Event()
+    resume = threading.Event()
+    write_object = concurrent._write_object
+
+    def paused_write_object(*args):
+        write_object(*args)
+        written.set()
+        resume.wait()
+
+    concurrent._write_object = paused_write_object
+    adding = threading.Thread(
+        target=_page,
+        args=(concurrent, "https://api/b", {"page": 2}),
+    )
+    adding.start()
+    written.wait()
+    compacting = threading.Thread(target=archive.compact)
+    compacting.start()
+    compacting.join(0.2)
+    try:
+        assert compacting.is_alive()
+    finally:
+        resume.set()
+        adding.join()
+    compacting.join()
+
+    assert not stale.exists()
+    concurrent.complete()
+    responses = concurrent.responses("returns", {"source": "s"})
+    assert [r.json() for r in responses] == [{"page": 2}]
+    concurrent.close()
+    archive.close()
@@ -0,0 +1,162 @@
+"""Tests for the Flipkart authenticator."""
+
+import json
+import threading
+import time
+
+import requests
+
+from tap_flipkart.accounts import SellerAccount
+from tap_flipkart.auth import FlipkartAuthenticator, TokenManager
+from tap_flipkart.tap import TapFlipkart
+
+
+class FakeTokenSession(requests.Session):
+    """Session answering every request with a fresh access token."""
+
+    def __init__(self, expires_in=3600, delay=0, failing=()):
+        super().__init__()
+        self.expires_in = expires_in
+        self.delay = delay
+        # Numbers of the token requests answered with a server error
+        self.failing = failing
+        self.token_requests = 0
+        self.requested = threading.Event()
+
+    def get(self, url, **kwargs):
+        self.token_requests += 1
+        token = f"token-{self.token_requests}"
+        time.sleep(self.delay)
+        response = requests.Response()
+        response.status_code = 500 if self.token_requests in self.failing else 200
+        response._content = json.dumps(
+            {"access_token": token, "expires_in": self.expires_in},
+        ).encode()
+        self.requested.set()
+        return response
+
+
+def _new_authenticator(config, session):
+    tap = TapFlipkart(config=config)
+    tap.__dict__["requests_session"] = session
+    return FlipkartAuthenticator(
+        stream=tap.streams["returns"],
+        auth_endpoint="https://api.flipkart.net/oauth-service/oauth/token",
+    )
+
+
+def test_token_endpoint_uses_shared_session():
+    session = FakeTokenSession()
+    authenticator = _new_authenticator(
+        {"client_id": "id", "client_secret": "secret"},
+        session,
+    )
+    assert authenticator.auth_headers["Authorization"] == "Bearer token-1"
+    assert session.token_requests == 1
+
+
+def test_tokens_are_reused_from_disk_cache(tmp_path):
+    config = {
+        "client_id": "id",
+        "client_secret": "secret",
+        "token_cache_path": str(tmp_path / "tokens.json"),
+    }
+    session = FakeTokenSession()
+    first = _new_authenticator(config, session)
+    second = _new_authenticator(config, session)
+
+    assert first.auth_headers["Authorization"] == "Bearer token-1"
+    assert second.auth_headers["Authorization"] == "Bearer token-1"
+    assert session.token_requests == 1
+    assert "id" not in (tmp_path / "tokens.json").read_text()
+
+
+def test_expired_cached_tokens_are_refreshed(tmp_path):
+    cache_path = tmp_path / "tokens.json"
+    config = {
+        "client_id": "id",
+        "client_secret": "secret",
+        "token_cache_path": str(cache_path),
+    }
+    session = FakeTokenSession()
+    _new_authenticator(config, session).update_access_token()
+    cache = json.loads(cache_path.read_text())
+    for entry in cache.values():
+        entry["expires_at"] = 0
+    cache_path.write_text(json.dumps(cache))
+
+    authenticator = _new_authenticator(config, session)
+    assert authenticator.auth_headers["Authorization"] == "Bearer token-2"
+
+
+def test_concurrent_refreshes_are_single_flight():
+    session = FakeTokenSession(delay=0.2)
+    authenticator = _new_authenticator(
+        {"client_id": "id", "client_secret": "secret"},
+        session,
+    )
+    headers = []
+
+    threads = [
+        threading.Thread(target=lambda: headers.append(authenticator.auth_headers))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert session.token_requests == 1
+    assert headers == [{"Authorization": "Bearer token-1"}] * 8
+
+
+def test_tokens_are_refreshed_in_the_background(tmp_path):
+    session = FakeTokenSession(expires_in=1)
+    authenticator = _new_authenticator(
+        {
+            "client_id": "id",
+            "client_secret": "secret",
+            "token_cache_path": str(tmp_path / "tokens.json"),
+        },
+        session,
+    )
+    assert authenticator.auth_headers["Authorization"] == "Bearer token-1"
+    session.requested.clear()
+
+    # Refreshed halfway through the token lifetime, bypassing the disk cache
+    assert session.requested.wait(timeout=5)
+    started = time.perf_counter()
+    assert authenticator.auth_headers["Authorization"] == "Bearer token-2"
+    assert time.perf_counter() - started < 0.1
+    authenticator.close()
+
+
+def test_failed_background_refreshes_are_retried(monkeypatch):
+    monkeypatch.setattr(FlipkartAuthenticator, "REFRESH_RETRY_SECONDS", 0.2)
+    session = FakeTokenSession(expires_in=2, failing={2})
+    authenticator = _new_authenticator(
+        {"client_id": "id", "client_secret": "s"}, session
+    )
+    assert authenticator.auth_headers["Authorization"] == "Bearer token-1"
+
+    # The refresh after a second fails, and is retried before the token expires
+    deadline = time.monotonic() + 5
+    while authenticator.access_token != "token-3" and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert authenticator.access_token == "token-3"
+    assert session.token_requests == 3
+    authenticator.close()
+
+
+def test_authenticators_are_shared_by_credentials():
+    tap = TapFlipkart(config={"client_id": "id", "client_secret": "secret"})
+    stream = tap.streams["returns"]
+    manager = TokenManager()
+
+    first = manager.get_authenticator(stream, SellerAccount("a", "id", "secret"))
+    same = manager.get_authenticator(stream, SellerAccount("b", "id", "secret"))
+    other = manager.get_authenticator(stream, SellerAccount("c", "other", "secret"))
+
+    assert first is same
+    assert other is not first
+    assert other.client_id == "other"
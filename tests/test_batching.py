@@ -0,0 +1,94 @@
+"""Tests for BATCH messages."""
+
+import gzip
+import json
+import urllib.parse
+
+from singer_sdk.helpers._batch import BatchConfig
+
+from tap_flipkart.batching import JSONLinesBatcher
+from tests.test_checkpoints import CONFIG as WINDOWS_CONFIG
+from tests.test_checkpoints import WindowedAPI, _delivered
+
+CONFIG = {
+    "client_id": "id",
+    "client_secret": "secret",
+    "start_date": "2024-02-25T00:00:00Z",
+    "shipment_state_selections": {"include": ["APPROVED"]},
+}
+
+
+def _batch_config(tmp_path, compression="gzip", batch_size=10000):
+    return {
+        "encoding": {"format": "jsonl", "compression": compression},
+        "storage": {"root": f"file://{tmp_path}", "prefix": "batch-"},
+        "batch_size": batch_size,
+    }
+
+
+def _read(url):
+    path = urllib.parse.urlparse(url).path
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt") as file:
+        return [json.loads(line) for line in file]
+
+
+def test_batches_contain_the_conformed_records(fake_api, sync, tmp_path):
+    expected = {}
+    for message in sync(CONFIG).messages:
+        if message["type"] == "RECORD":
+            expected.setdefault(message["stream"], []).append(message["record"])
+
+    messages = sync({**CONFIG, "batch_config": _batch_config(tmp_path)}).messages
+
+    assert not [m for m in messages if m["type"] == "RECORD"]
+    batched = {}
+    for message in messages:
+        if message["type"] == "BATCH":
+            assert message["encoding"] == {"format": "jsonl", "compression": "gzip"}
+            for url in message["manifest"]:
+                assert url.endswith(".json.gz")
+                batched.setdefault(message["stream"], []).extend(_read(url))
+    assert batched == expected
+
+
+def test_files_are_split_at_batch_size(tmp_path):
+    batch_config = BatchConfig.from_dict(
+        _batch_config(tmp_path, compression="none", batch_size=2),
+    )
+    batcher = JSONLinesBatcher("tap-flipkart", "returns", batch_config)
+    records = iter({"id": i} for i in range(5))
+
+    manifests = []
+    for manifest in batcher.get_batches(records):
+        manifests.append(manifest)
+        # Files are complete before the next record is read
+        assert _read(manifest[0])
+
+    assert [len(_read(m[0])) for m in manifests] == [2, 2, 1]
+    assert [r for m in manifests for r in _read(m[0])] == [{"id": i} for i in range(5)]
+    assert all(m[0].endswith(".json") for m in manifests)
+
+
+def test_checkpoints_follow_their_batch(fake_api, sync, tmp_path):
+    fake_api.handler = WindowedAPI()
+
+    messages = sync(
+        {
+            **WINDOWS_CONFIG,
+            "batch_config": _batch_config(tmp_path),
+            "checkpoints": {"interval_seconds": 0},
+        },
+    ).messages
+
+    batch = next(
+        i
+        for i, m in enumerate(messages)
+        if m["type"] == "BATCH" and m["stream"] == "shipments"
+    )
+    assert not [
+        m
+        for m in messages[:batch]
+        if m["type"] == "STATE" and "window_end" in _delivered(m["value"])
+    ]
+    assert _delivered(messages[-1]["value"])["window_end"]
@@ -0,0 +1,118 @@
+"""Tests for the per-partition sync cadence."""
+
+import datetime
+
+from tap_flipkart.cadence import LAST_SYNCED_KEY, SyncCadence
+from tap_flipkart.sharding import merge_states
+
+NOW = datetime.datetime(2024, 3, 1, 12, tzinfo=datetime.timezone.utc)
+CADENCE = {
+    "rules": [
+        {"stream": "shipments", "partitions": ["APPROVED"], "minutes": 5},
+        {"stream": "returns", "partitions": ["courier_return"], "minutes": 0},
+    ],
+    "default_minutes": 60,
+}
+
+
+def _state(minutes_ago):
+    return {
+        LAST_SYNCED_KEY: (NOW - datetime.timedelta(minutes=minutes_ago)).isoformat()
+    }
+
+
+def test_first_matching_rule_sets_interval():
+    cadence = SyncCadence(
+        [
+            {"stream": "shipments", "partitions": ["APPROVED"], "minutes": 5},
+            {"stream": "shipments", "minutes": 1440},
+        ],
+        default_minutes=60,
+        now=NOW,
+    )
+
+    assert cadence.is_due("shipments", "APPROVED", None)
+    assert cadence.is_due("shipments", "APPROVED", _state(5))
+    # Runs scheduled one interval apart stay due despite jitter
+    assert cadence.is_due("shipments", "APPROVED", _state(4.9))
+    assert not cadence.is_due("shipments", "APPROVED", _state(4))
+    assert not cadence.is_due("shipments", "DELIVERED", _state(600))
+    assert cadence.is_due("returns", "courier_return", _state(60))
+    assert not cadence.is_due("returns", "courier_return", _state(30))
+
+
+def _config(cadence=CADENCE, **config):
+    return {
+        "client_id": "id",
+        "client_secret": "secret",
+        "shipment_state_selections": {"include": ["APPROVED", "DELIVERED"]},
+        "sync_cadence": cadence,
+        **config,
+    }
+
+
+def _last_synced(state):
+    return {
+        (
+            partition["context"].get("source")
+            or partition["context"]["filter"]["states"][0]
+        ): partition.get(LAST_SYNCED_KEY)
+        for stream in state["bookmarks"].values()
+        for partition in stream.get("partitions", [])
+    }
+
+
+def test_sync_skips_partitions_not_due(fake_api, sync):
+    state = sync(_config()).states[-1]
+
+    first = _last_synced(state)
+    assert None not in first.values()
+    assert len(fake_api.shipment_filters()) == 2
+
+    fake_api.requests.clear()
+    state = sync(_config(), state).states[-1]
+
+    # Only the returns source synced on every run was requested again
+    assert len(fake_api.requests) == 1
+    assert "source=courier_return" in fake_api.requests[0].url
+    second = _last_synced(state)
+    assert second["courier_return"] > first["courier_return"]
+    assert {k: v for k, v in second.items() if k != "courier_return"} == {
+        k: v for k, v in first.items() if k != "courier_return"
+    }
+
+
+def test_streams_without_due_partitions_are_not_synced(fake_api, sync):
+    config = _config(cadence={"default_minutes": 60})
+    state = sync(config).states[-1]
+
+    fake_api.requests.clear()
+    sync(config, state)
+
+    # Not even the streams without a partition are requested
+    assert fake_api.requests == []
+
+
+def test_cadence_applies_to_sharded_partitions(fake_api, sync):
+    sharding = {
+        "shard_count": 2,
+        "window_days": 20,
+        "end_date": "2024-03-01T00:00:00+00:00",
+    }
+    configs = [
+        _config(
+            cadence={"default_minutes": 60},
+            start_date="2024-01-01T00:00:00+00:00",
+            sharding={**sharding, "shard_index": index},
+        )
+        for index in range(2)
+    ]
+    state = merge_states(sync(config).states[-1] for config in configs)
+    assert None not in _last_synced(state).values()
+
+    fake_api.requests.clear()
+    for config in configs:
+        sync(config, state)
+
+    # Windows of partitions that are not due are not requested by any shard
+    assert fake_api.requests == []
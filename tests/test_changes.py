@@ -0,0 +1,104 @@
+"""Tests for persistent change detection."""
+
+from tap_flipkart.changes import ChangeIndex
+from tests.conftest import default_handler
+
+DAY = 86400
+
+
+def _handler(request, status=None):
+    code, body = default_handler(request)
+    if "/returns" in request.url:
+        source = request.url.split("source=")[1].split("&")[0]
+        for item in body["returnItems"]:
+            item["returnId"] += f"-{source}"
+            if status and item["returnId"] == "r2-customer_return":
+                item["status"] = status
+    return code, body
+
+
+def _config(tmp_path):
+    return {
+        "client_id": "id",
+        "client_secret": "secret",
+        "start_date": "2024-02-25T00:00:00Z",
+        "shipment_state_selections": {"include": ["APPROVED"]},
+        "change_detection": {"enabled": True, "path": str(tmp_path / "changes.sqlite")},
+    }
+
+
+def test_only_changed_records_are_emitted(fake_api, sync, tmp_path):
+    config = _config(tmp_path)
+    fake_api.handler = _handler
+    assert len(sync(config).records()) == 5
+
+    unchanged = sync(config)
+    assert unchanged.records() == []
+    state = unchanged.states[-1]
+    assert state["bookmarks"]["returns"]["partitions"][0]["replication_key_value"]
+
+    fake_api.handler = lambda request: _handler(request, status="completed")
+    changed = sync(config).records()
+    assert [r["returnId"] for r in changed] == ["r2-customer_return"]
+
+
+def test_changes_of_failed_syncs_are_not_saved(tmp_path):
+    path = str(tmp_path / "changes.sqlite")
+    index = ChangeIndex(path)
+    assert index.offer("returns", ("r1",), {"returnId": "r1"})
+    assert not index.offer("returns", ("r1",), {"returnId": "r1"})
+    index.close()
+
+    index = ChangeIndex(path)
+    assert index.offer("returns", ("r1",), {"returnId": "r1"})
+    index.commit()
+    index.close()
+
+    index = ChangeIndex(path)
+    assert not index.offer("returns", ("r1",), {"returnId": "r1"})
+    assert index.offer("shipments", ("r1",), {"returnId": "r1"})
+    assert index.suppressed_counts == {"returns": 1}
+    index.close()
+
+
+def test_compaction_removes_old_and_excess_entries(tmp_path):
+    path = str(tmp_path / "changes.sqlite")
+    index = ChangeIndex(path, now=0)
+    for i in range(10):
+        index.offer("returns", (f"old-{i}",), {"i": i})
+    index.commit()
+    index.close()
+
+    index = ChangeIndex(path, max_age_days=30, now=20 * DAY)
+    for i in range(5):
+        index.offer("returns", (f"recent-{i}",), {"i": i})
+    index.commit()
+    assert len(index) == 15
+    index.close()
+
+    index = ChangeIndex(path, max_age_days=30, max_keys=4, now=40 * DAY)
+    index.offer("returns", ("new",), {})
+    index.commit()
+    # Entries of day 0 expired, then the oldest of day 20 exceeded the limit
+    assert len(index) == 4
+    assert not index.offer("returns", ("new",), {})
+    index.close()
+
+
+def test_changes_are_saved_up_to_the_last_state(fake_api, sync, tmp_path):
+    config = _config(tmp_path)
+
+    def failing(request):
+        if request.method == "POST":
+            return 404, {}
+        return _handler(request)
+
+    fake_api.handler = failing
+    failed = sync(config, allow_errors=True)
+    assert failed.failed
+    assert len(failed.records("returns")) == 4
+
+    fake_api.handler = _handler
+    resumed = sync(config, state=failed.states[-1])
+    assert resumed.records("returns") == []
+    assert [r["shipmentId"] for r in resumed.records()] == ["s1"]
@@ -0,0 +1,196 @@
+"""Tests for checkpointing of DELIVERED backfills."""
+
+import datetime
+import json
+
+import pytest
+
+START_DATE = datetime.datetime.now(datetime.timezone.utc).replace(
+    microsecond=0
+) - datetime.timedelta(days=3, hours=12)
+PAGE_PATH = "/v3/shipments/next"
+CONFIG = {
+    "client_id": "id",
+    "client_secret": "secret",
+    "start_date": START_DATE.isoformat(),
+    "shipment_state_selections": {"include": ["DELIVERED"]},
+    "delivered_window": {"initial_hours": 24, "max_hours": 24},
+}
+
+
+def _shipment(shipment_id):
+    return {"shipmentId": shipment_id, "updatedAt": "2024-03-01T10:00:00.000+05:30"}
+
+
+class WindowedAPI:
+    """Serve two pages per order date window, failing the second page of one."""
+
+    def __init__(self, failing_window=None):
+        self.failing_window = failing_window
+        self.windows = []
+
+    def __call__(self, request):
+        if "/returns" in request.url:
+            return 200, {"returnItems": [], "hasMore": False}
+        if request.method == "GET":
+            window = int(request.url.rsplit("=", 1)[1])
+            if window == self.failing_window:
+                return 404, {"error": "not found"}
+            return 200, {
+                "shipments": [_shipment(f"s{window}b")],
+                "hasMore": False,
+            }
+        self.windows.append(json.loads(request.body)["filter"]["orderDate"])
+        window = len(self.windows)
+        return 200, {
+            "shipments": [_shipment(f"s{window}a")],
+            "hasMore": True,
+            "nextPageUrl": f"{PAGE_PATH}?window={window}",
+        }
+
+
+def _delivered(state):
+    partitions = state.get("bookmarks", {}).get("shipments", {}).get("partitions", [])
+    return next(
+        (p for p in partitions if p["context"]["filter"]["states"] == ["DELIVERED"]),
+        {},
+    )
+
+
+def test_interrupted_backfill_resumes_after_last_window(fake_api, sync):
+    fake_api.handler = WindowedAPI(failing_window=3)
+
+    run = sync(CONFIG, allow_errors=True)
+
+    assert run.failed
+    windows = fake_api.handler.windows
+    state = run.states[-1]
+    delivered = _delivered(state)
+    assert delivered["window_end"][:19] == windows[1]["to"][:19]
+    # Checkpoints are written after the records of their window
+    shipment_ids = [
+        m["record"]["shipmentId"] if m["type"] == "RECORD" else m["type"]
+        for m in run.messages
+        if m["type"] in ("RECORD", "STATE")
+    ]
+    first_record = shipment_ids.index("s1a")
+    assert shipment_ids[first_record:] == [
+        "s1a",
+        "s1b",
+        "STATE",
+        "s2a",
+        "s2b",
+        "STATE",
+        "s3a",
+    ]
+
+    fake_api.handler = WindowedAPI()
+    fake_api.requests.clear()
+    sync(CONFIG, state)
+
+    assert fake_api.handler.windows[0]["from"][:19] == windows[2]["from"][:19]
+
+
+def test_checkpoint_interval_throttles_state_messages(fake_api, sync):
+    fake_api.handler = WindowedAPI(failing_window=3)
+
+    run = sync(
+        {**CONFIG, "checkpoints": {"interval_seconds": 3600}},
+        allow_errors=True,
+    )
+
+    # Only the first checkpoint is written within the interval
+    states = [state for state in run.states if "window_end" in _delivered(state)]
+    assert (
+        _delivered(states[0])["window_end"][:19]
+        == (fake_api.handler.windows[0]["to"][:19])
+    )
+
+
+@pytest.mark.parametrize("cursor_status", [200, 404])
+def test_page_cursor_resumes_window(fake_api, sync, cursor_status):
+    fake_api.handler = WindowedAPI(failing_window=3)
+    config = {**CONFIG, "checkpoints": {"page_cursors": True}}
+
+    state = sync(config, allow_errors=True).states[-1]
+    cursor = _delivered(state)["page_cursor"]
+    assert cursor["next_page_token"] == f"{PAGE_PATH}?window=3"
+
+    resumed = WindowedAPI(failing_window=None if cursor_status == 200 else 3)
+    fake_api.handler = resumed
+    fake_api.requests.clear()
+    run = sync(config, state)
+
+    shipment_requests = [r for r in fake_api.requests if "/shipments" in r.url]
+    assert shipment_requests[0].url.endswith(cursor["next_page_token"])
+    if cursor_status == 404:
+        # The rejected cursor restarts its window
+        assert resumed.windows[0]["from"][:19] == cursor["start"][:19]
+    else:
+        assert resumed.windows[0]["from"][:19] == cursor["end"][:19]
+    assert "page_cursor" not in _delivered(run.states[-1])
+
+
+def test_concurrent_windows_are_checkpointed_in_order(fake_api, sync):
+    fake_api.handler = WindowedAPI()
+
+    run = sync(
+        {
+            **CONFIG,
+            "delivered_window": {
+                "initial_hours": 24,
+                "max_hours": 24,
+                "max_concurrency": 3,
+            },
+        },
+    )
+
+    windows = sorted(fake_api.handler.windows, key=lambda w: w["from"])
+    assert len(windows) == 4
+    assert len(run.records()) == 2 * len(windows)
+    # Every checkpoint follows the records of its window, in window order
+    ends = [
+        _delivered(state)["window_end"][:19]
+        for state in run.states
+        if "window_end" in _delivered(state)
+    ]
+    assert list(dict.fromkeys(ends)) == [w["to"][:19] for w in windows]
+
+
+def test_concurrent_windows_of_concurrent_partitions_are_checkpointed_in_order(
+    fake_api,
+    sync,
+):
+    fake_api.handler = WindowedAPI()
+
+    run = sync(
+        {
+            **CONFIG,
+            "max_concurrent_partitions": 2,
+            "delivered_window": {
+                "initial_hours": 24,
+                "max_hours": 24,
+                "max_concurrency": 3,
+            },
+        },
+    )
+
+    windows = fake_api.handler.windows
+    assert len(windows) == 4
+    emitted = set()
+    for message in run.messages:
+        if message["type"] == "RECORD":
+            emitted.add(message["record"]["shipmentId"])
+        elif message["type"] == "STATE":
+            window_end = _delivered(message["value"]).get("window_end")
+            # Every checkpoint follows the records of the windows it covers
+            covered = [
+                index
+                for index, window in enumerate(windows, start=1)
+                if window_end and window["to"][:19] <= window_end[:19]
+            ]
+            for index in covered:
+                assert {f"s{index}a", f"s{index}b"} <= emitted
+    assert _delivered(run.states[-1])["window_end"][:19] == max(
+        window["to"][:19] for window in windows
+    )
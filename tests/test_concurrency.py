@@ -0,0 +1,88 @@
+"""Tests for concurrent partition fetching."""
+
+import threading
+import time
+
+import pytest
+
+from tap_flipkart.concurrency import PartitionFetcher, run_in_order
+
+PARTITIONS = [{"source": "a"}, {"source": "b"}, {"source": "c"}]
+
+
+def _fetch(context):
+    # Earlier partitions are slower, so completion order differs from partition order
+    delay = {"a": 0.05, "b": 0.02, "c": 0.0}[context["source"]]
+    for index in range(3):
+        time.sleep(delay)
+        yield {"source": context["source"], "index": index}
+
+
+def test_records_are_emitted_in_partition_order():
+    fetcher = PartitionFetcher(_fetch, PARTITIONS, max_workers=3)
+    records = [
+        (record["source"], record["index"])
+        for context in PARTITIONS
+        for record in fetcher.records(context)
+    ]
+    assert records == [(s["source"], i) for s in PARTITIONS for i in range(3)]
+    assert fetcher.finished
+
+
+def test_callbacks_run_in_consumer_after_preceding_records():
+    events = []
+
+    def fetch(context):
+        for index in range(2):
+            yield index
+            run_in_order(
+                lambda index=index: events.append(
+                    (context["source"], index, threading.current_thread().name),
+                ),
+            )
+
+    fetcher = PartitionFetcher(fetch, PARTITIONS, max_workers=3)
+    consumer = threading.current_thread().name
+    for context in PARTITIONS:
+        for index in fetcher.records(context):
+            events.append((context["source"], index, "record"))  # noqa: PERF401
+
+    assert events == [
+        (s["source"], i, name)
+        for s in PARTITIONS
+        for i in range(2)
+        for name in ("record", consumer)
+    ]
+
+    # Outside of a fetcher callbacks run at once
+    run_in_order(events.clear)
+    assert events == []
+
+
+def test_partitions_run_concurrently():
+    started = []
+    barrier = threading.Barrier(len(PARTITIONS), timeout=5)
+
+    def fetch(context):
+        started.append(context["source"])
+        barrier.wait()
+        yield context
+
+    fetcher = PartitionFetcher(fetch, PARTITIONS, max_workers=len(PARTITIONS))
+    for context in PARTITIONS:
+        assert list(fetcher.records(context)) == [context]
+    assert sorted(started) == ["a", "b", "c"]
+
+
+def test_worker_errors_propagate_to_consumer():
+    def fetch(context):
+        yield context
+        if context["source"] == "b":
+            msg = "boom"
+            raise RuntimeError(msg)
+
+    fetcher = PartitionFetcher(fetch, PARTITIONS, max_workers=2)
+    assert list(fetcher.records(PARTITIONS[0])) == [PARTITIONS[0]]
+    with pytest.raises(RuntimeError, match="boom"):
+        list(fetcher.records(PARTITIONS[1]))
+    assert fetcher._stop.is_set()
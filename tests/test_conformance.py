@@ -0,0 +1,146 @@
+"""Tests for compiled record type conformance."""
+
+import copy
+import datetime
+import json
+import logging
+
+import pytest
+from benchmarks.mock_api import SCHEMAS_DIR, MockSettings, RecordFactory
+from singer_sdk._singerlib.catalog import MetadataMapping
+from singer_sdk.helpers._catalog import pop_deselected_record_properties
+from singer_sdk.helpers._typing import TypeConformanceLevel, conform_record_data_types
+
+from tap_flipkart.conformance import RecordConformer
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _mask(schema, deselected=()):
+    metadata = MetadataMapping.get_standard_metadata(
+        schema=schema,
+        key_properties=[],
+        selected_by_default=True,
+    )
+    for breadcrumb in deselected:
+        metadata[breadcrumb].selected = False
+    return metadata.resolve_selection()
+
+
+def _sdk_conform(record, schema, mask):
+    pop_deselected_record_properties(record, schema, mask, LOGGER)
+    return conform_record_data_types(
+        "test",
+        record,
+        schema,
+        TypeConformanceLevel.RECURSIVE,
+        LOGGER,
+    )
+
+
+def _records(stream):
+    schema = json.loads((SCHEMAS_DIR / f"{stream}.json").read_text())
+    factory = RecordFactory(schema, MockSettings())
+    records = [factory.build(i, stream) for i in range(20)]
+    # Values the SDK converts, and properties missing from the schema
+    records[0]["unknown"] = 1
+    records[1]["mps" if stream == "shipments" else "return_source"] = 0
+    records[2]["updatedAt" if stream == "shipments" else "updatedDate"] = (
+        datetime.datetime(2024, 3, 1, tzinfo=datetime.timezone.utc)
+    )
+    return schema, records
+
+
+@pytest.mark.parametrize("stream", ["shipments", "returns"])
+@pytest.mark.parametrize(
+    "deselected",
+    [
+        (),
+        (("properties", "locationId"), ("properties", "returnId")),
+        (("properties", "subShipments"), ("properties", "orderItem")),
+    ],
+)
+def test_compiled_conformance_matches_sdk(stream, deselected):
+    schema, records = _records(stream)
+    mask = _mask(schema, deselected)
+    conformer = RecordConformer(stream, schema, mask, logger=LOGGER)
+
+    for record in records:
+        expected = _sdk_conform(copy.deepcopy(record), schema, mask)
+        assert conformer(copy.deepcopy(record)) == expected
+
+
+def test_nested_values_are_conformed():
+    schema = {
+        "properties": {
+            "flags": {"type": "array", "items": {"type": ["boolean", "null"]}},
+            "parent": {
+                "type": "object",
+                "properties": {
+                    "hold": {"type": "boolean"},
+                    "child": {
+                        "type": "object",
+                        "properties": {"id": {"type": "string"}},
+                    },
+                },
+            },
+            "items": {
+                "type": "array",
+                "items": {"type": "object", "properties": {"ok": {"type": "boolean"}}},
+            },
+        },
+    }
+    record = {
+        "flags": [0, 1, None],
+        "parent": {"hold": 1, "child": {"id": "a", "extra": 1}},
+        "items": [{"ok": 0, "extra": 2}, "not an object"],
+    }
+    mask = _mask(schema, [("properties", "parent", "properties", "hold")])
+    conformer = RecordConformer("test", schema, mask, logger=LOGGER)
+
+    output = conformer(copy.deepcopy(record))
+
+    assert output == _sdk_conform(copy.deepcopy(record), schema, mask)
+    assert output == {
+        "flags": [False, True, None],
+        "parent": {"child": {"id": "a"}},
+        "items": [{"ok": False}, "not an object"],
+    }
+
+
+def test_trusted_fields_are_passed_through(caplog):
+    schema = {
+        "properties": {
+            "id": {"type": "string"},
+            "nested": {"type": "object", "properties": {"hold": {"type": "boolean"}}},
+            "partial": {
+                "type": "object",
+                "properties": {"a": {"type": "string"}, "b": {"type": "string"}},
+            },
+        },
+    }
+    mask = _mask(schema, [("properties", "partial", "properties", "b")])
+    conformer = RecordConformer(
+        "test",
+        schema,
+        mask,
+        trusted_fields=["nested", "partial", "missing"],
+        logger=LOGGER,
+    )
+    # Fields with deselected sub-properties are never trusted
+    assert conformer.trusted_fields == {"nested"}
+
+    record = {
+        "id": "1",
+        "nested": {"hold": 0, "extra": 1},
+        "partial": {"a": "x", "b": "y"},
+    }
+    with caplog.at_level(logging.WARNING):
+        assert conformer(record) == {
+            "id": "1",
+            "nested": {"hold": 0, "extra": 1},
+            "partial": {"a": "x"},
+        }
+        conformer({"id": "2", "unknown": 1})
+        conformer({"id": "3", "unknown": 1})
+    assert len(caplog.records) == 1
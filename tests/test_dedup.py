@@ -0,0 +1,133 @@
+"""Tests for in-run record de-duplication."""
+
+import json
+
+from tap_flipkart.dedup import RecordDeduplicator
+
+
+def test_only_newer_versions_are_emitted():
+    deduplicator = RecordDeduplicator()
+
+    assert deduplicator.offer(("s1",), "2024-03-01T10:00:00.000+05:30")
+    assert deduplicator.offer(("s2",), "2024-03-01T10:00:00.000+05:30")
+    # Same instant in another offset
+    assert not deduplicator.offer(("s1",), "2024-03-01T04:30:00.000000Z")
+    assert not deduplicator.offer(("s1",), "2024-02-28T10:00:00.000+05:30")
+    assert deduplicator.offer(("s1",), "2024-03-02T10:00:00.000+05:30")
+    assert deduplicator.suppressed_count == 2
+
+
+def test_versions_in_any_offset_format_are_compared():
+    deduplicator = RecordDeduplicator()
+
+    assert deduplicator.offer(("s1",), "2024-03-01T10:00:00+0530")
+    assert not deduplicator.offer(("s1",), "2024-03-01T04:30:00Z")
+    assert deduplicator.offer(("s1",), "2024-03-01T04:30:01Z")
+
+
+def test_unparsable_versions_are_emitted_as_latest():
+    deduplicator = RecordDeduplicator()
+
+    assert deduplicator.offer(("s1",), "2024-03-02T10:00:00.000+05:30")
+    assert deduplicator.offer(("s1",), "yesterday")
+    # The unparsable version replaced the one it is not comparable with
+    assert deduplicator.offer(("s1",), "2024-03-01T10:00:00.000+05:30")
+    assert deduplicator.suppressed_count == 0
+
+
+def test_index_spills_to_disk(tmp_path):
+    deduplicator = RecordDeduplicator(max_memory_keys=10, spill_directory=str(tmp_path))
+
+    for index in range(25):
+        assert deduplicator.offer((f"s{index}",), index)
+    assert len(deduplicator) < 10
+    assert len(list(tmp_path.iterdir())) == 1
+
+    assert not deduplicator.offer(("s3",), 3)
+    assert deduplicator.offer(("s3",), 4)
+    assert not deduplicator.offer(("s24",), 24)
+
+    deduplicator.close()
+    assert list(tmp_path.iterdir()) == []
+
+
+SHIPMENTS_BY_STATE = {
+    "APPROVED": [("s1", "2024-03-01"), ("s2", "2024-03-01")],
+    # s1 was packed while the sync was running
+    "PACKED": [("s1", "2024-03-02")],
+    # s2 is served again without changes
+    "READY_TO_DISPATCH": [("s2", "2024-03-01")],
+}
+
+
+def _shipment_handler(request):
+    if "/returns" in request.url:
+        return 200, {"returnItems": [], "hasMore": False}
+    state = json.loads(request.body)["filter"]["states"][0]
+    return 200, {
+        "shipments": [
+            {"shipmentId": shipment_id, "updatedAt": f"{date}T10:00:00.000+05:30"}
+            for shipment_id, date in SHIPMENTS_BY_STATE[state]
+        ],
+        "hasMore": False,
+    }
+
+
+CONFIG = {
+    "client_id": "id",
+    "client_secret": "secret",
+    "start_date": "2024-02-25T00:00:00Z",
+    "shipment_state_selections": {"include": list(SHIPMENTS_BY_STATE)},
+}
+
+
+def _versions(run):
+    return [
+        (record["shipmentId"], record["updatedAt"][:10])
+        for record in run.records("shipments")
+    ]
+
+
+def test_shipments_are_deduplicated_across_states(fake_api, sync):
+    fake_api.handler = _shipment_handler
+
+    run = sync(CONFIG)
+
+    assert _versions(run) == [
+        ("s1", "2024-03-01"),
+        ("s2", "2024-03-01"),
+        ("s1", "2024-03-02"),
+    ]
+    # The skipped record still advanced the bookmark of its partition
+    ready = next(
+        p
+        for p in run.state["bookmarks"]["shipments"]["partitions"]
+        if p["context"]["filter"]["states"] == ["READY_TO_DISPATCH"]
+    )
+    assert ready["replication_key_value"] == "2024-03-01T10:00:00.000+05:30"
+
+
+def test_deduplication_can_be_disabled(fake_api, sync):
+    fake_api.handler = _shipment_handler
+
+    run = sync({**CONFIG, "deduplication": {"enabled": False}})
+
+    assert len(_versions(run)) == 4
+
+
+def test_accounts_sharing_primary_keys_are_not_deduplicated(fake_api, sync):
+    fake_api.handler = _shipment_handler
+
+    run = sync(
+        {
+            **CONFIG,
+            "accounts": [
+                {"account_id": "north", "client_id": "north-id", "client_secret": "a"},
+                {"account_id": "south", "client_id": "south-id", "client_secret": "b"},
+            ],
+        },
+    )
+
+    assert sorted(_versions(run)) == sorted(
+        [("s1", "2024-03-01"), ("s2", "2024-03-01"), ("s1", "2024-03-02")] * 2,
+    )
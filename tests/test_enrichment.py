@@ -0,0 +1,112 @@
+"""Tests for the batched shipment enrichment streams."""
+
+import threading
+import time
+
+CONFIG = {
+    "client_id": "id",
+    "client_secret": "secret",
+    "shipment_state_selections": {"include": ["APPROVED"]},
+}
+
+
+class EnrichmentAPI:
+    """Serve a page of shipments and bulk lookups of their details."""
+
+    def __init__(self, shipments, delay=0):
+        self.shipments = shipments
+        self.delay = delay
+        self.lookups = []
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, request):
+        path = request.url.split("/sellers/v3/shipments/", 1)[-1]
+        if "/returns" in request.url:
+            return 200, {"returnItems": [], "hasMore": False}
+        if request.method == "POST":
+            return 200, {
+                "shipments": [
+                    {
+                        "shipmentId": f"s{i}",
+                        "updatedAt": "2024-03-01T10:00:00.000+05:30",
+                    }
+                    for i in range(self.shipments)
+                ],
+                "hasMore": False,
+            }
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.delay)
+        with self._lock:
+            self.running -= 1
+        ids, _, kind = path.partition("/")
+        ids = ids.split("%2C") if "%2C" in ids else ids.split(",")
+        self.lookups.append((kind or "details", ids))
+        if kind == "invoices":
+            return 200, {
+                "invoices": [
+                    {"shipmentId": i, "invoiceNumber": f"inv-{i}"} for i in ids
+                ],
+            }
+        return 200, {
+            "shipments": [
+                {
+                    "shipmentId": i,
+                    "orderItems": [
+                        {"orderItemId": f"{i}-{n}", "orderId": f"o-{i}"}
+                        for n in range(2)
+                    ],
+                }
+                for i in ids
+            ],
+        }
+
+
+def test_enrichment_requests_shipments_in_batches(fake_api, sync):
+    api = EnrichmentAPI(shipments=25)
+    fake_api.handler = api
+
+    run = sync(
+        {**CONFIG, "enrichment": {"batch_size": 10, "max_concurrency": 2}},
+        selected={"shipments", "shipment_order_items", "shipment_invoices"},
+    )
+
+    details = [ids for kind, ids in api.lookups if kind == "details"]
+    invoices = [ids for kind, ids in api.lookups if kind == "invoices"]
+    assert sorted(len(ids) for ids in details) == [5, 10, 10]
+    assert sorted(len(ids) for ids in invoices) == [5, 10, 10]
+    items = run.records("shipment_order_items")
+    # Records come out in the order of the shipments
+    assert [item["orderItemId"] for item in items] == [
+        f"s{i}-{n}" for i in range(25) for n in range(2)
+    ]
+    assert items[0]["shipmentId"] == "s0"
+    invoice_records = run.records("shipment_invoices")
+    assert [r["invoiceNumber"] for r in invoice_records] == [
+        f"inv-s{i}" for i in range(25)
+    ]
+
+
+def test_enrichment_batches_run_concurrently(fake_api, sync):
+    api = EnrichmentAPI(shipments=40, delay=0.05)
+    fake_api.handler = api
+
+    sync(
+        {**CONFIG, "enrichment": {"batch_size": 10, "max_concurrency": 4}},
+        selected={"shipments", "shipment_order_items"},
+    )
+
+    assert len(api.lookups) == 4
+    assert api.max_running > 1
+
+
+def test_enrichment_streams_are_not_selected_by_default(fake_api, sync):
+    api = EnrichmentAPI(shipments=3)
+    fake_api.handler = api
+
+    sync(CONFIG)
+
+    assert api.lookups == []
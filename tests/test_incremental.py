@@ -0,0 +1,84 @@
+"""Tests for incremental replication state."""
+
+import datetime
+
+SHIPMENT_STATES = ["APPROVED", "DELIVERED"]
+
+
+CONFIG = {
+    "client_id": "id",
+    "client_secret": "secret",
+    "start_date": "2024-02-25T00:00:00Z",
+    "shipment_state_selections": {"include": SHIPMENT_STATES},
+}
+
+
+def _partition_states(state, stream):
+    return state["bookmarks"][stream]["partitions"]
+
+
+def _order_date_windows(fake_api):
+    return [
+        tuple(
+            datetime.datetime.strptime(
+                f["orderDate"][bound], "%Y-%m-%dT%H:%M:%S.%fZ"
+            ).replace(tzinfo=datetime.timezone.utc)
+            for bound in ("from", "to")
+        )
+        for f in fake_api.shipment_filters()
+        if f["states"] == ["DELIVERED"]
+    ]
+
+
+def test_bookmarks_are_kept_per_partition(fake_api, sync):
+    state = sync(CONFIG).state
+
+    returns = _partition_states(state, "returns")
+    assert [p["context"] for p in returns] == [
+        {"source": "courier_return"},
+        {"source": "customer_return"},
+    ]
+    for partition in returns:
+        assert partition["replication_key"] == "updatedDate"
+        assert partition["replication_key_value"] == "2024-03-02T10:00:00+05:30"
+
+    shipments = {
+        p["context"]["filter"]["states"][0]: p
+        for p in _partition_states(state, "shipments")
+    }
+    assert set(shipments) == set(SHIPMENT_STATES)
+    assert shipments["APPROVED"]["replication_key"] == "updatedAt"
+    assert (
+        shipments["APPROVED"]["replication_key_value"]
+        == "2024-03-03T10:00:00.000+05:30"
+    )
+    # DELIVERED is bookmarked on the end of the last order date window, apart
+    # from the updatedAt values of its records
+    windows = _order_date_windows(fake_api)
+    delivered = shipments["DELIVERED"]
+    assert datetime.datetime.fromisoformat(delivered["window_end"]) == windows[-1][1]
+    assert "replication_key_value" not in delivered
+    for partition in shipments.values():
+        assert "progress_markers" not in partition
+        assert "orderDate" not in partition["context"]["filter"]
+
+
+def test_later_runs_request_since_bookmark(fake_api, sync):
+    state = sync(CONFIG).state
+    first_windows = _order_date_windows(fake_api)
+    fake_api.requests.clear()
+
+    sync(CONFIG, state)
+
+    returns_urls = [r.url for r in fake_api.requests if "/returns" in r.url]
+    assert all(
+        "modifiedAfter=2024-03-02T04%3A30%3A00.000000Z" in u for u in returns_urls
+    )
+
+    filters = fake_api.shipment_filters()
+    approved = [f for f in filters if f["states"] == ["APPROVED"]]
+    assert approved[0]["modifiedDate"]["from"] == "2024-03-03T04:30:00.000000Z"
+    # The order date windows resume where the last sync ended, without overlap
+    windows = _order_date_windows(fake_api)
+    assert windows[0][0] == first_windows[-1][1]
+    assert all(prev[1] == nxt[0] for prev, nxt in zip(windows, windows[1:]))
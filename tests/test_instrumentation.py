@@ -0,0 +1,134 @@
+"""Tests for sync instrumentation."""
+
+import json
+import logging
+import pstats
+import sys
+
+import pytest
+from singer_sdk.exceptions import ConfigValidationError
+
+from tap_flipkart import instrumentation
+from tap_flipkart.instrumentation import Histogram
+
+
+def _config(tmp_path, instrumentation=None, **config):
+    return {
+        "client_id": "id",
+        "client_secret": "secret",
+        "start_date": "2024-02-25T00:00:00Z",
+        "shipment_state_selections": {"include": ["APPROVED"]},
+        "instrumentation": {
+            "enabled": True,
+            "summary_path": str(tmp_path / "summary.json"),
+            **(instrumentation or {}),
+        },
+        **config,
+    }
+
+
+def _summary(tmp_path):
+    return json.loads((tmp_path / "summary.json").read_text())
+
+
+def test_histogram_percentiles():
+    histogram = Histogram()
+    for value in range(1001):
+        histogram.add(value / 1000)
+
+    summary = histogram.summary()
+
+    assert summary["count"] == 1001
+    assert summary["max"] == 1.0
+    assert summary["p50"] == pytest.approx(0.5, rel=0.03)
+    assert summary["p95"] == pytest.approx(0.95, rel=0.03)
+    assert summary["p99"] == pytest.approx(0.99, rel=0.03)
+
+    other = Histogram()
+    other.add(0)
+    histogram.merge(other)
+    assert histogram.count == 1002
+
+
+@pytest.mark.parametrize("stream_responses", [False, True])
+def test_phases_are_summarized_per_partition(
+    fake_api, sync, tmp_path, stream_responses
+):
+    sync(_config(tmp_path, stream_responses=stream_responses))
+    summary = _summary(tmp_path)
+
+    returns = summary["streams"]["returns"]
+    assert [p["context"] for p in returns["partitions"]] == [
+        {"source": "courier_return"},
+        {"source": "customer_return"},
+    ]
+    phases = returns["phases"]
+    assert phases["request"]["count"] == 2
+    assert phases["page_records"]["total"] == 4
+    assert phases["conform"]["count"] == phases["write"]["count"] == 4
+    assert phases["response_bytes"]["total"] > 0
+    assert "decode" in phases
+    assert ("extract" in phases) is not stream_responses
+    shipments = summary["streams"]["shipments"]["phases"]
+    assert shipments["page_records"]["total"] == 1
+    assert set(shipments["request"]) >= {"p50", "p95", "p99", "max"}
+
+
+def test_partition_metrics_are_written(fake_api, sync, tmp_path, monkeypatch):
+    points = []
+    monkeypatch.setattr(
+        instrumentation,
+        "log_metric",
+        lambda metric, value, metric_type, **tags: points.append(
+            (metric, metric_type, tags),
+        ),
+    )
+
+    sync(_config(tmp_path))
+
+    phases = [
+        tags
+        for metric, _, tags in points
+        if metric == "phase_duration" and tags["stream"] == "returns"
+    ]
+    assert {tags["phase"] for tags in phases} >= {"request", "conform", "write"}
+    assert all({"p50", "p95", "p99"} <= set(tags) for tags in phases)
+    assert {tags["context"]["source"] for tags in phases} == {
+        "courier_return",
+        "customer_return",
+    }
+    assert ("page_records", "counter") in {(m, t) for m, t, _ in points}
+
+
+def test_sync_can_be_profiled(fake_api, sync, tmp_path):
+    profile_path = tmp_path / "sync.prof"
+
+    sync(_config(tmp_path, {"profiler": "cprofile", "profile_path": str(profile_path)}))
+
+    assert pstats.Stats(str(profile_path)).total_calls > 0
+
+
+def test_profile_includes_worker_threads(fake_api, sync, tmp_path):
+    profile_path = tmp_path / "sync.prof"
+
+    sync(
+        _config(
+            tmp_path,
+            {"profiler": "cprofile", "profile_path": str(profile_path)},
+            max_concurrent_partitions=2,
+        ),
+    )
+
+    # Partitions are only fetched in the workers of the partition fetcher
+    functions = {name for _, _, name in pstats.Stats(str(profile_path)).stats}
+    assert "_fetch_partition" in functions
+
+
+def test_missing_pyinstrument_is_a_config_error(monkeypatch):
+    # Importing a module set to None raises ImportError
+    monkeypatch.setitem(sys.modules, "pyinstrument", None)
+
+    with pytest.raises(ConfigValidationError, match="profiling"), (
+        instrumentation.run_profiler("pyinstrument", None, logging.getLogger())
+    ):
+        pass
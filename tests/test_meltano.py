@@ -0,0 +1,41 @@
+"""Tests for the Meltano plugin definition."""
+
+from pathlib import Path
+
+import yaml
+from singer_sdk.helpers.capabilities import (
+    BATCH_CONFIG,
+    FLATTENING_CONFIG,
+    STREAM_MAPS_CONFIG,
+)
+
+from tap_flipkart.tap import TapFlipkart
+
+MELTANO_YML = Path(__file__).parent.parent / "meltano.yml"
+# Settings the SDK adds to the schema of every instantiated tap
+BUILTIN_SETTINGS = {
+    name
+    for config in (STREAM_MAPS_CONFIG, FLATTENING_CONFIG, BATCH_CONFIG)
+    for name in config["properties"]
+}
+
+
+def test_every_setting_is_declared():
+    project = yaml.safe_load(MELTANO_YML.read_text())
+    settings = {
+        setting["name"]: setting
+        for setting in project["plugins"]["extractors"][0]["settings"]
+    }
+    properties = [
+        name
+        for name in TapFlipkart.config_jsonschema["properties"]
+        if name not in BUILTIN_SETTINGS
+    ]
+
+    assert list(settings) == properties
+    assert all("kind" in setting for setting in settings.values())
+    assert {name for name, setting in settings.items() if setting.get("sensitive")} == {
+        "client_id",
+        "client_secret",
+        "accounts",
+    }
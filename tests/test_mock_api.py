@@ -0,0 +1,48 @@
+"""Tests syncing the tap against the offline mock API."""
+
+import datetime
+
+import pytest
+from benchmarks.mock_api import EPOCH, MockFlipkartAPI, MockSettings
+
+
+@pytest.fixture
+def mock_api():
+    settings = MockSettings(
+        records_per_partition=45,
+        record_spacing=datetime.timedelta(hours=6),
+        max_window_records=30,
+    )
+    with MockFlipkartAPI(settings) as api:
+        yield api
+
+
+def _config(api, **config):
+    return {
+        "client_id": "id",
+        "client_secret": "secret",
+        "api_url": api.url,
+        "start_date": EPOCH.isoformat(),
+        "shipment_state_selections": {"include": ["APPROVED", "DELIVERED"]},
+        **config,
+    }
+
+
+def test_sync_pages_through_mock_api(mock_api, sync):
+    # The mock serves the same shipment IDs in every state
+    run = sync(_config(mock_api, deduplication={"enabled": False}))
+
+    # Every partition is paged to completion, including split DELIVERED windows
+    assert len(run.records("returns")) == 2 * 45
+    assert len(run.records("shipments")) == 2 * 45
+    delivered_ids = [r["shipmentId"] for r in run.records("shipments")[45:]]
+    assert delivered_ids == [f"SHIPMENT{i:012d}" for i in range(45)]
+
+
+def test_sync_recovers_from_throttling(mock_api, sync):
+    mock_api.settings.max_requests_per_second = 4
+
+    run = sync(_config(mock_api, shipment_state_selections={"include": ["APPROVED"]}))
+
+    assert len(run.records()) == 45 + 2 * 45
+    assert mock_api.throttled_count > 0
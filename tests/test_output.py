@@ -0,0 +1,109 @@
+"""Tests for buffered Singer message output."""
+
+import contextlib
+import datetime
+import decimal
+import io
+import json
+
+import simplejson
+import singer_sdk._singerlib as singer
+from singer_sdk._singerlib.messages import format_message
+
+from tap_flipkart.output import MessageWriter, encode_message
+
+EXTRACTED = datetime.datetime(
+    2024, 3, 1, 10, 0, 0, 123456, tzinfo=datetime.timezone.utc
+)
+
+
+def _record(**record):
+    return singer.RecordMessage(stream="s", record=record, time_extracted=EXTRACTED)
+
+
+def test_messages_are_encoded_like_the_sdk():
+    messages = [
+        _record(
+            id="s1",
+            name="café ☃",
+            nested={"items": [1, 2.5, None, True]},
+            updated=datetime.datetime(2024, 3, 1, tzinfo=datetime.timezone.utc),
+            day=datetime.date(2024, 3, 1),
+        ),
+        singer.StateMessage(value={"bookmarks": {"s": {"replication_key_value": "x"}}}),
+        singer.SchemaMessage(
+            stream="s", schema={"type": "object"}, key_properties=["id"]
+        ),
+    ]
+    for message in messages:
+        line = encode_message(message)
+        assert line.endswith(b"\n")
+        assert json.loads(line) == json.loads(format_message(message))
+
+
+def test_unsupported_values_fall_back_to_the_sdk():
+    message = _record(amount=decimal.Decimal("1.10"), big=2**70)
+
+    line = encode_message(message).decode()
+
+    assert line == format_message(message) + "\n"
+    assert simplejson.loads(line, use_decimal=True)["record"][
+        "amount"
+    ] == decimal.Decimal(
+        "1.10",
+    )
+
+
+def test_writer_flushes_in_batches_and_on_state():
+    output = io.StringIO()
+    writer = MessageWriter(buffer_size=200)
+
+    with contextlib.redirect_stdout(output):
+        writer.write(_record(id=1))
+        assert output.getvalue() == ""
+        writer.write(_record(id=2, padding="x" * 200))
+        assert output.getvalue().count("\n") == 2
+        writer.write(_record(id=3))
+        writer.write(singer.StateMessage(value={}))
+        assert output.getvalue().count("\n") == 4
+        writer.flush()
+    assert [json.loads(line)["type"] for line in output.getvalue().splitlines()] == [
+        "RECORD",
+        "RECORD",
+        "RECORD",
+        "STATE",
+    ]
+
+
+def test_writer_writes_bytes_after_pending_text():
+    raw = io.BytesIO()
+    stdout = io.TextIOWrapper(raw, encoding="utf-8")
+    writer = MessageWriter()
+
+    with contextlib.redirect_stdout(stdout):
+        print("text")  # noqa: T201
+        writer.write(_record(id=1))
+        writer.flush()
+
+    lines = raw.getvalue().splitlines()
+    assert lines[0] == b"text"
+    assert json.loads(lines[1])["record"] == {"id": 1}
+
+
+CONFIG = {
+    "client_id": "id",
+    "client_secret": "secret",
+    "start_date": "2024-02-25T00:00:00Z",
+    "shipment_state_selections": {"include": ["APPROVED"]},
+}
+
+
+def _messages(run):
+    for message in run.messages:
+        message.pop("time_extracted", None)
+    return run.messages
+
+
+def test_fast_output_matches_sdk_output(fake_api, sync):
+    fast = _messages(sync({**CONFIG, "fast_output": {"enabled": True}}))
+    assert fast == _messages(sync(CONFIG))
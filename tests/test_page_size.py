@@ -0,0 +1,153 @@
+"""Tests for page size configuration and tuning."""
+
+import datetime
+import json
+
+import requests
+
+from tap_flipkart.engine import sent_page_size
+from tap_flipkart.paginator import PageSizeTuner
+from tap_flipkart.tap import TapFlipkart
+
+
+def test_tuner_falls_back_through_candidates():
+    tuner = PageSizeTuner([100, 50, 20])
+    assert tuner.page_size == 100
+    assert tuner.reject(100)
+    assert tuner.page_size == 50
+    # A concurrent request made with a stale size is simply retried
+    assert tuner.reject(100)
+    assert tuner.page_size == 50
+    assert tuner.reject(50)
+    assert not tuner.reject(20)
+
+
+def _config(**config):
+    return {
+        "client_id": "id",
+        "client_secret": "secret",
+        "shipment_state_selections": {"include": ["APPROVED"]},
+        **config,
+    }
+
+
+def test_configured_page_size_is_sent(fake_api, sync):
+    sync(_config(page_size={"shipments": 10}), selected={"shipments"})
+    assert json.loads(fake_api.requests[0].body)["pagination"] == {"pageSize": 10}
+
+
+def test_auto_tune_falls_back_when_rejected(fake_api, sync):
+    handler = fake_api.handler
+
+    def reject_large_pages(request):
+        if json.loads(request.body)["pagination"]["pageSize"] > 20:
+            return 400, {"message": "pageSize too large"}
+        return handler(request)
+
+    fake_api.handler = reject_large_pages
+    sync(_config(page_size={"auto_tune": True}), selected={"shipments"})
+
+    page_sizes = [
+        json.loads(request.body)["pagination"]["pageSize"]
+        for request in fake_api.requests
+    ]
+    assert page_sizes == [100, 50, 20]
+
+
+def test_wide_window_rejection_keeps_page_size(fake_api, sync):
+    handler = fake_api.handler
+
+    def reject_wide_windows(request):
+        order_date = json.loads(request.body)["filter"].get("orderDate")
+        if order_date:
+            start, end = (
+                datetime.datetime.fromisoformat(order_date[key].replace("Z", "+00:00"))
+                for key in ("from", "to")
+            )
+            if end - start > datetime.timedelta(days=2):
+                return 400, {"message": "Too many results"}
+        return handler(request)
+
+    fake_api.handler = reject_wide_windows
+    start = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=6)
+    sync(
+        _config(
+            page_size={"auto_tune": True},
+            shipment_state_selections={"include": ["DELIVERED"]},
+            start_date=start.isoformat(),
+            delivered_window={"initial_hours": 96},
+        ),
+        selected={"shipments"},
+    )
+
+    page_sizes = {
+        json.loads(request.body)["pagination"]["pageSize"]
+        for request in fake_api.requests
+    }
+    assert page_sizes == {100}
+
+
+def test_page_size_is_tuned_per_partition(fake_api, sync):
+    handler = fake_api.handler
+
+    def reject_large_approved_pages(request):
+        body = json.loads(request.body)
+        if (
+            body["filter"]["states"] == ["APPROVED"]
+            and body["pagination"]["pageSize"] > 20
+        ):
+            return 400, {"message": "pageSize too large"}
+        return handler(request)
+
+    fake_api.handler = reject_large_approved_pages
+    sync(
+        _config(
+            page_size={"auto_tune": True},
+            shipment_state_selections={"include": ["APPROVED", "PACKED"]},
+        ),
+        selected={"shipments"},
+    )
+
+    page_sizes = [
+        (
+            json.loads(request.body)["filter"]["states"][0],
+            json.loads(request.body)["pagination"]["pageSize"],
+        )
+        for request in fake_api.requests
+    ]
+    assert page_sizes == [
+        ("APPROVED", 100),
+        ("APPROVED", 50),
+        ("APPROVED", 20),
+        ("PACKED", 100),
+    ]
+
+
+def test_enrichment_batches_share_a_tuner_per_account():
+    tap = TapFlipkart(config=_config())
+    stream = tap.streams["shipment_order_items"]
+    tuners = []
+    for context in (
+        {"shipmentIds": "s1,s2"},
+        {"shipmentIds": "s3"},
+        {"shipmentIds": "s1", "account_id": "a"},
+        {"shipmentIds": "s2", "account_id": "a"},
+    ):
+        stream._partition_local.context = context
+        tuners.append(stream.page_size_tuner)
+
+    assert tuners[0] is tuners[1]
+    assert tuners[2] is tuners[3]
+    assert tuners[0] is not tuners[2]
+    assert len(stream._page_size_tuners) == 2
+
+
+def test_sent_page_size_is_read_from_the_request():
+    def prepare(method, url, body=None):
+        return requests.Request(method, url, json=body).prepare()
+
+    assert sent_page_size(prepare("GET", "https://api/returns?pageSize=50")) == 50
+    post = prepare("POST", "https://api/filter", {"pagination": {"pageSize": 20}})
+    assert sent_page_size(post) == 20
+    assert sent_page_size(prepare("POST", "https://api/filter", {"filter": {}})) is None
+    assert sent_page_size(prepare("GET", "https://api/shipments/next")) is None
@@ -0,0 +1,143 @@
+"""Tests for response parsing."""
+
+import io
+import json
+
+import pytest
+import requests
+from singer_sdk.helpers.jsonpath import extract_jsonpath
+
+from tap_flipkart.paginator import FlipkartPaginator
+from tap_flipkart.parsing import decode_json, extract, iter_json_array
+from tap_flipkart.tap import TapFlipkart
+
+DOCUMENT = {
+    "shipments": [{"shipmentId": "s1"}, {"shipmentId": "s2"}],
+    "hasMore": True,
+    "nextPageUrl": "/v3/shipments/filter?page=2",
+}
+
+
+@pytest.mark.parametrize(
+    "expression",
+    ["$.shipments[*]", "$.nextPageUrl", "$.missing[*]", "$.missing", "$[*]", "$"],
+)
+def test_extract_matches_jsonpath(expression):
+    assert list(extract(expression, DOCUMENT)) == list(
+        extract_jsonpath(expression, DOCUMENT),
+    )
+
+
+def test_complex_expressions_fall_back_to_jsonpath():
+    assert list(extract("$.shipments[*].shipmentId", DOCUMENT)) == ["s1", "s2"]
+
+
+def test_page_is_decoded_once(monkeypatch):
+    response = requests.Response()
+    response._content = json.dumps(DOCUMENT).encode()
+    calls = []
+    original = requests.Response.json
+
+    def counting_json(self, **kwargs):
+        calls.append(self)
+        return original(self, **kwargs)
+
+    monkeypatch.setattr(requests.Response, "json", counting_json)
+
+    paginator = FlipkartPaginator("$.nextPageUrl")
+    records = list(extract("$.shipments[*]", decode_json(response)))
+    paginator.advance(response)
+
+    assert records == DOCUMENT["shipments"]
+    assert paginator.current_value == DOCUMENT["nextPageUrl"]
+    assert len(calls) == 1
+
+
+class ChunkedBody(io.BytesIO):
+    """Response body delivered a few bytes at a time."""
+
+    def __init__(self, data, chunk_size):
+        super().__init__(data)
+        self.chunk_size = chunk_size
+        self.chunks_read = 0
+
+    def read(self, size=-1):
+        self.chunks_read += 1
+        return super().read(self.chunk_size)
+
+
+def _streamed_response(body, chunk_size=3):
+    response = requests.Response()
+    response.raw = ChunkedBody(body.encode(), chunk_size)
+    return response
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 64, 1 << 16])
+@pytest.mark.parametrize(
+    "document",
+    [
+        DOCUMENT,
+        # Pagination fields before the records, numbers and multi-byte text
+        {"hasMore": False, "shipments": [{"n": 12345, "city": "Bengaluru ₹"}, -1.5e3]},
+        {"shipments": []},
+        {},
+    ],
+)
+def test_streamed_records_match_decoded_page(document, chunk_size):
+    body = json.dumps(document, ensure_ascii=False, indent=1)
+    response = _streamed_response(body, chunk_size)
+
+    records = list(iter_json_array(response, "shipments"))
+
+    assert records == document.get("shipments", [])
+    rest = {k: v for k, v in document.items() if k != "shipments"}
+    assert decode_json(response) == rest
+
+
+def test_records_are_yielded_before_the_body_is_read():
+    shipments = [{"shipmentId": f"s{i}", "padding": "x" * 100} for i in range(100)]
+    response = _streamed_response(json.dumps({"shipments": shipments}), 1024)
+
+    records = iter_json_array(response, "shipments")
+    assert next(records) == shipments[0]
+    assert response.raw.chunks_read < 5
+
+
+def test_truncated_body_is_rejected():
+    response = _streamed_response('{"shipments": [{"shipmentId": "s1"}, {"ship')
+    records = iter_json_array(response, "shipments")
+
+    assert next(records) == {"shipmentId": "s1"}
+    with pytest.raises(json.JSONDecodeError):
+        next(records)
+
+
+def test_streamed_pages_are_paginated(fake_api):
+    pages = {
+        None: {
+            "shipments": [{"shipmentId": "s1"}],
+            "hasMore": True,
+            "nextPageUrl": "/next",
+        },
+        "/next": {"hasMore": False, "shipments": [{"shipmentId": "s2"}]},
+    }
+
+    def handler(request):
+        if "/returns" in request.url:
+            return 200, {"returnItems": [], "hasMore": False}
+        return 200, pages["/next" if request.url.endswith("/next") else None]
+
+    fake_api.handler = handler
+    tap = TapFlipkart(
+        config={
+            "client_id": "id",
+            "client_secret": "secret",
+            "shipment_state_selections": {"include": ["APPROVED"]},
+            "stream_responses": True,
+        },
+    )
+    records = list(
+        tap.streams["shipments"].get_records(tap.streams["shipments"].partitions[0])
+    )
+
+    assert [r["shipmentId"] for r in records] == ["s1", "s2"]
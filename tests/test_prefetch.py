@@ -0,0 +1,98 @@
+"""Tests for page prefetching."""
+
+import threading
+import time
+
+import pytest
+
+from tap_flipkart.concurrency import Prefetcher
+from tests.test_checkpoints import CONFIG as WINDOWS_CONFIG
+from tests.test_checkpoints import WindowedAPI, _delivered
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_prefetcher_preserves_order_and_raises_after_earlier_items():
+    def pages():
+        yield from range(5)
+        raise RuntimeError("page 5")
+
+    results = []
+    with pytest.raises(RuntimeError, match="page 5"):  # noqa: PT012
+        for item in Prefetcher(pages()):
+            results.append(item)  # noqa: PERF402
+
+    assert results == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.parametrize(
+    ("options", "buffered"),
+    [
+        ({"queue_depth": 2}, 2),
+        # One 30 byte item fits in 70 bytes along with a second one
+        ({"queue_depth": 10, "max_buffer_bytes": 70, "size": lambda _: 30}, 2),
+        # An item above the byte limit is still buffered on its own
+        ({"queue_depth": 10, "max_buffer_bytes": 10, "size": lambda _: 30}, 1),
+    ],
+)
+def test_prefetcher_bounds_buffered_items(options, buffered):
+    produced = []
+
+    def pages():
+        for i in range(10):
+            produced.append(i)
+            yield i
+
+    items = iter(Prefetcher(pages(), **options))
+    assert next(items) == 0
+
+    # The producer blocks on the next item once the buffer is full
+    _wait_for(lambda: len(produced) == buffered + 2)
+    time.sleep(0.05)
+    assert len(produced) == buffered + 2
+    assert list(items) == list(range(1, 10))
+
+
+def test_closing_prefetcher_stops_producer():
+    closed = threading.Event()
+
+    def pages():
+        try:
+            yield from range(100)
+        finally:
+            closed.set()
+
+    items = iter(Prefetcher(pages()))
+    assert next(items) == 0
+    items.close()
+
+    assert closed.wait(5)
+
+
+@pytest.mark.parametrize("page_cursors", [False, True])
+def test_prefetch_keeps_sync_output(fake_api, sync, page_cursors):
+    def output(**config):
+        fake_api.handler = WindowedAPI(failing_window=3)
+        run = sync(
+            {**WINDOWS_CONFIG, "checkpoints": {"page_cursors": page_cursors}, **config},
+            allow_errors=True,
+        )
+        return (
+            [
+                m["record"]["shipmentId"] if m["type"] == "RECORD" else m["type"]
+                for m in run.messages
+                if m["type"] in ("RECORD", "STATE")
+            ],
+            _delivered(run.states[-1]),
+            run.failed,
+        )
+
+    expected = output()
+    actual = output(prefetch={"enabled": True, "queue_depth": 1})
+
+    assert actual == expected
+    assert actual[2]
@@ -0,0 +1,96 @@
+"""Tests for the client-side rate limiter."""
+
+import requests
+from singer_sdk.exceptions import RetriableAPIError
+
+from tap_flipkart.engine import MAX_BACKOFF_SECONDS
+from tap_flipkart.ratelimit import RateLimiter, get_retry_after
+from tap_flipkart.tap import TapFlipkart
+
+
+class FakeClock:
+    """Clock advanced only by the limiter's own sleeps."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def _limiter(**kwargs):
+    clock = FakeClock()
+    return RateLimiter(clock=clock, sleep=clock.sleep, **kwargs), clock
+
+
+def test_requests_are_spaced_by_rate_after_burst():
+    limiter, clock = _limiter(rate=2, burst=3)
+    for _ in range(3):
+        assert limiter.acquire() == 0
+    for _ in range(4):
+        limiter.acquire()
+    assert clock.now == 2.0
+    assert limiter.throttled_seconds == 2.0
+
+
+def test_unlimited_limiter_never_waits():
+    limiter, clock = _limiter()
+    for _ in range(100):
+        limiter.acquire()
+    assert clock.now == 0
+
+
+def test_retry_after_pauses_all_requests_and_halves_rate():
+    limiter, clock = _limiter(rate=10, burst=1)
+    limiter.throttle(retry_after=5)
+    limiter.acquire()
+    assert clock.now == 5
+    assert limiter.rate == 5
+    for _ in range(100):
+        limiter.succeed()
+    assert limiter.rate == 10
+
+
+def test_retry_after_header_formats():
+    response = requests.Response()
+    assert get_retry_after(response) is None
+    response.headers["Retry-After"] = "7"
+    assert get_retry_after(response) == 7.0
+    response.headers["Retry-After"] = "Wed, 21 Oct 2015 07:28:00 GMT"
+    assert get_retry_after(response) == 0.0
+
+
+def _retriable(retry_after=None):
+    response = requests.Response()
+    response.status_code = 429
+    if retry_after is not None:
+        response.headers["Retry-After"] = str(retry_after)
+    return RetriableAPIError("Throttled", response)
+
+
+def test_backoff_is_jittered_and_bounded():
+    tap = TapFlipkart(config={"client_id": "id", "client_secret": "secret"})
+    stream = tap.streams["shipments"]
+    delays = []
+    for _ in range(50):
+        waits = stream.backoff_wait_generator()
+        next(waits)
+        delays.append([waits.send(_retriable()) for _ in range(8)])
+
+    for attempt in range(8):
+        bound = min(2 ** (attempt + 1), MAX_BACKOFF_SECONDS)
+        assert all(0 <= waits[attempt] <= bound for waits in delays)
+    # Streams throttled at the same time do not retry in lockstep
+    assert len({waits[0] for waits in delays}) > 1
+    assert len({waits[-1] for waits in delays}) > 1
+
+
+def test_backoff_waits_at_least_for_retry_after():
+    tap = TapFlipkart(config={"client_id": "id", "client_secret": "secret"})
+    waits = tap.streams["shipments"].backoff_wait_generator()
+    next(waits)
+
+    assert all(waits.send(_retriable(retry_after=30)) >= 30 for _ in range(3))
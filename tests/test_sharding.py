@@ -0,0 +1,207 @@
+"""Tests for sharded extraction."""
+
+import datetime
+import json
+
+import pytest
+from singer_sdk.exceptions import ConfigValidationError
+
+from tap_flipkart.sharding import (
+    SHARD_WINDOW_KEY,
+    WINDOW_COMPLETE_KEY,
+    ShardPlan,
+    build_plan,
+    main,
+    merge_states,
+    split_windows,
+)
+from tap_flipkart.tap import TapFlipkart
+
+START_DATE = "2024-01-01T00:00:00+00:00"
+END_DATE = "2024-03-01T00:00:00+00:00"
+CONFIG = {
+    "client_id": "id",
+    "client_secret": "secret",
+    "start_date": START_DATE,
+    "shipment_state_selections": {"include": ["APPROVED", "DELIVERED"]},
+}
+SHARDING = {"window_days": 20, "end_date": END_DATE}
+
+
+def _config(sharding=None):
+    return {**CONFIG, "sharding": {**SHARDING, **(sharding or {})}}
+
+
+def _window(start, end):
+    return {"start": start, "end": end}
+
+
+def test_windows_split_range():
+    start = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    windows = split_windows(
+        start,
+        start + datetime.timedelta(days=5),
+        datetime.timedelta(days=2),
+    )
+    assert [(s.day, e.day) for s, e in windows] == [(1, 3), (3, 5), (5, 6)]
+    assert split_windows(start, start, datetime.timedelta(days=1)) == []
+
+
+def test_plan_selects_units():
+    units = [{"i": i} for i in range(5)]
+    assert ShardPlan(1, 2).select("s", units) == [{"i": 1}, {"i": 3}]
+
+    shards = [
+        [{"stream": "s", "context": {"i": 4}}, {"stream": "t", "context": {}}],
+        [],
+    ]
+    assert ShardPlan(0, shards=shards).select("s", units) == [{"i": 4}]
+
+    with pytest.raises(ConfigValidationError):
+        ShardPlan(2, 2)
+
+
+def test_merge_advances_over_contiguous_windows():
+    def window(start, end, **state):
+        return {
+            "context": {"source": "a", SHARD_WINDOW_KEY: _window(start, end)},
+            **state,
+        }
+
+    base = {
+        "context": {"source": "a"},
+        "replication_key": "updatedAt",
+        "replication_key_value": "2024-01-01T00:00:00+00:00",
+    }
+    shards = [
+        [
+            window(
+                START_DATE, "2024-01-21T00:00:00+00:00", **{WINDOW_COMPLETE_KEY: True}
+            )
+        ],
+        [
+            # Interrupted after a checkpoint
+            window(
+                "2024-01-21T00:00:00+00:00",
+                "2024-02-10T00:00:00+00:00",
+                replication_key_value="2024-01-25T00:00:00+00:00",
+            ),
+        ],
+        [window("2024-02-10T00:00:00+00:00", END_DATE, **{WINDOW_COMPLETE_KEY: True})],
+    ]
+    states = [
+        {"bookmarks": {"s": {"partitions": [base, *windows]}}} for windows in shards
+    ]
+
+    merged = merge_states(states)
+
+    assert merged == {
+        "bookmarks": {
+            "s": {
+                "partitions": [
+                    {
+                        "context": {"source": "a"},
+                        "replication_key": "updatedAt",
+                        "replication_key_value": "2024-01-25T00:00:00+00:00",
+                    },
+                ],
+            },
+        },
+    }
+
+
+def test_merge_keeps_latest_whole_partition():
+    old = {"context": {"source": "a"}, "replication_key_value": "2024-01-01T00:00:00Z"}
+    new = {
+        "context": {"source": "a"},
+        "replication_key_value": "2024-01-02T10:00:00+05:30",
+    }
+
+    merged = merge_states(
+        [{"bookmarks": {"s": {"partitions": [p]}}} for p in (old, new)]
+    )
+
+    assert merged["bookmarks"]["s"]["partitions"] == [new]
+
+
+def test_shards_cover_the_sync_once(fake_api, sync):
+    shard_requests = []
+    states = []
+    for shard_index in range(2):
+        fake_api.requests.clear()
+        states.append(
+            sync(_config({"shard_index": shard_index, "shard_count": 2})).state
+        )
+        shard_requests.append(list(fake_api.requests))
+
+    windows = [
+        (f["states"][0], f.get("orderDate") or f.get("modifiedDate"))
+        for request in shard_requests[0] + shard_requests[1]
+        if request.method == "POST"
+        for f in [json.loads(request.body)["filter"]]
+    ]
+    for state in ("APPROVED", "DELIVERED"):
+        bounds = sorted((w["from"], w["to"]) for s, w in windows if s == state)
+        assert bounds[0][0].startswith("2024-01-01T00:00:00")
+        assert bounds[-1][1].startswith("2024-03-01T00:00:00")
+        # Windows follow each other without overlap
+        assert all(prev[1] == nxt[0] for prev, nxt in zip(bounds, bounds[1:]))
+    # Each return source is synced by one shard
+    sources = [
+        [
+            r.url.split("source=")[1].split("&")[0]
+            for r in requests
+            if "/returns" in r.url
+        ]
+        for requests in shard_requests
+    ]
+    assert sources == [["courier_return"], ["customer_return"]]
+
+    merged = merge_states(states)
+    shipments = {
+        p["context"]["filter"]["states"][0]: p
+        for p in merged["bookmarks"]["shipments"]["partitions"]
+    }
+    assert shipments["APPROVED"]["replication_key_value"] == END_DATE
+    assert shipments["DELIVERED"]["window_end"] == END_DATE
+    assert all(
+        SHARD_WINDOW_KEY not in p["context"]
+        for stream in merged["bookmarks"].values()
+        for p in stream["partitions"]
+    )
+    returns = merged["bookmarks"]["returns"]["partitions"]
+    assert [p["replication_key_value"] for p in returns] == [
+        "2024-03-02T10:00:00+05:30",
+    ] * 2
+
+    # An unsharded sync continues from the merged bookmarks
+    fake_api.requests.clear()
+    sync(CONFIG, merged)
+    filters = fake_api.shipment_filters()
+    approved = next(f for f in filters if f["states"] == ["APPROVED"])
+    assert approved["modifiedDate"]["from"] == "2024-03-01T00:00:00.000000Z"
+
+
+def test_plan_file_assigns_units(fake_api, tmp_path, capsys):
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps({**CONFIG, "sharding": SHARDING}))
+
+    main(["plan", "--config", str(config_file), "--shards", "3"])
+    plan = json.loads(capsys.readouterr().out)
+
+    assert len(plan["shards"]) == 3
+    units = [unit for shard in plan["shards"] for unit in shard]
+    # 2 return sources, and 3 windows for each of 2 shipment partitions
+    assert len(units) == 8
+    plan_file = tmp_path / "plan.json"
+    plan_file.write_text(json.dumps(plan))
+
+    tap = TapFlipkart(
+        config={**CONFIG, "sharding": {"shard_index": 2, "plan_file": str(plan_file)}},
+    )
+    expected = [u["context"] for u in plan["shards"][2] if u["stream"] == "shipments"]
+    assert tap.streams["shipments"].partitions == expected
+    assert build_plan(TapFlipkart(config=CONFIG), 1)["shards"][0][0] == {
+        "stream": "returns",
+        "context": {"source": "courier_return"},
+    }
@@ -0,0 +1,74 @@
+"""Tests for tap startup and discovery."""
+
+import json
+import subprocess
+import sys
+
+import requests
+
+from tap_flipkart import client
+from tap_flipkart.tap import TapFlipkart
+
+CONFIG = {
+    "client_id": "id",
+    "client_secret": "secret",
+    "start_date": "2024-02-25T00:00:00Z",
+}
+
+
+def test_discovery_makes_no_requests(monkeypatch):
+    def send(*args, **kwargs):
+        raise AssertionError("Discovery sent a request")
+
+    monkeypatch.setattr(requests.Session, "send", send)
+
+    tap = TapFlipkart(config=CONFIG)
+    catalog = tap.catalog_dict
+
+    assert [s["tap_stream_id"] for s in catalog["streams"]] == [
+        "returns",
+        "shipment_invoices",
+        "shipment_order_items",
+        "shipments",
+    ]
+    for stream in tap.streams.values():
+        assert "authenticator" not in vars(stream)
+    assert "requests_session" not in vars(tap)
+
+
+def test_schema_files_are_read_once():
+    TapFlipkart(config=CONFIG)
+    hits = client._read_schema.cache_info().hits
+
+    first, second = TapFlipkart(config=CONFIG), TapFlipkart(config=CONFIG)
+
+    assert client._read_schema.cache_info().hits == hits + 8
+    assert first.streams["shipments"].schema == second.streams["shipments"].schema
+    assert first.streams["shipments"].schema is not second.streams["shipments"].schema
+
+
+def test_optional_modules_are_not_imported_at_startup():
+    code = (
+        "import json, sys\n"
+        "from tap_flipkart.tap import TapFlipkart\n"
+        f"TapFlipkart(config={CONFIG!r}).catalog_dict\n"
+        "print(json.dumps(sorted(sys.modules)))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+    modules = set(json.loads(output))
+    assert not modules & {"argparse", "cProfile", "pyinstrument", "sqlite3"}
+    # Opt-in subsystems are imported by the settings enabling them
+    assert not modules & {
+        "tap_flipkart.archive",
+        "tap_flipkart.batching",
+        "tap_flipkart.changes",
+        "tap_flipkart.dedup",
+        "tap_flipkart.instrumentation",
+        "tap_flipkart.output",
+    }
@@ -0,0 +1,126 @@
+"""Tests for the adaptive date window planner."""
+
+import datetime
+import logging
+import threading
+
+import pytest
+
+from tap_flipkart.windows import AdaptiveWindowPlanner
+
+START = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+HOUR = datetime.timedelta(hours=1)
+
+
+class TooManyResultsError(Exception):
+    """Raised by the fake responder for windows wider than it accepts."""
+
+
+class FakeResponder:
+    """Serve one record per order timestamp, rejecting overly wide windows."""
+
+    def __init__(self, order_dates, max_width=None):
+        self.order_dates = order_dates
+        self.max_width = max_width
+        self.calls = []
+
+    def __call__(self, start, end):
+        self.calls.append((start, end))
+        if self.max_width and end - start > self.max_width:
+            raise TooManyResultsError
+        for order_date in self.order_dates:
+            if start <= order_date < end:
+                yield {"orderDate": order_date}
+
+
+def _planner(end, **kwargs):
+    options = {
+        "initial_window": 24 * HOUR,
+        "min_window": HOUR,
+        "max_window": 24 * 8 * HOUR,
+        "target_records": 100,
+        "split_errors": (TooManyResultsError,),
+    }
+    options.update(kwargs)
+    return AdaptiveWindowPlanner(START, end, **options)
+
+
+def test_empty_stretches_are_merged():
+    responder = FakeResponder([])
+    planner = _planner(START + 24 * 30 * HOUR)
+    assert list(planner.run(responder)) == []
+    # 1 + 2 + 4 + 8 + 8 + 7 days, instead of 720 hourly requests
+    assert len(responder.calls) == 6
+    assert responder.calls[-1][1] == START + 24 * 30 * HOUR
+
+
+def test_windows_are_split_when_rejected(caplog):
+    order_dates = [START + n * HOUR for n in range(48)]
+    responder = FakeResponder(order_dates, max_width=6 * HOUR)
+    planner = _planner(START + 48 * HOUR)
+    with caplog.at_level(logging.INFO):
+        records = list(planner.run(responder))
+    assert [r["orderDate"] for r in records] == order_dates
+    assert "splitting window" in caplog.text
+    accepted = [c for c in responder.calls if c[1] - c[0] <= 6 * HOUR]
+    assert accepted[0][0] == START
+    assert all(a[1] == b[0] for a, b in zip(accepted, accepted[1:]))
+
+
+def test_minimum_window_errors_are_raised():
+    responder = FakeResponder([], max_width=datetime.timedelta(minutes=30))
+    planner = _planner(START + 24 * HOUR)
+    with pytest.raises(TooManyResultsError):
+        list(planner.run(responder))
+
+
+def test_busy_windows_shrink_the_next_window():
+    order_dates = [START + n * datetime.timedelta(minutes=1) for n in range(24 * 60)]
+    responder = FakeResponder(order_dates)
+    planner = _planner(START + 24 * HOUR, initial_window=8 * HOUR)
+    records = list(planner.run(responder))
+    assert len(records) == len(order_dates)
+    assert planner.window == HOUR
+
+
+def test_concurrent_windows_are_split_while_rejected():
+    order_dates = [START + n * HOUR for n in range(48)]
+    responder = FakeResponder(order_dates, max_width=6 * HOUR)
+    planner = _planner(START + 48 * HOUR)
+    records = list(planner.run_concurrently(responder, max_concurrency=4))
+    assert [r["orderDate"] for r in records] == order_dates
+    assert planner.rejected_window == 12 * HOUR
+
+
+def test_concurrent_windows_adapt_between_rounds():
+    responder = FakeResponder([])
+    planner = _planner(START + 24 * 30 * HOUR)
+    assert list(planner.run_concurrently(responder, max_concurrency=2)) == []
+    # Rounds of 2 x 1 day, 2 x 4 days, 2 x 8 days and the last 4 days
+    assert len(responder.calls) == 7
+    assert max(responder.calls)[1] == START + 24 * 30 * HOUR
+
+
+def test_concurrent_windows_run_at_once():
+    barrier = threading.Barrier(3, timeout=5)
+
+    def fetch(start, end):
+        barrier.wait()
+        yield {"orderDate": start}
+
+    planner = _planner(START + 72 * HOUR)
+    records = list(planner.run_concurrently(fetch, max_concurrency=3))
+    assert [r["orderDate"] for r in records] == [
+        START + n * 24 * HOUR for n in range(3)
+    ]
+
+
+def test_empty_windows_do_not_grow_back_to_rejected_width():
+    responder = FakeResponder([START], max_width=6 * HOUR)
+    planner = _planner(START + 48 * HOUR)
+    assert len(list(planner.run(responder))) == 1
+    rejected = [c for c in responder.calls if c[1] - c[0] > 6 * HOUR]
+    # 24 and 12 hours are rejected once, the following empty windows stay at 6
+    assert [c[1] - c[0] for c in rejected] == [24 * HOUR, 12 * HOUR]
+    assert planner.rejected_window == 12 * HOUR
+    assert planner.window == 6 * HOUR